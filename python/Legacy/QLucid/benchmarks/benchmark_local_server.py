@@ -0,0 +1,54 @@
+"""
+Plays recorded games against the local websocket server and reports the time per step of the whole step loop,
+including request serialization, websocket framing and parsing of the responses.
+
+The latency is added by the server before each response, e.g. '--latency 2' for 2 ms per request.
+
+Usage: python benchmarks/benchmark_local_server.py recordings/game.sc2obs [--bot generic_bot:GenericBot] [--latency 0]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Also adds the QLucid and Legacy directories to sys.path
+from benchmark_replay import create_bot
+
+from sc2.local_server import LocalServer, play_local_game
+from sc2.observation_replayer import RecordedGame
+
+
+async def play(path: str, bot_spec: str, latency: float, step_time_limit):
+    async with LocalServer(RecordedGame(path), latency=latency) as server:
+        start = time.perf_counter()
+        result = await play_local_game(create_bot(bot_spec), server, step_time_limit=step_time_limit)
+        duration = time.perf_counter() - start
+    return result, duration, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--bot", default="generic_bot:GenericBot", help="module:Class of the bot")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds per response")
+    parser.add_argument("--step-time-limit", type=float, default=None, help="seconds, see run_game")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for path in args.recordings:
+        print(f"{os.path.basename(path)} {args.bot} latency {args.latency} ms")
+        for repeat in range(args.repeat):
+            result, duration, server = asyncio.run(
+                play(path, args.bot, args.latency / 1000, args.step_time_limit)
+            )
+            steps = max(server.request_counts["observation"], 1)
+            print(
+                f"  run {repeat + 1}: {result}, {steps} steps, {duration * 1000 / steps:6.2f} ms per step, "
+                f"{server.request_bytes / steps / 1024:6.1f} KiB sent and "
+                f"{server.response_bytes / steps / 1024:6.1f} KiB received per step, "
+                f"requests {dict(server.request_counts)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Compares the path finder backends: the prebuilt sc2pathlib binaries (native) and the NumPy and SciPy one (numpy).
+
+Both backends get the pathing grid of a synthetic game, the influence of its enemy units and the same random queries,
+the time of each target is the median of a number of calls. The blocks and influence are added again before each call,
+so nothing is memoized from the previous call. Each backend runs in its own process, because the binaries can crash
+the interpreter on platforms they were not built for. Such a backend is reported as unavailable.
+
+Usage: python benchmarks/benchmark_pathing.py [--backends native numpy] [--queries 50] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from math import floor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+QLUCID_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, QLUCID_DIR)
+
+from sc2 import BotAI
+from sc2.synthetic_game import SyntheticGame
+import sc2pathlibp
+
+BACKENDS = ("native", "numpy")
+
+
+def create_path_finder(backend: str, grid: List[List[int]]):
+    if backend == "numpy":
+        return sc2pathlibp.NumpyPathFinder(grid)
+    from sc2pathlibp.path_finder import PathFinder
+
+    return PathFinder(grid)
+
+
+def create_targets(backend: str, queries: int) -> Dict[str, Tuple[Optional[Callable[[], None]], Callable[[], None]]]:
+    game = SyntheticGame(map_size=(200, 180))
+    bot = game.start_bot(BotAI(), game.observation(100, 200, clusters=4))
+    pathable = (bot.game_info.pathing_grid.data_numpy != 0) | (bot.game_info.placement_grid.data_numpy != 0)
+    grid = pathable.T.astype(int).tolist()
+    finder = create_path_finder(backend, grid)
+    enemies = [unit.position_tuple for unit in bot.enemy_units]
+
+    random = np.random.RandomState(0)
+    free_cells = np.argwhere(pathable.T)
+    starts = [tuple(cell + 0.5) for cell in free_cells[random.randint(len(free_cells), size=queries)]]
+    ends = [tuple(cell + 0.5) for cell in free_cells[random.randint(len(free_cells), size=queries)]]
+    # Micro queries start next to the unit's target
+    near_ends = [(start[0] + random.uniform(-8, 8), start[1] + random.uniform(-8, 8)) for start in starts]
+
+    def influence():
+        finder.normalize_influence(20)
+        finder.add_influence(enemies, 100, 9)
+        finder.add_influence_walk(enemies[:50], 100, 7)
+
+    def paths_from_one_start():
+        if backend == "numpy":
+            finder.find_paths(starts[0], ends)
+        else:
+            for end in ends:
+                finder.find_path(starts[0], end)
+
+    def fresh_frame():
+        # Blocks and influence change between frames, nothing is left from the previous queries
+        finder.reset()
+        influence()
+
+    return {
+        "create": (None, lambda: create_path_finder(backend, grid)),
+        "create_block x100": (
+            finder.reset,
+            lambda: finder.create_block([(floor(start[0]), floor(start[1])) for start in starts[:100]], (2, 2)),
+        ),
+        "normalize + add influence": (finder.reset, influence),
+        f"find_path x{queries}": (fresh_frame, lambda: [finder.find_path(s, e) for s, e in zip(starts, ends)]),
+        f"find_path near x{queries}": (
+            fresh_frame,
+            lambda: [finder.find_path(s, e) for s, e in zip(starts, near_ends)],
+        ),
+        f"find_path_influence near x{queries}": (
+            fresh_frame,
+            lambda: [finder.find_path_influence(s, e) for s, e in zip(starts, near_ends)],
+        ),
+        f"paths from one start x{queries}": (fresh_frame, paths_from_one_start),
+        f"safest_spot x{queries}": (fresh_frame, lambda: [finder.safest_spot(s, 8) for s in starts]),
+        f"lowest_influence_in_grid x{queries}": (
+            fresh_frame,
+            lambda: [finder.lowest_influence_in_grid(s, 6) for s in starts],
+        ),
+        f"find_low_inside_walk x{queries}": (
+            fresh_frame,
+            lambda: [finder.find_low_inside_walk(s, e, 6) for s, e in zip(starts, near_ends)],
+        ),
+    }
+
+
+def measure(backend: str, queries: int, repeat: int) -> Dict[str, float]:
+    results = {}
+    for name, (setup, target) in create_targets(backend, queries).items():
+        times: List[float] = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            target()
+            times.append(time.perf_counter() - start)
+        results[name] = statistics.median(times) * 1000
+    return results
+
+
+def measure_in_process(backend: str, queries: int, repeat: int) -> Dict[str, float]:
+    command = [sys.executable, __file__, "--measure", backend, "--queries", str(queries), "--repeat", str(repeat)]
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if process.returncode != 0:
+        print(f"{backend} is unavailable, exit code {process.returncode}: {process.stderr.strip()[-200:]}")
+        return {}
+    return json.loads(process.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--measure", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.queries, args.repeat)))
+        return
+
+    results = {backend: measure_in_process(backend, args.queries, args.repeat) for backend in args.backends}
+    backends = [backend for backend in args.backends if results[backend]]
+    if not backends:
+        return
+    names = list(results[backends[0]].keys())
+    width = max(len(name) for name in names)
+    print(f"{'ms per call':<{width}} " + " ".join(f"{backend:>9}" for backend in backends))
+    for name in names:
+        print(f"{name:<{width}} " + " ".join(f"{results[backend][name]:9.3f}" for backend in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Replays recorded games without the game and reports the wall time per frame of a bot.
+
+Record a game by setting 'observation_record_dir' on the bot, e.g. 'bot.observation_record_dir = "recordings"',
+which writes one file per game. The recorded observations are fed through _prepare_step, issue_events, on_step and
+_after_step of a new bot instance, so the results only depend on the recording and the code.
+
+With '--profile profiles' the step time report of each run is written to that directory, see sc2/step_profiler.py.
+
+Usage: python benchmarks/benchmark_replay.py recordings/game.sc2obs [--bot generic_bot:GenericBot] [--repeat 3]
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import statistics
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QLUCID_DIR = os.path.join(BENCHMARK_DIR, "..")
+sys.path.insert(0, QLUCID_DIR)
+# The Legacy bots are in the parent directory
+sys.path.insert(1, os.path.join(QLUCID_DIR, ".."))
+
+from sc2.observation_replayer import replay_game
+
+
+def create_bot(bot_spec: str):
+    """ Creates a bot from 'module:Class', bots that inherit from KnowledgeBot take their name as argument. """
+    module_name, class_name = bot_spec.split(":")
+    bot_class = getattr(importlib.import_module(module_name), class_name)
+    from sharpy.knowledges import KnowledgeBot
+
+    if issubclass(bot_class, KnowledgeBot):
+        return bot_class(class_name)
+    return bot_class()
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--bot", default="generic_bot:GenericBot", help="module:Class of the bot")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="directory for the step time reports")
+    args = parser.parse_args()
+
+    for path in args.recordings:
+        print(f"{os.path.basename(path)} {args.bot}")
+        for repeat in range(args.repeat):
+            bot = create_bot(args.bot)
+            bot.step_profile_dir = args.profile
+            frames = asyncio.run(replay_game(bot, path, args.max_frames))
+            bot._write_step_profile()
+            totals = sorted(frame.total_time * 1000 for frame in frames)
+            prepare = statistics.mean(frame.prepare_time * 1000 for frame in frames)
+            print(
+                f"  run {repeat + 1}: {len(frames)} frames, total {sum(totals):8.1f} ms, "
+                f"mean {statistics.mean(totals):6.2f} ms (prepare {prepare:5.2f} ms), "
+                f"p50 {percentile(totals, 0.5):6.2f} ms, p95 {percentile(totals, 0.95):6.2f} ms, "
+                f"max {totals[-1]:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Measures how the per step work of the knowledge managers and the Units queries grows with the number of units.
+
+Every size creates a synthetic game with that many own and enemy units, and the time of each target is the median of
+a number of calls on the same state. The growth column is the exponent k of time ~ units^k between the smallest and
+the largest size, 1 is linear and 2 is quadratic.
+
+The pathing manager needs the native path finding library and is not started, so zones are not sorted by path
+distance and GroupCombatManager only groups the enemy units.
+
+Usage: python benchmarks/benchmark_scaling.py [--sizes 100 500 1000 2000] [--repeat 5] [--vision]
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import time
+from configparser import ConfigParser
+from typing import Callable, Dict, List
+
+QLUCID_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, QLUCID_DIR)
+
+from sc2 import BotAI
+from sc2.client import Client
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.synthetic_game import SyntheticGame
+from sharpy.general.zone import Zone
+from sharpy.knowledges import Knowledge
+from sharpy.mapping.heat_map import HeatMap
+
+QUERY_COUNT = 100
+
+
+class ScalingBot(BotAI):
+    def __init__(self):
+        super().__init__()
+        self.config = ConfigParser()
+        self.config.read(os.path.join(QLUCID_DIR, "config.ini"))
+        # Read by Knowledge.print and Knowledge.pre_start
+        self.run_custom = False
+        self.manager_time_budget = None
+
+
+async def start_knowledge(bot: ScalingBot) -> Knowledge:
+    """ Starts the parts of Knowledge that the targets need, without the managers that need the game. """
+    knowledge = Knowledge()
+    knowledge.pre_start(bot, None)
+    await knowledge.unit_values.start(knowledge)
+    await knowledge.unit_cache.start(knowledge)
+
+    zone_manager = knowledge.zone_manager
+    zone_manager.knowledge = knowledge
+    zone_manager.cache = knowledge.unit_cache
+    for location in bot.expansion_locations_list:
+        zone_manager.zones[location] = Zone(location, location in bot.enemy_start_locations, knowledge)
+    zone_manager.expansion_zones = sorted(
+        zone_manager.zones.values(), key=lambda zone: zone.center_location.distance_to(bot.start_location)
+    )
+    # The heat areas are linked to the zones when they are created
+    knowledge.heat_map = HeatMap(bot, knowledge)
+
+    knowledge._all_own = bot.units + bot.structures
+    knowledge._known_enemy_structures = bot.enemy_structures
+    knowledge._known_enemy_units = bot.enemy_units + bot.enemy_structures
+    knowledge._known_enemy_units_mobile = bot.enemy_units
+    await knowledge.combat_manager.start(knowledge)
+    await knowledge.unit_cache.update()
+    return knowledge
+
+
+def create_targets(bot: ScalingBot, knowledge: Knowledge) -> Dict[str, Callable[[], None]]:
+    loop = asyncio.get_event_loop()
+    heat_map = knowledge.heat_map
+    query_units = bot.units[:QUERY_COUNT]
+
+    def heat_map_update():
+        # Forces the full update that is otherwise done every 0.5 game seconds
+        heat_map.updater.last_call = None
+        heat_map.update()
+
+    def closer_than():
+        for unit in query_units:
+            bot.enemy_units.closer_than(10, unit)
+
+    def closest_to():
+        for unit in query_units:
+            bot.enemy_units.closest_to(unit)
+
+    return {
+        "UnitCacheManager.update": lambda: loop.run_until_complete(knowledge.unit_cache.update()),
+        "GroupCombatManager.group_enemy_units": knowledge.combat_manager.group_enemy_units,
+        "HeatMap.update": heat_map_update,
+        "ZoneManager.update_zones": knowledge.zone_manager.update_zones,
+        f"Units.closer_than x{QUERY_COUNT}": closer_than,
+        f"Units.closest_to x{QUERY_COUNT}": closest_to,
+        "Units.sorted_by_distance_to": lambda: bot.enemy_units.sorted_by_distance_to(bot.start_location),
+        "Units.of_type": lambda: bot.units.of_type({UnitTypeId.STALKER, UnitTypeId.ZEALOT}),
+        f"cache.enemy_in_range x{QUERY_COUNT}": lambda: [
+            knowledge.unit_cache.enemy_in_range(unit.position, 10) for unit in query_units
+        ],
+        f"cache.enemy_indices_in_range {QUERY_COUNT} centers": lambda: knowledge.unit_cache.enemy_indices_in_range(
+            [unit.position for unit in query_units], 10
+        ),
+    }
+
+
+def measure(size: int, repeat: int, full_vision: bool) -> Dict[str, float]:
+    game = SyntheticGame()
+    observation = game.observation(size, size, full_vision=full_vision, cloaked_fraction=0.05)
+    # The client never connects, MicroStep only reads its game_step
+    bot = game.start_bot(ScalingBot(), observation, client=Client(ws="offline"))
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        knowledge = loop.run_until_complete(start_knowledge(bot))
+        results = {}
+        for name, target in create_targets(bot, knowledge).items():
+            times: List[float] = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                target()
+                times.append(time.perf_counter() - start)
+            results[name] = statistics.median(times) * 1000
+        return results
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000], help="units per player")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--vision", action="store_true", help="limited vision instead of the full map")
+    args = parser.parse_args()
+
+    results = {size: measure(size, args.repeat, not args.vision) for size in args.sizes}
+    names = list(results[args.sizes[0]].keys())
+    width = max(len(name) for name in names)
+    print(f"{'ms per call':<{width}} " + " ".join(f"{size:>9}" for size in args.sizes) + "    growth")
+    for name in names:
+        times = [results[size][name] for size in args.sizes]
+        growth = ""
+        if len(args.sizes) > 1 and times[0] > 0:
+            growth = f"{math.log(times[-1] / times[0]) / math.log(args.sizes[-1] / args.sizes[0]):9.2f}"
+        print(f"{name:<{width}} " + " ".join(f"{value:9.3f}" for value in times) + f" {growth}")
+
+
+if __name__ == "__main__":
+    main()
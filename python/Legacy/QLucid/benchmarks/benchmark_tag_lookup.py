@@ -0,0 +1,88 @@
+"""
+Compares tag lookups on Units with the linear scan of the baseline.
+
+Single lookups on fresh filter results are the common case in the bot code, they must not be slower than the scan.
+Repeated lookups on the same collection, like helper.set_total_strength_values does, use the tag map.
+Each target looks up random tags of the collection, the time is the median of a number of runs and does not include
+creating the subsets.
+
+Usage: python benchmarks/benchmark_tag_lookup.py [--sizes 100 500 2000] [--repeat 7]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sc2 import BotAI
+from sc2.synthetic_game import SyntheticGame
+from sc2.unit import Unit
+from sc2.units import Units
+
+LOOKUPS = 200
+
+
+def scan(units: Units, tag: int) -> Optional[Unit]:
+    """ Units.find_by_tag of the baseline. """
+    for unit in units:
+        if unit.tag == tag:
+            return unit
+    return None
+
+
+def create_targets(size: int) -> Dict[str, Tuple[Callable[[], list], Callable[[list], None]]]:
+    """ Returns the targets by name as (setup, target), the subsets from setup are created outside of the timing. """
+    game = SyntheticGame(map_size=(200, 180))
+    bot = game.start_bot(BotAI(), game.observation(size // 2, size // 2))
+    units = bot.all_units
+    tags = [unit.tag for unit in random.Random(0).choices(units, k=LOOKUPS)]
+
+    def fresh_subsets() -> List[Units]:
+        return [units.filter(lambda unit: unit.is_mine or unit.is_enemy) for _ in tags]
+
+    def same_subset() -> List[Units]:
+        return [units.filter(lambda unit: unit.is_mine or unit.is_enemy)] * len(tags)
+
+    def scan_each(subsets: List[Units]):
+        for subset, tag in zip(subsets, tags):
+            scan(subset, tag)
+
+    def find_each(subsets: List[Units]):
+        for subset, tag in zip(subsets, tags):
+            subset.find_by_tag(tag)
+
+    return {
+        "scan, fresh subsets": (fresh_subsets, scan_each),
+        "find_by_tag, fresh subsets": (fresh_subsets, find_each),
+        "scan, same subset": (same_subset, scan_each),
+        "find_by_tag, same subset": (same_subset, find_each),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'ms per ' + str(LOOKUPS) + ' lookups':<28}" + "".join(f"{size:>10}" for size in args.sizes))
+    results: Dict[str, List[float]] = {}
+    for size in args.sizes:
+        for name, (setup, target) in create_targets(size).items():
+            times = []
+            for _ in range(args.repeat):
+                subsets = setup()
+                start = time.perf_counter()
+                target(subsets)
+                times.append(time.perf_counter() - start)
+            results.setdefault(name, []).append(statistics.median(times) * 1000)
+    for name, times in results.items():
+        print(f"{name:<28}" + "".join(f"{value:>10.3f}" for value in times))
+
+
+if __name__ == "__main__":
+    main()
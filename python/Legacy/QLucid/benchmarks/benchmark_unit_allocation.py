@@ -0,0 +1,183 @@
+"""
+Compares the allocations of the slot based Unit with the dict based Unit of the baseline.
+
+Every step creates one Unit object per observed unit, so this simulates a number of steps with 200, 500 and 1000
+units and reads the derived values that the bot reads most often.
+
+Usage: python benchmarks/benchmark_unit_allocation.py
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from s2clientprotocol import data_pb2, raw_pb2, sc2api_pb2
+
+from sc2.cache import property_immutable_cache
+from sc2.constants import IS_STRUCTURE, TARGET_AIR, TARGET_GROUND, UNIT_BATTLECRUISER, UNIT_ORACLE
+from sc2.game_data import GameData
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.unit import Unit
+
+UNIT_COUNTS = (200, 500, 1000)
+STEPS = 50
+REPEATS = 5
+HOT_PROPERTIES = ("type_id", "_type_data", "is_structure", "position_tuple", "radius", "ground_range", "air_range")
+
+
+class BaselineUnit:
+    """ The hot properties of the Unit as it was before __slots__, copied from the baseline unchanged:
+    an instance __dict__, a cache dict per instance and the original decorators. """
+
+    def __init__(self, proto_data, bot_object, distance_calculation_index: int = -1):
+        self._proto = proto_data
+        self._bot_object = bot_object
+        # Used by property_immutable_cache
+        self.cache = {}
+        self.game_loop: int = bot_object.state.game_loop
+        # Index used in the 2D numpy array to access the 2D distance between two units
+        self.distance_calculation_index: int = distance_calculation_index
+
+    @property_immutable_cache
+    def type_id(self) -> UnitTypeId:
+        unit_type = self._proto.unit_type
+        if unit_type not in self._bot_object._game_data.unit_types:
+            self._bot_object._game_data.unit_types[unit_type] = UnitTypeId(unit_type)
+        return self._bot_object._game_data.unit_types[unit_type]
+
+    @property_immutable_cache
+    def _type_data(self):
+        return self._bot_object._game_data.units[self._proto.unit_type]
+
+    @property
+    def is_structure(self) -> bool:
+        return IS_STRUCTURE in self._type_data.attributes
+
+    @property
+    def position_tuple(self) -> Tuple[float, float]:
+        return self._proto.pos.x, self._proto.pos.y
+
+    @property
+    def radius(self) -> float:
+        return self._proto.radius
+
+    @property_immutable_cache
+    def _weapons(self):
+        try:
+            return self._type_data._proto.weapons
+        except:
+            return None
+
+    @property_immutable_cache
+    def can_attack_ground(self) -> bool:
+        if self.type_id in {UNIT_BATTLECRUISER, UNIT_ORACLE}:
+            return True
+        if self._weapons:
+            return any(weapon.type in TARGET_GROUND for weapon in self._weapons)
+        return False
+
+    @property_immutable_cache
+    def ground_range(self) -> float:
+        if self.type_id == UNIT_ORACLE:
+            return 4
+        if self.type_id == UNIT_BATTLECRUISER:
+            return 6
+        if self.can_attack_ground:
+            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_GROUND), None)
+            if weapon:
+                return weapon.range
+        return 0
+
+    @property_immutable_cache
+    def can_attack_air(self) -> bool:
+        if self.type_id == UNIT_BATTLECRUISER:
+            return True
+        if self._weapons:
+            return any(weapon.type in TARGET_AIR for weapon in self._weapons)
+        return False
+
+    @property_immutable_cache
+    def air_range(self) -> float:
+        if self.type_id == UNIT_BATTLECRUISER:
+            return 6
+        if self.can_attack_air:
+            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_AIR), None)
+            if weapon:
+                return weapon.range
+        return 0
+
+
+def create_game_data() -> GameData:
+    data = sc2api_pb2.ResponseData()
+    for unit_type, weapon_type, weapon_range, attributes in (
+        (UnitTypeId.MARINE, data_pb2.Weapon.Any, 5, []),
+        (UnitTypeId.ZEALOT, data_pb2.Weapon.Ground, 0.1, []),
+        (UnitTypeId.STALKER, data_pb2.Weapon.Any, 6, []),
+        (UnitTypeId.PHOTONCANNON, data_pb2.Weapon.Any, 7, [IS_STRUCTURE]),
+    ):
+        unit_data = data.units.add(unit_id=unit_type.value, name=unit_type.name, available=True)
+        unit_data.attributes.extend(attributes)
+        unit_data.weapons.add(type=weapon_type, damage=10, attacks=1, range=weapon_range, speed=1)
+    return GameData(data)
+
+
+def create_protos(count: int, game_data: GameData) -> list:
+    unit_types = list(game_data.units)
+    protos = []
+    for index in range(count):
+        proto = raw_pb2.Unit(tag=index + 1, unit_type=unit_types[index % len(unit_types)], radius=0.5)
+        proto.pos.x = index % 100
+        proto.pos.y = index // 100
+        protos.append(proto)
+    return protos
+
+
+def simulate(unit_class, protos: list, bot) -> None:
+    for step in range(STEPS):
+        bot.state.game_loop = step
+        units = [unit_class(proto, bot, distance_calculation_index=index) for index, proto in enumerate(protos)]
+        for unit in units:
+            for name in HOT_PROPERTIES:
+                getattr(unit, name)
+
+
+def measure(unit_class, protos: list, bot) -> dict:
+    simulate(unit_class, protos, bot)
+
+    gc.collect()
+    collections_before = sum(stats["collections"] for stats in gc.get_stats())
+    durations = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        simulate(unit_class, protos, bot)
+        durations.append(time.perf_counter() - start)
+    collections = (sum(stats["collections"] for stats in gc.get_stats()) - collections_before) / REPEATS
+
+    tracemalloc.start()
+    simulate(unit_class, protos, bot)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms_per_step": 1000 * min(durations) / STEPS, "peak_kib": peak / 1024, "gc_collections": collections}
+
+
+def main():
+    game_data = create_game_data()
+    bot = SimpleNamespace(_game_data=game_data, state=SimpleNamespace(game_loop=0))
+    print(f"{'units':>6} {'unit class':>12} {'ms/step':>9} {'peak KiB':>10} {'gc runs':>8}")
+    for count in UNIT_COUNTS:
+        protos = create_protos(count, game_data)
+        for unit_class in (BaselineUnit, Unit):
+            result = measure(unit_class, protos, bot)
+            print(
+                f"{count:>6} {unit_class.__name__:>12} {result['ms_per_step']:>9.3f} "
+                f"{result['peak_kib']:>10.1f} {result['gc_collections']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
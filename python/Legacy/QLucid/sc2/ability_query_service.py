@@ -0,0 +1,164 @@
+from __future__ import annotations
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from .constants import abilityid_to_unittypeid
+from .ids.ability_id import AbilityId
+from .ids.unit_typeid import UnitTypeId
+from .unit import Unit
+from .units import Units
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+
+
+class AbilityQueryService:
+    """ Answers available ability queries from a memo, and sends all queries that are not memoized in one request.
+
+    The abilities of a unit are queried again when its type, energy bucket, buffs, orders, cargo or readiness changed,
+    when a structure finished or an upgrade completed (tech requirements), or when the memoized result is too old.
+    Results that lack an ability that was seen on the same unit type before (e.g. blink on cooldown) are
+    queried again after 'cooldown_recheck_loops', all other results after 'max_age' game loops.
+
+    Abilities are always queried ignoring resource requirements, the resource requirements are checked locally,
+    so that the results stay valid while minerals, vespene and supply change.
+    On the first query of each frame the own units whose result is not valid are added to the request if their type
+    was queried before, so that all consumers share a single request per frame without querying units that
+    nobody asks about. """
+
+    def __init__(
+        self, bot: BotAI, energy_bucket: float = 25, cooldown_recheck_loops: int = 8, max_age: int = 224,
+    ):
+        """
+        :param bot:
+        :param energy_bucket: energy changes within the same bucket do not invalidate a result, most energy costs are multiples of 25
+        :param cooldown_recheck_loops: age after which results that lack a previously seen ability are queried again
+        :param max_age: age after which all results are queried again
+        """
+        assert energy_bucket > 0, f"energy_bucket has to be positive, was {energy_bucket}"
+        self._bot: BotAI = bot
+        self.energy_bucket: float = energy_bucket
+        self.cooldown_recheck_loops: int = cooldown_recheck_loops
+        self.max_age: int = max_age
+        # Per unit tag: (signature, game loop of the query, expiry game loop, abilities)
+        self._memo: Dict[int, Tuple[Hashable, int, int, List[AbilityId]]] = {}
+        # All abilities that were seen per unit type
+        self._seen_abilities: Dict[UnitTypeId, Set[AbilityId]] = {}
+        # Unit types that were queried, only these are refreshed on the first query of a frame
+        self._queried_types: Set[int] = set()
+        # Minerals, vespene and supply required per ability
+        self._costs: Dict[AbilityId, Tuple[int, int, float]] = {}
+        self._game_loop: int = -1
+        self._tech_version: Hashable = None
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.requests: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """ Share of the unit queries that were answered from the memo. """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    async def available(
+        self, units: Union[List[Unit], Units, Unit], ignore_resource_requirements: bool = False
+    ) -> Union[List[List[AbilityId]], List[AbilityId]]:
+        """ Same as client.query_available_abilities.
+
+        :param units:
+        :param ignore_resource_requirements: """
+        if isinstance(units, Unit):
+            return (await self.available([units], ignore_resource_requirements))[0]
+        assert units
+
+        bot = self._bot
+        first_query_of_frame = self._game_loop != bot.state.game_loop
+        if first_query_of_frame:
+            self._start_frame()
+
+        missing: Dict[int, Unit] = {}
+        signatures: Dict[int, Hashable] = {}
+        for unit in units:
+            signature = self._signature(unit)
+            signatures[unit.tag] = signature
+            if self._is_valid(unit.tag, signature):
+                self.hits += 1
+            else:
+                missing[unit.tag] = unit
+        if missing:
+            self.misses += len(missing)
+            if first_query_of_frame:
+                # Refresh the other own units of queried types in the same request, later queries of this frame
+                # are memoized
+                for unit in bot.units + bot.structures:
+                    if unit.tag not in missing and unit._proto.unit_type in self._queried_types:
+                        signature = self._signature(unit)
+                        if not self._is_valid(unit.tag, signature):
+                            signatures[unit.tag] = signature
+                            missing[unit.tag] = unit
+            await self._query(list(missing.values()), signatures)
+        self._queried_types.update(unit._proto.unit_type for unit in units)
+
+        results = [self._memo[unit.tag][3] for unit in units]
+        if ignore_resource_requirements:
+            return [list(abilities) for abilities in results]
+        return [[ability for ability in abilities if self._is_affordable(ability)] for abilities in results]
+
+    def clear(self):
+        self._memo.clear()
+
+    def _start_frame(self):
+        bot = self._bot
+        self._game_loop = bot.state.game_loop
+        self._tech_version = (
+            frozenset(structure.type_id for structure in bot.structures if structure.is_ready),
+            len(bot.state.upgrades),
+        )
+        if len(self._memo) > 2 * (len(bot.units) + len(bot.structures)):
+            own_tags = bot.units.tags | bot.structures.tags
+            self._memo = {tag: entry for tag, entry in self._memo.items() if tag in own_tags}
+
+    async def _query(self, units: List[Unit], signatures: Dict[int, Hashable]):
+        self.requests += 1
+        results = await self._bot._client.query_available_abilities(units, ignore_resource_requirements=True)
+        game_loop = self._game_loop
+        for unit, abilities in zip(units, results):
+            seen = self._seen_abilities.setdefault(unit.type_id, set())
+            seen.update(abilities)
+            age = self.max_age if len(abilities) == len(seen) else self.cooldown_recheck_loops
+            self._memo[unit.tag] = (signatures[unit.tag], game_loop, game_loop + age, abilities)
+
+    def _is_valid(self, tag: int, signature: Hashable) -> bool:
+        entry = self._memo.get(tag)
+        if entry is None or entry[0] != signature:
+            return False
+        return entry[1] == self._game_loop or entry[2] > self._game_loop
+
+    def _signature(self, unit: Unit) -> Hashable:
+        proto = unit._proto
+        return (
+            proto.unit_type,
+            int(proto.energy // self.energy_bucket),
+            tuple(proto.buff_ids),
+            tuple((order.ability_id, order.target_unit_tag) for order in proto.orders),
+            proto.cargo_space_taken,
+            proto.build_progress == 1,
+            self._tech_version,
+        )
+
+    def _is_affordable(self, ability: AbilityId) -> bool:
+        cost = self._costs.get(ability)
+        if cost is None:
+            cost = self._costs[ability] = self._cost(ability)
+        minerals, vespene, supply = cost
+        bot = self._bot
+        return minerals <= bot.minerals and vespene <= bot.vespene and (supply <= 0 or supply <= bot.supply_left)
+
+    def _cost(self, ability: AbilityId) -> Tuple[int, int, float]:
+        bot = self._bot
+        if ability.value not in bot._game_data.abilities:
+            return 0, 0, 0
+        cost = bot.calculate_cost(ability)
+        unit_type: Optional[UnitTypeId] = abilityid_to_unittypeid.get(ability)
+        supply = bot.calculate_supply_cost(unit_type) if unit_type is not None else 0
+        return cost.minerals, cost.vespene, supply
@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+from s2clientprotocol import raw_pb2
+
+from .ability_query_service import AbilityQueryService
+from .game_data import Cost
+from .ids.ability_id import AbilityId
+from .ids.unit_typeid import UnitTypeId
+from .unit import Unit
+from .units import Units
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+        self.abilities = {}
+
+    async def query_available_abilities(self, units, ignore_resource_requirements=False):
+        assert ignore_resource_requirements
+        self.requests.append([unit.tag for unit in units])
+        return [list(self.abilities[unit.tag]) for unit in units]
+
+
+class FakeBot:
+    def __init__(self):
+        self._client = FakeClient()
+        self._game_data = SimpleNamespace(abilities={AbilityId.NEXUSTRAIN_PROBE.value: None}, unit_types={})
+        self.state = SimpleNamespace(game_loop=0, upgrades=set())
+        self.minerals = 50
+        self.vespene = 0
+        self.supply_left = 1
+        self.units = Units([], self)
+        self.structures = Units([], self)
+
+    def add(self, tag: int, unit_type: UnitTypeId, abilities, structure=False) -> Unit:
+        unit = Unit(raw_pb2.Unit(tag=tag, unit_type=unit_type.value, build_progress=1, energy=50), self)
+        self._client.abilities[tag] = abilities
+        (self.structures if structure else self.units).append(unit)
+        return unit
+
+    def calculate_cost(self, ability):
+        return Cost(50, 0) if ability == AbilityId.NEXUSTRAIN_PROBE else Cost(0, 0)
+
+    def calculate_supply_cost(self, unit_type):
+        return 1
+
+
+class TestAbilityQueryService:
+    def test_queried_types_are_refreshed_once_per_frame(self):
+        bot = FakeBot()
+        nexus = bot.add(1, UnitTypeId.NEXUS, [AbilityId.NEXUSTRAIN_PROBE], structure=True)
+        stalker = bot.add(2, UnitTypeId.STALKER, [AbilityId.EFFECT_BLINK_STALKER])
+        service = AbilityQueryService(bot)
+
+        assert asyncio.run(service.available(nexus)) == [AbilityId.NEXUSTRAIN_PROBE]
+        assert asyncio.run(service.available([stalker])) == [[AbilityId.EFFECT_BLINK_STALKER]]
+        assert bot._client.requests == [[1], [2]]
+
+        # Nothing changed in the next frame
+        bot.state.game_loop = 1
+        asyncio.run(service.available(bot.units + bot.structures))
+        assert len(bot._client.requests) == 2
+        assert service.misses == 2
+        assert service.hits == 2
+
+        # The changed stalker is refreshed with the nexus, the probe that was never queried is not
+        bot.state.game_loop = 2
+        nexus._proto.orders.add(ability_id=AbilityId.NEXUSTRAIN_PROBE.value)
+        stalker._proto.orders.add(ability_id=AbilityId.ATTACK.value)
+        probe = bot.add(3, UnitTypeId.PROBE, [])
+        asyncio.run(service.available([nexus]))
+        assert bot._client.requests[-1] == [1, 2]
+        asyncio.run(service.available([stalker]))
+        assert len(bot._client.requests) == 3
+        asyncio.run(service.available([probe]))
+        assert bot._client.requests[-1] == [3]
+
+    def test_nexus_queries_do_not_carry_workers(self):
+        # LucidBot only asks about its nexuses while the orders of its probes change every frame
+        bot = FakeBot()
+        nexuses = [bot.add(tag, UnitTypeId.NEXUS, [AbilityId.NEXUSTRAIN_PROBE], structure=True) for tag in (1, 2)]
+        probes = [bot.add(tag, UnitTypeId.PROBE, []) for tag in range(10, 30)]
+        service = AbilityQueryService(bot, max_age=4)
+
+        for game_loop in range(12):
+            bot.state.game_loop = game_loop
+            for probe in probes:
+                probe._proto.orders.add(ability_id=AbilityId.HARVEST_GATHER.value)
+            asyncio.run(service.available(nexuses))
+
+        assert all(request == [1, 2] for request in bot._client.requests)
+
+    def test_resources_are_checked_locally(self):
+        bot = FakeBot()
+        nexus = bot.add(1, UnitTypeId.NEXUS, [AbilityId.NEXUSTRAIN_PROBE], structure=True)
+        service = AbilityQueryService(bot)
+
+        assert asyncio.run(service.available([nexus])) == [[AbilityId.NEXUSTRAIN_PROBE]]
+        bot.minerals = 49
+        assert asyncio.run(service.available([nexus])) == [[]]
+        assert asyncio.run(service.available([nexus], ignore_resource_requirements=True)) == [
+            [AbilityId.NEXUSTRAIN_PROBE]
+        ]
+        assert len(bot._client.requests) == 1
+
+    def test_changed_units_and_expired_cooldowns_are_queried_again(self):
+        bot = FakeBot()
+        stalker1 = bot.add(1, UnitTypeId.STALKER, [AbilityId.EFFECT_BLINK_STALKER])
+        stalker2 = bot.add(2, UnitTypeId.STALKER, [])
+        service = AbilityQueryService(bot, cooldown_recheck_loops=8)
+        asyncio.run(service.available(bot.units))
+
+        # Orders changed
+        bot.state.game_loop = 1
+        stalker1._proto.orders.add(ability_id=AbilityId.ATTACK.value)
+        asyncio.run(service.available(bot.units))
+        assert bot._client.requests[-1] == [1]
+
+        # Blink of the second stalker may be ready again
+        bot.state.game_loop = 8
+        bot._client.abilities[2] = [AbilityId.EFFECT_BLINK_STALKER]
+        assert asyncio.run(service.available(bot.units)) == [
+            [AbilityId.EFFECT_BLINK_STALKER],
+            [AbilityId.EFFECT_BLINK_STALKER],
+        ]
+        assert bot._client.requests[-1] == [2]
+        assert len(bot._client.requests) == 3
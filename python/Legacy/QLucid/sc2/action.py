@@ -1,6 +1,5 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional, Set, Tuple, Union, TYPE_CHECKING
-from itertools import groupby
 
 from s2clientprotocol import common_pb2 as common_pb
 from s2clientprotocol import raw_pb2 as raw_pb
@@ -22,42 +21,35 @@ def combine_actions(action_iter):
         UnitCommand(AbilityId.TRAINQUEEN_QUEEN, Unit(name='Lair', tag=4359979012), None, False),
         UnitCommand(AbilityId.TRAINQUEEN_QUEEN, Unit(name='Hatchery', tag=4359454723), None, False),
     ]
-    """
-    for key, items in groupby(action_iter, key=lambda a: a.combining_tuple):
-        ability: AbilityId
-        target: Union[None, Point2, Unit]
-        queue: bool
-        # See constants.py for combineable abilities
-        combineable: bool
-        ability, target, queue, combineable = key
 
+    Combineable commands with the same ability, target and queue flag are sent as one command with multiple unit tags,
+    even if they are not next to each other in the list. A command is only moved into an earlier group if its unit
+    received no other command in between, so the order of the commands of each single unit stays the same.
+    """
+    # Each group is a list of unit commands that is sent as one (combineable) or one per unit command
+    groups: List[Tuple[bool, List[UnitCommand]]] = []
+    # Index in 'groups' of the last group per (ability, target, queue) key that can still take more units
+    open_groups: Dict[Tuple[AbilityId, Any, bool], int] = {}
+    # Index in 'groups' of the last group that contains a command of the unit tag
+    last_group_of_unit: Dict[int, int] = {}
+    for action in action_iter:
+        ability, target, queue, combineable = action.combining_tuple
+        tag = action.unit.tag
         if combineable:
-            # Combine actions with no target, e.g. lift, burrowup, burrowdown, siege, unsiege, uproot spines
-            if target is None:
-                cmd = raw_pb.ActionRawUnitCommand(
-                    ability_id=ability.value, unit_tags={u.unit.tag for u in items}, queue_command=queue
-                )
-            # Combine actions with target point, e.g. attack_move or move commands on a position
-            elif isinstance(target, Point2):
-                cmd = raw_pb.ActionRawUnitCommand(
-                    ability_id=ability.value,
-                    unit_tags={u.unit.tag for u in items},
-                    queue_command=queue,
-                    target_world_space_pos=common_pb.Point2D(x=target.x, y=target.y),
-                )
-            # Combine actions with target unit, e.g. attack commands directly on a unit
-            elif isinstance(target, Unit):
-                cmd = raw_pb.ActionRawUnitCommand(
-                    ability_id=ability.value,
-                    unit_tags={u.unit.tag for u in items},
-                    queue_command=queue,
-                    target_unit_tag=target.tag,
-                )
-            else:
-                raise RuntimeError(f"Must target a unit, point or None, found '{target !r}'")
-
-            yield raw_pb.ActionRaw(unit_command=cmd)
+            key = (ability, target.tag if isinstance(target, Unit) else target, queue)
+            index = open_groups.get(key)
+            if index is not None and last_group_of_unit.get(tag, -1) < index:
+                groups[index][1].append(action)
+                last_group_of_unit[tag] = index
+                continue
+            open_groups[key] = len(groups)
+        last_group_of_unit[tag] = len(groups)
+        groups.append((combineable, [action]))
 
+    for combineable, items in groups:
+        first: UnitCommand = items[0]
+        if combineable:
+            yield _raw_unit_command(first.ability, first.target, first.queue, {u.unit.tag for u in items})
         else:
             """
             Return one action for each unit; this is required for certain commands that would otherwise be grouped, and only executed once
@@ -66,31 +58,28 @@ def combine_actions(action_iter):
             I imagine the same thing would happen to certain other abilities: Battlecruiser yamato on same target, queen transfuse on same target, ghost snipe on same target, all build commands with the same unit type and also all morphs (zergling to banelings)
             However, other abilities can and should be grouped, see constants.py 'COMBINEABLE_ABILITIES'
             """
-            u: UnitCommand
-            if target is None:
-                for u in items:
-                    cmd = raw_pb.ActionRawUnitCommand(
-                        ability_id=ability.value, unit_tags={u.unit.tag}, queue_command=queue
-                    )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
-            elif isinstance(target, Point2):
-                for u in items:
-                    cmd = raw_pb.ActionRawUnitCommand(
-                        ability_id=ability.value,
-                        unit_tags={u.unit.tag},
-                        queue_command=queue,
-                        target_world_space_pos=common_pb.Point2D(x=target.x, y=target.y),
-                    )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
+            yield _raw_unit_command(first.ability, first.target, first.queue, {first.unit.tag})
+
 
-            elif isinstance(target, Unit):
-                for u in items:
-                    cmd = raw_pb.ActionRawUnitCommand(
-                        ability_id=ability.value,
-                        unit_tags={u.unit.tag},
-                        queue_command=queue,
-                        target_unit_tag=target.tag,
-                    )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
-            else:
-                raise RuntimeError(f"Must target a unit, point or None, found '{target !r}'")
+def _raw_unit_command(
+    ability: AbilityId, target: Union[None, Point2, Unit], queue: bool, unit_tags: Set[int]
+) -> raw_pb.ActionRaw:
+    # Actions with no target, e.g. lift, burrowup, burrowdown, siege, unsiege, uproot spines
+    if target is None:
+        cmd = raw_pb.ActionRawUnitCommand(ability_id=ability.value, unit_tags=unit_tags, queue_command=queue)
+    # Actions with target point, e.g. attack_move or move commands on a position
+    elif isinstance(target, Point2):
+        cmd = raw_pb.ActionRawUnitCommand(
+            ability_id=ability.value,
+            unit_tags=unit_tags,
+            queue_command=queue,
+            target_world_space_pos=common_pb.Point2D(x=target.x, y=target.y),
+        )
+    # Actions with target unit, e.g. attack commands directly on a unit
+    elif isinstance(target, Unit):
+        cmd = raw_pb.ActionRawUnitCommand(
+            ability_id=ability.value, unit_tags=unit_tags, queue_command=queue, target_unit_tag=target.tag,
+        )
+    else:
+        raise RuntimeError(f"Must target a unit, point or None, found '{target !r}'")
+    return raw_pb.ActionRaw(unit_command=cmd)
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from s2clientprotocol import raw_pb2 as raw_pb
+
+from .action import combine_actions
+from .ids.ability_id import AbilityId
+from .position import Point2
+from .unit import Unit
+
+
+def create_unit(tag: int) -> Unit:
+    bot = mock.Mock()
+    bot.state.game_loop = 0
+    return Unit(raw_pb.Unit(tag=tag), bot)
+
+
+def commands(actions) -> list:
+    raw_actions = [action.unit_command for action in combine_actions(actions)]
+    return [(command.ability_id, sorted(command.unit_tags), command.queue_command) for command in raw_actions]
+
+
+class TestCombineActions:
+    def test_commands_with_same_ability_and_target_are_combined(self):
+        stalker1, stalker2, stalker3 = create_unit(1), create_unit(2), create_unit(3)
+        target = Point2((10, 10))
+
+        assert commands(
+            [stalker1.attack(target), stalker2.move(Point2((5, 5))), stalker3.attack(target), stalker2.attack(target)]
+        ) == [
+            (AbilityId.ATTACK.value, [1, 3], False),
+            (AbilityId.MOVE_MOVE.value, [2], False),
+            (AbilityId.ATTACK.value, [2], False),
+        ]
+
+    def test_commands_of_one_unit_keep_their_order(self):
+        stalker1, stalker2 = create_unit(1), create_unit(2)
+        target = Point2((10, 10))
+
+        assert commands(
+            [
+                stalker1.attack(target),
+                stalker1.move(Point2((5, 5)), queue=True),
+                stalker2.attack(target),
+                stalker1.attack(target, queue=True),
+                stalker2.attack(target, queue=True),
+            ]
+        ) == [
+            (AbilityId.ATTACK.value, [1, 2], False),
+            (AbilityId.MOVE_MOVE.value, [1], True),
+            (AbilityId.ATTACK.value, [1, 2], True),
+        ]
+
+    def test_unit_targets_are_combined_by_tag(self):
+        marine1, marine2 = create_unit(1), create_unit(2)
+
+        raw_actions = list(combine_actions([marine1.attack(create_unit(5)), marine2.attack(create_unit(5))]))
+
+        assert len(raw_actions) == 1
+        assert raw_actions[0].unit_command.target_unit_tag == 5
+
+    def test_commands_that_are_not_combineable_are_sent_per_unit(self):
+        hatchery1, hatchery2 = create_unit(1), create_unit(2)
+
+        assert commands([hatchery1(AbilityId.TRAINQUEEN_QUEEN), hatchery2(AbilityId.TRAINQUEEN_QUEEN)]) == [
+            (AbilityId.TRAINQUEEN_QUEEN.value, [1], False),
+            (AbilityId.TRAINQUEEN_QUEEN.value, [2], False),
+        ]
@@ -2,11 +2,14 @@ from __future__ import annotations
 import itertools
 import logging
 import math
+import os
 import random
 import time
 import warnings
 from collections import Counter
-from typing import Any, Dict, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
 from .cache import property_cache_forever, property_cache_once_per_frame, property_cache_once_per_frame_no_copy
@@ -22,6 +25,9 @@ from .constants import (
     EQUIVALENTS_FOR_TECH_PROGRESS,
     TERRAN_STRUCTURES_REQUIRE_SCV,
     IS_PLACEHOLDER,
+    IS_STRUCTURE,
+    TECHLAB_TYPES,
+    REACTOR_TYPES,
 )
 from .data import ActionResult, Alert, Race, Result, Target, race_gas, race_townhalls, race_worker
 from .distances import DistanceCalculation
@@ -38,8 +44,14 @@ from .ids.ability_id import AbilityId
 from .ids.unit_typeid import UnitTypeId
 from .ids.upgrade_id import UpgradeId
 from .pixel_map import PixelMap
+from .pathing_grid_tracker import PathingGridTracker
+from .ability_query_service import AbilityQueryService
+from .pathing_query_service import PathingQueryService
+from .placement_engine import PlacementEngine, ring_positions
 from .position import Point2
+from .step_profiler import StepProfiler
 from .unit import Unit
+from .unit_columns import UnitColumns
 from .units import Units
 from .game_data import Cost
 from .unit_command import UnitCommand
@@ -55,6 +67,8 @@ class BotAI(DistanceCalculation):
     """Base class for bots."""
 
     EXPANSION_GAP_THRESHOLD = 15
+    # Names of the work that the bot skips on degraded steps, see should_skip
+    optional_work: FrozenSet[str] = frozenset()
 
     def _initialize_variables(self):
         """ Called from main.py internally """
@@ -71,6 +85,42 @@ class BotAI(DistanceCalculation):
         # Select if the Unit.command should return UnitCommand objects. Set this to True if your bot uses 'self.do(unit(ability, target))'
         if not hasattr(self, "unit_command_uses_self_do"):
             self.unit_command_uses_self_do: bool = False
+        # Set this to True to update 'self.game_info.pathing_grid' from structure footprints instead of requesting the game info every step, see pathing_grid_tracker.py
+        if not hasattr(self, "incremental_pathing_grid"):
+            self.incremental_pathing_grid: bool = False
+        # Amount of game loops after which the incremental pathing grid is always requested from the game again
+        if not hasattr(self, "pathing_grid_resync_interval"):
+            self.pathing_grid_resync_interval: int = 224
+        self._pathing_grid_tracker: Optional[PathingGridTracker] = None
+        # Set this to True to check building placements locally in find_placement before querying the game
+        if not hasattr(self, "local_placement"):
+            self.local_placement: bool = False
+        self._placement_engine: Optional[PlacementEngine] = None
+        # Maximum amount of memoized pathing query results, see pathing_query_service.py
+        if not hasattr(self, "pathing_query_cache_size"):
+            self.pathing_query_cache_size: int = 4096
+        # Set this to True to memoize available abilities per unit, see ability_query_service.py
+        if not hasattr(self, "cached_abilities"):
+            self.cached_abilities: bool = False
+        self.ability_queries: Optional[AbilityQueryService] = None
+        # Directory to record the game responses to, one file per game, see observation_recorder.py
+        if not hasattr(self, "observation_record_dir"):
+            self.observation_record_dir: Optional[str] = None
+        # Set this to True to decode the observed units column-wise into numpy arrays, see unit_columns.py
+        if not hasattr(self, "columnar_units"):
+            self.columnar_units: bool = False
+        self._unit_columns: Optional[UnitColumns] = None
+        # Directory to write the step time report to at the end of the game, one JSON and one CSV file per game, see step_profiler.py
+        if not hasattr(self, "step_profile_dir"):
+            self.step_profile_dir: Optional[str] = None
+        self.step_profiler: Optional[StepProfiler] = StepProfiler() if self.step_profile_dir is not None else None
+        self._time_before_prepare_step: float = None
+        # Share of the step time limit of run_game after which steps are degraded, None to never degrade, see should_skip
+        if not hasattr(self, "degrade_threshold"):
+            self.degrade_threshold: Optional[float] = 0.75
+        # This value will be set to True by main.py on steps that should skip the work listed in self.optional_work
+        self.degraded: bool = False
+        self.degraded_steps: int = 0
         # This value will be set to True by main.py in self._prepare_start if game is played in realtime (if true, the bot will have limited time per step)
         self.realtime: bool = False
         self.all_units: Units = Units([], self)
@@ -418,6 +468,8 @@ class BotAI(DistanceCalculation):
 
         :param units:
         :param ignore_resource_requirements: """
+        if self.ability_queries is not None:
+            return await self.ability_queries.available(units, ignore_resource_requirements)
         return await self._client.query_available_abilities(units, ignore_resource_requirements)
 
     async def expand_now(
@@ -453,6 +505,7 @@ class BotAI(DistanceCalculation):
 
         closest = None
         distance = math.inf
+        free_locations = []
         for el in self.expansion_locations_list:
 
             def is_near_to_expansion(t):
@@ -461,9 +514,13 @@ class BotAI(DistanceCalculation):
             if any(map(is_near_to_expansion, self.townhalls)):
                 # already taken
                 continue
+            free_locations.append(el)
 
-            startp = self._game_info.player_start_location
-            d = await self._client.query_pathing(startp, el)
+        if not free_locations:
+            return None
+        startp = self._game_info.player_start_location
+        distances = await self.pathing_queries.distances([(startp, el) for el in free_locations])
+        for el, d in zip(free_locations, distances):
             if d is None:
                 continue
 
@@ -893,6 +950,9 @@ class BotAI(DistanceCalculation):
         else:  # AbilityId
             building = self._game_data.abilities[building.value]
 
+        if self._placement_engine is not None and self._placement_engine.supports(building):
+            return await self._find_placement_local(building, near, max_distance, random_alternative, placement_step)
+
         if await self.can_place(building, near):
             return near
 
@@ -900,15 +960,7 @@ class BotAI(DistanceCalculation):
             return None
 
         for distance in range(placement_step, max_distance, placement_step):
-            possible_positions = [
-                Point2(p).offset(near).to2
-                for p in (
-                    [(dx, -distance) for dx in range(-distance, distance + 1, placement_step)]
-                    + [(dx, distance) for dx in range(-distance, distance + 1, placement_step)]
-                    + [(-distance, dy) for dy in range(-distance, distance + 1, placement_step)]
-                    + [(distance, dy) for dy in range(-distance, distance + 1, placement_step)]
-                )
-            ]
+            possible_positions = ring_positions(near, distance, placement_step)
             res = await self._client.query_building_placement(building, possible_positions)
             possible = [p for r, p in zip(res, possible_positions) if r == ActionResult.Success]
             if not possible:
@@ -920,6 +972,38 @@ class BotAI(DistanceCalculation):
                 return min(possible, key=lambda p: p.distance_to_point2(near))
         return None
 
+    async def _find_placement_local(
+        self, building: AbilityData, near: Point2, max_distance: int, random_alternative: bool, placement_step: int,
+    ) -> Optional[Point2]:
+        """ Same result as find_placement, but all rings are checked with the placement engine first and the positions
+        that pass are confirmed with a single placement query. The engine only rejects positions that are certainly
+        invalid, so no query is sent when every position is rejected. """
+        rings: List[List[Point2]] = [[near]]
+        if max_distance != 0:
+            rings += [
+                ring_positions(near, distance, placement_step)
+                for distance in range(placement_step, max_distance, placement_step)
+            ]
+        positions = [position for ring in rings for position in ring]
+        locally_valid = self._placement_engine.check(building, positions).tolist()
+        candidates = [position for position, valid in zip(positions, locally_valid) if valid]
+        if not candidates:
+            return None
+        confirmed = iter(await self._client._query_building_placement_fast(building, candidates))
+
+        valid_iter = iter(locally_valid)
+        for ring_index, ring in enumerate(rings):
+            possible = [p for p in ring if next(valid_iter) and next(confirmed)]
+            if not possible:
+                continue
+            if ring_index == 0:
+                return near
+            if random_alternative:
+                return random.choice(possible)
+            else:
+                return min(possible, key=lambda p: p.distance_to_point2(near))
+        return None
+
     # TODO: improve using cache per frame
     def already_pending_upgrade(self, upgrade_type: UpgradeId) -> float:
         """ Check if an upgrade is being researched
@@ -1598,6 +1682,23 @@ class BotAI(DistanceCalculation):
         pos = pos.position.to2.rounded
         return self.state.creep[pos] == 1
 
+    def should_skip(self, work: str) -> bool:
+        """ Returns True if the work is listed in self.optional_work and the current step is degraded.
+        Steps are degraded by main.py when the step time limit of run_game is about to run out.
+
+        Example::
+
+            class MyBot(BotAI):
+                optional_work = frozenset({"debug"})
+
+                async def on_step(self, iteration: int):
+                    ...
+                    if not self.should_skip("debug"):
+                        self._client.debug_text_screen(f"Iteration: {iteration}")
+
+        :param work: """
+        return self.degraded and work in self.optional_work
+
     def _prepare_start(self, client, player_id, game_info, game_data, realtime: bool = False):
         """
         Ran until game start to set game and player data.
@@ -1620,6 +1721,34 @@ class BotAI(DistanceCalculation):
             self.enemy_race: Race = Race(self._game_info.player_races[3 - self.player_id])
 
         self._distances_override_functions(self.distance_calculation_method)
+        if self.incremental_pathing_grid:
+            self._pathing_grid_tracker = PathingGridTracker(self.pathing_grid_resync_interval)
+        if self.local_placement:
+            self._placement_engine = PlacementEngine(self)
+        self.pathing_queries: PathingQueryService = PathingQueryService(
+            self._client, lambda: self._footprint_version, max_size=self.pathing_query_cache_size
+        )
+        if self.cached_abilities:
+            self.ability_queries = AbilityQueryService(self)
+        if client is not None:
+            client.step_profiler = self.step_profiler
+
+    @property_cache_once_per_frame
+    def _footprint_version(self) -> int:
+        """ Changes when structures, rocks or resources were added or removed. """
+        if self._pathing_grid_tracker is not None:
+            return self._pathing_grid_tracker.version
+        return hash(
+            frozenset(
+                unit.tag
+                for units in (self.structures, self.enemy_structures, self.destructables, self.resources)
+                for unit in units
+            )
+        )
+
+    def _needs_game_info(self, state: GameState) -> bool:
+        """ Returns False if the pathing grid can be updated without requesting the game info this step. """
+        return self._pathing_grid_tracker is None or self._pathing_grid_tracker.needs_resync(state)
 
     def _prepare_first_step(self):
         """First step extra preparations. Must not be called before _prepare_step."""
@@ -1633,14 +1762,16 @@ class BotAI(DistanceCalculation):
     def _prepare_step(self, state, proto_game_info):
         """
         :param state:
-        :param proto_game_info:
+        :param proto_game_info: can be None if the pathing grid is updated incrementally, see self._needs_game_info
         """
         # Set attributes from new state before on_step."""
+        self._time_before_prepare_step = time.perf_counter()
         self.state: GameState = state  # See game_state.py
         # update pathing grid
-        self._game_info.pathing_grid: PixelMap = PixelMap(
-            proto_game_info.game_info.start_raw.pathing_grid, in_bits=True, mirrored=False
-        )
+        if proto_game_info is not None:
+            self._game_info.pathing_grid: PixelMap = PixelMap(
+                proto_game_info.game_info.start_raw.pathing_grid, in_bits=True, mirrored=False
+            )
         # Required for events, needs to be before self.units are initialized so the old units are stored
         self._units_previous_map: Dict[int:Unit] = {unit.tag: unit for unit in self.units}
         self._structures_previous_map: Dict[int:Unit] = {structure.tag: structure for structure in self.structures}
@@ -1650,6 +1781,11 @@ class BotAI(DistanceCalculation):
         }
 
         self._prepare_units()
+        if self._pathing_grid_tracker is not None:
+            if proto_game_info is not None:
+                self._pathing_grid_tracker.resync(self)
+            else:
+                self._pathing_grid_tracker.update(self)
         self.minerals: int = state.common.minerals
         self.vespene: int = state.common.vespene
         self.supply_army: int = state.common.food_army
@@ -1667,8 +1803,22 @@ class BotAI(DistanceCalculation):
         self.idle_worker_count: int = state.common.idle_worker_count
         self.army_count: int = state.common.army_count
         self._time_before_step: float = time.perf_counter()
+        if self.step_profiler is not None:
+            self.step_profiler.record("bot.prepare_step", self._time_before_step - self._time_before_prepare_step)
+
+    @property_cache_forever
+    def _structure_types(self) -> np.ndarray:
+        """ Lookup table indexed by unit type value, True if the unit type has the structure attribute. """
+        table = np.zeros(max(self._game_data.units, default=0) + 1, dtype=bool)
+        for unit_type, unit_data in self._game_data.units.items():
+            table[unit_type] = IS_STRUCTURE in unit_data.attributes
+        return table
 
     def _prepare_units(self):
+        if self.columnar_units:
+            self._prepare_units_columnar()
+            return
+        self._unit_columns = None
         # Set of enemy units detected by own sensor tower, as blips have less unit information than normal visible units
         self.blips: Set[Blip] = set()
         self.placeholders: Units = Units([], self)
@@ -1692,6 +1842,8 @@ class BotAI(DistanceCalculation):
         worker_types: Set[UnitTypeId] = {UnitTypeId.DRONE, UnitTypeId.DRONEBURROWED, UnitTypeId.SCV, UnitTypeId.PROBE}
 
         index: int = 0
+        # Frame-level tag lookup of all_units, built here so all_units does not have to build it on first lookup
+        units_by_tag: Dict[int, Unit] = {}
         for unit in self.state.observation_raw.units:
             if unit.is_blip:
                 self.blips.add(Blip(unit))
@@ -1704,6 +1856,7 @@ class BotAI(DistanceCalculation):
                 unit_obj = Unit(unit, self, distance_calculation_index=index)
                 index += 1
                 self.all_units.append(unit_obj)
+                units_by_tag[unit.tag] = unit_obj
                 if unit.display_type == IS_PLACEHOLDER:
                     self.placeholders.append(unit_obj)
                     continue
@@ -1734,19 +1887,9 @@ class BotAI(DistanceCalculation):
                         elif unit_id in ALL_GAS or unit_obj.vespene_contents:
                             # TODO: remove "or unit_obj.vespene_contents" when a new linux client newer than version 4.10.0 is released
                             self.gas_buildings.append(unit_obj)
-                        elif unit_id in {
-                            UnitTypeId.TECHLAB,
-                            UnitTypeId.BARRACKSTECHLAB,
-                            UnitTypeId.FACTORYTECHLAB,
-                            UnitTypeId.STARPORTTECHLAB,
-                        }:
+                        elif unit_id in TECHLAB_TYPES:
                             self.techlab_tags.add(unit_obj.tag)
-                        elif unit_id in {
-                            UnitTypeId.REACTOR,
-                            UnitTypeId.BARRACKSREACTOR,
-                            UnitTypeId.FACTORYREACTOR,
-                            UnitTypeId.STARPORTREACTOR,
-                        }:
+                        elif unit_id in REACTOR_TYPES:
                             self.reactor_tags.add(unit_obj.tag)
                     else:
                         self.units.append(unit_obj)
@@ -1760,6 +1903,7 @@ class BotAI(DistanceCalculation):
                         self.enemy_structures.append(unit_obj)
                     else:
                         self.enemy_units.append(unit_obj)
+        self.all_units._tag_map = units_by_tag
 
         # Force distance calculation and caching on all units using scipy pdist or cdist
         if self.distance_calculation_method == 1:
@@ -1767,6 +1911,79 @@ class BotAI(DistanceCalculation):
         elif self.distance_calculation_method in {2, 3}:
             _ = self._cdist
 
+    def _prepare_units_columnar(self):
+        """ Same as _prepare_units, but the units are decoded into numpy columns once and sorted into the
+        collections with vectorized masks. The collections are index views, so Unit objects are only created for
+        units that are accessed. """
+        self.blips: Set[Blip] = set()
+        protos = []
+        for unit in self.state.observation_raw.units:
+            if unit.is_blip:
+                self.blips.add(Blip(unit))
+            # Convert these units to effects: reaper grenade, parasitic bomb dummy, forcefield
+            elif unit.unit_type in FakeEffectID:
+                self.state.effects.add(EffectData(unit, fake=True))
+            else:
+                protos.append(unit)
+
+        columns = self._unit_columns = UnitColumns(protos, self)
+        type_ids = columns.type_id
+        structure_types = self._structure_types
+        is_structure = np.zeros(len(columns), dtype=bool)
+        known = type_ids < len(structure_types)
+        is_structure[known] = structure_types[type_ids[known]]
+
+        placeholder = columns.display_type == IS_PLACEHOLDER
+        # Alliance.Neutral.value = 3, Alliance.Self.value = 1, Alliance.Enemy.value = 4
+        neutral = (columns.alliance == 3) & ~placeholder
+        own = (columns.alliance == 1) & ~placeholder
+        enemy = (columns.alliance == 4) & ~placeholder
+        own_structure = own & is_structure
+        own_unit = own & ~is_structure
+        # XELNAGATOWER = 149
+        watchtower = neutral & (type_ids == 149)
+        mineral_field = neutral & columns.type_in(mineral_ids)
+        vespene_geyser = neutral & columns.type_in(geyser_ids)
+        townhall = own_structure & columns.type_in(t.value for t in race_townhalls[self.race])
+        # TODO: remove "columns.vespene_contents > 0" when a new linux client newer than version 4.10.0 is released
+        gas_building = (
+            own_structure & ~townhall & (columns.type_in(t.value for t in ALL_GAS) | (columns.vespene_contents > 0))
+        )
+        add_on = own_structure & ~townhall & ~gas_building
+        worker = own_unit & columns.type_in(
+            t.value for t in {UnitTypeId.DRONE, UnitTypeId.DRONEBURROWED, UnitTypeId.SCV, UnitTypeId.PROBE}
+        )
+
+        def units(mask: np.ndarray) -> Units:
+            return columns.units(np.flatnonzero(mask))
+
+        self.all_units: Units = columns.units(np.arange(len(columns)))
+        self.placeholders: Units = units(placeholder)
+        self.units: Units = units(own_unit)
+        self.workers: Units = units(worker)
+        self.larva: Units = units(own_unit & ~worker & (type_ids == UnitTypeId.LARVA.value))
+        self.structures: Units = units(own_structure)
+        self.townhalls: Units = units(townhall)
+        self.gas_buildings: Units = units(gas_building)
+        self.enemy_units: Units = units(enemy & ~is_structure)
+        self.enemy_structures: Units = units(enemy & is_structure)
+        self.watchtowers: Units = units(watchtower)
+        self.mineral_field: Units = units(mineral_field)
+        self.vespene_geyser: Units = units(vespene_geyser)
+        self.resources: Units = units(mineral_field | vespene_geyser)
+        self.destructables: Units = units(neutral & ~watchtower & ~mineral_field & ~vespene_geyser)
+        self.techlab_tags: Set[int] = set(
+            columns.tag[add_on & columns.type_in(t.value for t in TECHLAB_TYPES)].tolist()
+        )
+        self.reactor_tags: Set[int] = set(
+            columns.tag[add_on & columns.type_in(t.value for t in REACTOR_TYPES)].tolist()
+        )
+
+        if self.distance_calculation_method == 1:
+            _ = self._pdist
+        elif self.distance_calculation_method in {2, 3}:
+            _ = self._cdist
+
     async def _after_step(self) -> int:
         """ Executed by main.py after each on_step function. """
         # Keep track of the bot on_step duration
@@ -1786,8 +2003,24 @@ class BotAI(DistanceCalculation):
         # Commit debug queries
         await self._client._send_debug()
 
+        if self.step_profiler is not None:
+            time_after_actions = time.perf_counter()
+            # issue_events and on_step
+            self.step_profiler.record("bot.step", step_duration)
+            self.step_profiler.record("bot.after_step", time_after_actions - self._time_after_step)
+            self.step_profiler.end_step(self.state.game_loop, time_after_actions - self._time_before_prepare_step)
         return self.state.game_loop
 
+    def _write_step_profile(self):
+        """ Writes the step time report of the game to 'step_profile_dir', called by main.py at the end of the game. """
+        if self.step_profiler is None or not self.step_profiler.steps:
+            return
+        os.makedirs(self.step_profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{type(self).__name__}_player{self.player_id}_steps"
+        path = os.path.join(self.step_profile_dir, name)
+        self.step_profiler.write_reports(path)
+        logger.info(f"Step time report written to {path}.json and {path}.csv")
+
     async def _advance_steps(self, steps: int):
         """ Advances the game loop by amount of 'steps'. This function is meant to be used as a debugging and testing tool only.
         If you are using this, please be aware of the consequences, e.g. 'self.units' will be filled with completely new data. """
@@ -1809,11 +2042,14 @@ class BotAI(DistanceCalculation):
         - on_building_construction_complete
         - on_upgrade_complete
         """
+        events_start = time.perf_counter()
         await self._issue_unit_dead_events()
         await self._issue_unit_added_events()
         await self._issue_building_events()
         await self._issue_upgrade_events()
         await self._issue_vision_events()
+        if self.step_profiler is not None:
+            self.step_profiler.record("bot.issue_events", time.perf_counter() - events_start)
 
     async def _issue_unit_added_events(self):
         for unit in self.units:
@@ -75,6 +75,23 @@ def property_immutable_cache(f):
     return property(inner)
 
 
+def property_slot_cache(f):
+    """ Same as property_immutable_cache, but the value is stored in the slot '_cached_<name>' of the instance instead of
+    the cache dict. The class has to declare that slot in its __slots__ and set it to None in __init__,
+    so this can only be used on properties that never return None. """
+    slot = "_cached_" + f.__name__.lstrip("_")
+
+    @wraps(f)
+    def inner(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = f(self)
+            setattr(self, slot, value)
+        return value
+
+    return property(inner)
+
+
 def property_mutable_cache(f):
     """ This cache should only be used on properties that return a mutable object (Units, list, set, dict, Counter) """
 
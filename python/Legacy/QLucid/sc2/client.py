@@ -14,6 +14,7 @@ from .game_data import AbilityData, GameData
 from .game_info import GameInfo
 from .ids.ability_id import AbilityId
 from .ids.unit_typeid import UnitTypeId
+from .observation_recorder import ObservationRecorder, RECORDED_REQUESTS
 from .position import Point2, Point3
 from .protocol import Protocol, ProtocolError
 from .renderer import Renderer
@@ -43,6 +44,35 @@ class Client(Protocol):
 
         self._renderer = None
         self.raw_affects_selection = False
+        # Statistics of 'self.actions': unit commands given and raw commands sent after combining them
+        self.unit_commands_count: int = 0
+        self.raw_commands_count: int = 0
+        # Records the game data, game info and observation responses if set, see start_recording
+        self._recorder: Optional[ObservationRecorder] = None
+
+    async def _execute(self, **kwargs):
+        response = await super()._execute(**kwargs)
+        if self._recorder is not None and not RECORDED_REQUESTS.isdisjoint(kwargs):
+            self._recorder.record(response)
+        return response
+
+    def start_recording(self, path: str, player_id: int):
+        """ Writes all game data, game info and observation responses to 'path' until stop_recording is called.
+
+        :param path:
+        :param player_id: """
+        self.stop_recording()
+        self._recorder = ObservationRecorder(path, player_id)
+
+    def stop_recording(self):
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    @property
+    def merged_commands_count(self) -> int:
+        """ Amount of unit commands that were sent as part of another command with multiple unit tags. """
+        return self.unit_commands_count - self.raw_commands_count
 
     @property
     def in_game(self):
@@ -187,10 +217,13 @@ class Client(Protocol):
         elif not isinstance(actions, list):
             actions = [actions]
 
+        raw_actions = list(combine_actions(actions))
+        self.unit_commands_count += len(actions)
+        self.raw_commands_count += len(raw_actions)
         # On realtime=True, might get an error here: sc2.protocol.ProtocolError: ['Not in a game']
         try:
             res = await self._execute(
-                action=sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a in combine_actions(actions)))
+                action=sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a in raw_actions))
             )
         except ProtocolError as e:
             return []
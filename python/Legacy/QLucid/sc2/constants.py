@@ -309,6 +309,7 @@ UNIT_COLOSSUS: UnitTypeId = UnitTypeId.COLOSSUS
 # Used in unit_command.py and action.py to combine only certain abilities
 COMBINEABLE_ABILITIES: Set[AbilityId] = {
     AbilityId.MOVE,
+    AbilityId.MOVE_MOVE,
     AbilityId.ATTACK,
     AbilityId.SCAN_MOVE,
     AbilityId.SMART,
@@ -467,6 +468,18 @@ ALL_GAS: Set[UnitTypeId] = {
     UnitTypeId.EXTRACTOR,
     UnitTypeId.EXTRACTORRICH,
 }
+TECHLAB_TYPES: Set[UnitTypeId] = {
+    UnitTypeId.TECHLAB,
+    UnitTypeId.BARRACKSTECHLAB,
+    UnitTypeId.FACTORYTECHLAB,
+    UnitTypeId.STARPORTTECHLAB,
+}
+REACTOR_TYPES: Set[UnitTypeId] = {
+    UnitTypeId.REACTOR,
+    UnitTypeId.BARRACKSREACTOR,
+    UnitTypeId.FACTORYREACTOR,
+    UnitTypeId.STARPORTREACTOR,
+}
 """
 How much damage a unit gains per weapon upgrade per attack
 E.g. marauder receives +1 normal damage and +1 vs armored, so we have to list +1 vs armored here - the +1 normal damage is assumed
@@ -32,6 +32,16 @@ class DistanceCalculation:
     def _units_count(self) -> int:
         return len(self.all_units)
 
+    def _positions_array(self) -> np.ndarray:
+        """ Positions of all units as array of shape (n, 2), row i belongs to the unit with distance_calculation_index i. """
+        unit_columns = getattr(self, "_unit_columns", None)
+        if unit_columns is not None:
+            return unit_columns.positions
+        # Converts tuple [(1, 2), (3, 4)] to flat list like [1, 2, 3, 4]
+        flat_positions = (coord for unit in self.all_units for coord in unit.position_tuple)
+        # Converts to numpy array, then converts the flat array back to shape (n, 2): [[1, 2], [3, 4]]
+        return np.fromiter(flat_positions, dtype=float, count=2 * self._units_count).reshape((self._units_count, 2))
+
     @property
     def _pdist(self) -> np.ndarray:
         """ As property, so it will be recalculated each time it is called, or return from cache if it is called multiple times in teh same game_loop. """
@@ -48,12 +58,7 @@ class DistanceCalculation:
 
     def _calculate_distances_method1(self) -> np.ndarray:
         self._generated_frame2 = self.state.game_loop
-        # Converts tuple [(1, 2), (3, 4)] to flat list like [1, 2, 3, 4]
-        flat_positions = (coord for unit in self.all_units for coord in unit.position_tuple)
-        # Converts to numpy array, then converts the flat array back to shape (n, 2): [[1, 2], [3, 4]]
-        positions_array: np.ndarray = np.fromiter(flat_positions, dtype=np.float, count=2 * self._units_count).reshape(
-            (self._units_count, 2)
-        )
+        positions_array: np.ndarray = self._positions_array()
         assert len(positions_array) == self._units_count
         # See performance benchmarks
         self._cached_pdist = pdist(positions_array, "sqeuclidean")
@@ -62,12 +67,7 @@ class DistanceCalculation:
 
     def _calculate_distances_method2(self) -> np.ndarray:
         self._generated_frame2 = self.state.game_loop
-        # Converts tuple [(1, 2), (3, 4)] to flat list like [1, 2, 3, 4]
-        flat_positions = (coord for unit in self.all_units for coord in unit.position_tuple)
-        # Converts to numpy array, then converts the flat array back to shape (n, 2): [[1, 2], [3, 4]]
-        positions_array: np.ndarray = np.fromiter(flat_positions, dtype=np.float, count=2 * self._units_count).reshape(
-            (self._units_count, 2)
-        )
+        positions_array: np.ndarray = self._positions_array()
         assert len(positions_array) == self._units_count
         # See performance benchmarks
         self._cached_cdist = cdist(positions_array, positions_array, "sqeuclidean")
@@ -77,10 +77,7 @@ class DistanceCalculation:
     def _calculate_distances_method3(self) -> np.ndarray:
         """ Nearly same as above, but without asserts"""
         self._generated_frame2 = self.state.game_loop
-        flat_positions = (coord for unit in self.all_units for coord in unit.position_tuple)
-        positions_array: np.ndarray = np.fromiter(flat_positions, dtype=np.float, count=2 * self._units_count).reshape(
-            (-1, 2)
-        )
+        positions_array: np.ndarray = self._positions_array()
         # See performance benchmarks
         self._cached_cdist = cdist(positions_array, positions_array, "sqeuclidean")
 
@@ -138,6 +135,33 @@ class DistanceCalculation:
         """ This function does not scale well, if len(units) > 100 it gets fairly slow """
         return (self.distance_math_hypot(u.position_tuple, pos) for u in units)
 
+    # Vectorized distance calculation for Units objects, see Units.VECTORIZED_QUERY_MIN_UNITS
+
+    def _distances_squared_units_to_unit(self, units: Units, unit: Unit) -> np.ndarray:
+        """ Same as _distance_squared_unit_to_unit for every unit of 'units', as numpy array in the order of 'units'. """
+        if self.distance_calculation_method in {2, 3}:
+            return self._cdist[units._distance_calculation_indices(), unit.distance_calculation_index]
+        positions = units._positions_array()
+        x, y = unit.position_tuple
+        dx = positions[:, 0] - x
+        dy = positions[:, 1] - y
+        return dx * dx + dy * dy
+
+    def _distances_squared_units_to_units(self, units1: Units, units2: Units) -> np.ndarray:
+        """ Squared distances between all units of 'units1' (rows) and all units of 'units2' (columns). """
+        if self.distance_calculation_method in {2, 3}:
+            return self._cdist[np.ix_(units1._distance_calculation_indices(), units2._distance_calculation_indices())]
+        positions1 = units1._positions_array()
+        positions2 = units2._positions_array()
+        dx = positions1[:, 0, None] - positions2[None, :, 0]
+        dy = positions1[:, 1, None] - positions2[None, :, 1]
+        return dx * dx + dy * dy
+
+    def _distances_units_to_pos_array(self, units: Units, pos: Tuple[float, float]) -> np.ndarray:
+        """ Same as _distance_units_to_pos, as numpy array. """
+        positions = units._positions_array()
+        return np.hypot(positions[:, 0] - pos[0], positions[:, 1] - pos[1])
+
     def _distance_unit_to_points(
         self, unit: Unit, points: Iterable[Tuple[float, float]]
     ) -> Generator[float, None, None]:
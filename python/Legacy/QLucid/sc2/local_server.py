@@ -0,0 +1,128 @@
+from __future__ import annotations
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, Optional, Union, TYPE_CHECKING
+
+import aiohttp
+import portpicker
+from aiohttp import web
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from .client import Client
+from .data import Result, Status
+from .main import _play_game
+from .observation_replayer import RecordedGame
+from .player import Bot
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+
+logger = logging.getLogger(__name__)
+
+
+class LocalServer:
+    """ Websocket server that speaks the s2client protocol in place of the game, so that the protocol and the step loop
+    can be run and profiled without the game binary.
+
+    Every request is answered by a RecordedGame (or any object with the same 'respond' method).
+    The latency is added before each response is sent, either the same for all requests or per request type,
+    e.g. {"observation": 0.005, "query": 0.002}. Request types that are missing have no latency.
+
+    Example::
+
+        async with LocalServer(RecordedGame("recordings/game.sc2obs"), latency=0.002) as server:
+            result = await play_local_game(bot, server)
+    """
+
+    def __init__(
+        self, game: RecordedGame, latency: Union[float, Dict[str, float]] = 0, host: str = "127.0.0.1", port: int = None
+    ):
+        """
+        :param game:
+        :param latency: seconds before each response is sent
+        :param host:
+        :param port: an unused port is picked if None
+        """
+        self.game: RecordedGame = game
+        self.latency: Union[float, Dict[str, float]] = latency
+        self.host: str = host
+        self.port: int = port or portpicker.pick_unused_port()
+        self._runner: Optional[web.AppRunner] = None
+        # Statistics
+        self.request_counts: Counter = Counter()
+        self.request_bytes: int = 0
+        self.response_bytes: int = 0
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/sc2api"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/sc2api", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Local server listening on {self.ws_url}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> LocalServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    def _latency(self, kind: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(kind, 0)
+        return self.latency
+
+    async def _handle(self, http_request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(http_request)
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.BINARY:
+                continue
+            request = sc_pb.Request()
+            request.ParseFromString(message.data)
+            kind = request.WhichOneof("request")
+            self.request_counts[kind] += 1
+            self.request_bytes += len(message.data)
+
+            response = self.game.respond(request)
+            if not response.HasField("status"):
+                response.status = Status.in_game.value
+            latency = self._latency(kind)
+            if latency > 0:
+                await asyncio.sleep(latency)
+            data = response.SerializeToString()
+            self.response_bytes += len(data)
+            await ws.send_bytes(data)
+        return ws
+
+
+async def play_local_game(
+    ai: BotAI, server: LocalServer, realtime: bool = False, step_time_limit=None, game_time_limit=None
+) -> Result:
+    """ Plays the game of a started LocalServer with the same game loop as run_game.
+
+    :param ai:
+    :param server:
+    :param realtime:
+    :param step_time_limit: see main._play_game_ai
+    :param game_time_limit: """
+    async with aiohttp.ClientSession() as session:
+        ws = await session.ws_connect(server.ws_url)
+        try:
+            client = Client(ws)
+            return await _play_game(
+                Bot(server.game.race, ai), client, realtime, None, step_time_limit, game_time_limit
+            )
+        finally:
+            await ws.close()
@@ -0,0 +1,75 @@
+import asyncio
+
+from .data import Result
+from .local_server import LocalServer, play_local_game
+from .observation_replayer import RecordedGame
+from .observation_replayer_test import MoveBot, record_game
+
+
+class SlowBot(MoveBot):
+    async def on_step(self, iteration: int):
+        await super().on_step(iteration)
+        if iteration == 1:
+            # Cut off by the step time limit
+            await asyncio.sleep(60)
+
+
+class DegradingBot(MoveBot):
+    optional_work = frozenset({"slow_work"})
+
+    def __init__(self):
+        super().__init__()
+        self.degraded_history = []
+
+    async def on_step(self, iteration: int):
+        await super().on_step(iteration)
+        self.degraded_history.append(self.degraded)
+        if not self.should_skip("slow_work"):
+            await asyncio.sleep(0.06)
+
+
+async def play(path: str, bot, latency=0, step_time_limit=None):
+    async with LocalServer(RecordedGame(path), latency=latency) as server:
+        result = await play_local_game(bot, server, step_time_limit=step_time_limit)
+    return result, server
+
+
+class TestLocalServer:
+    def test_game_is_played_over_websocket(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 4)
+        bot = MoveBot()
+
+        result, server = asyncio.run(play(path, bot, latency={"observation": 0.001}))
+
+        assert result == Result.Victory
+        assert [step[:2] for step in bot.steps] == [(0, 0), (1, 8), (2, 16), (3, 24)]
+        assert server.request_counts["join_game"] == 1
+        assert server.request_counts["action"] == 4
+        assert server.request_counts["step"] == 4
+        assert server.response_bytes > 0
+
+    def test_step_time_limit_resigns(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 4)
+        bot = SlowBot()
+
+        result, _server = asyncio.run(play(path, bot, step_time_limit=0.5))
+
+        assert result == Result.Defeat
+        assert len(bot.steps) == 2
+
+    def test_steps_are_degraded_before_time_limit(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 8)
+        bot = DegradingBot()
+
+        result, _server = asyncio.run(
+            play(path, bot, step_time_limit={"time_limit": 0.1, "window_size": 3, "penalty": None})
+        )
+
+        assert result == Result.Victory
+        # Two full steps use more than 75% of the window, the exact steps depend on the timing, see main_test.py
+        history = bot.degraded_history
+        assert True in history and False in history[history.index(True) :]
+        assert bot.degraded_steps == history.count(True)
@@ -18,6 +18,9 @@ from .sc2process import SC2Process
 
 logger = logging.getLogger(__name__)
 
+# Degraded steps end once the time used in the window is below this share of 'BotAI.degrade_threshold'
+DEGRADE_RECOVERY = 0.75
+
 
 class SlidingTimeWindow:
     def __init__(self, size: int):
@@ -45,6 +48,20 @@ class SlidingTimeWindow:
         return ",".join(f"{w:.2f}" for w in self.window[1:])
 
 
+def _update_degraded(ai, time_window: SlidingTimeWindow, time_limit: float, full_step_time: float):
+    """ Switches the bot to degraded steps when the time used in the window and the last full step together would use
+    more than 'degrade_threshold' of the time limit, and back to full steps once the window has recovered. """
+    if ai.degrade_threshold is None:
+        return
+    if ai.degraded:
+        if time_window.available < time_limit * ai.degrade_threshold * DEGRADE_RECOVERY:
+            ai.degraded = False
+            logger.debug(f"Running AI step: full step, window={time_window.available_fmt}")
+    elif time_window.available + full_step_time > time_limit * ai.degrade_threshold:
+        ai.degraded = True
+        logger.debug(f"Running AI step: degraded step, last full step {full_step_time:.3f}s")
+
+
 async def _play_game_human(client, player_id, realtime, game_time_limit):
     while True:
         state = await client.observation()
@@ -79,7 +96,12 @@ async def _play_game_ai(client, player_id, ai, realtime, step_time_limit, game_t
     # Cooldown is a harsh penalty. The both loses the ability to act, but even worse,
     # the observation data from skipped steps is also lost. It's like falling asleep in
     # a middle of the game.
+    #
+    # Before that the bot is switched to degraded steps, where it skips the work it declared optional,
+    # see BotAI.degrade_threshold and BotAI.should_skip.
     time_penalty_cooldown = 0
+    # Time of the last step that was not degraded
+    full_step_time = 0.0
     if step_time_limit is None:
         time_limit = None
         time_window = None
@@ -95,6 +117,10 @@ async def _play_game_ai(client, player_id, ai, realtime, step_time_limit, game_t
         time_limit = float(step_time_limit.get("time_limit", None))
 
     ai._initialize_variables()
+    if ai.observation_record_dir is not None:
+        os.makedirs(ai.observation_record_dir, exist_ok=True)
+        record_name = f"{time.strftime('%Y%m%d_%H%M%S')}_{type(ai).__name__}_player{player_id}.sc2obs"
+        client.start_recording(os.path.join(ai.observation_record_dir, record_name), player_id)
 
     game_data = await client.get_game_data()
     game_info = await client.get_game_info()
@@ -152,7 +178,10 @@ async def _play_game_ai(client, player_id, ai, realtime, step_time_limit, game_t
             if game_time_limit and (gs.game_loop * 0.725 * (1 / 16)) > game_time_limit:
                 await ai.on_end(Result.Tie)
                 return Result.Tie
-            proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
+            # The game info is only needed for the pathing grid, which the bot may keep up to date by itself
+            proto_game_info = None
+            if ai._needs_game_info(gs):
+                proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
             ai._prepare_step(gs, proto_game_info)
 
         logger.debug(f"Running AI step, it={iteration} {gs.game_loop * 0.725 * (1 / 16):.2f}s")
@@ -179,6 +208,9 @@ async def _play_game_ai(client, player_id, ai, realtime, step_time_limit, game_t
 
                     # Tell the bot how much time it has left attribute
                     ai.time_budget_available = budget
+                    _update_degraded(ai, time_window, time_limit, full_step_time)
+                    if ai.degraded:
+                        ai.degraded_steps += 1
 
                     if budget < 0:
                         logger.warning(f"Running AI step: out of budget before step")
@@ -201,6 +233,8 @@ async def _play_game_ai(client, player_id, ai, realtime, step_time_limit, game_t
                         step_time = time.monotonic() - step_start
 
                     time_window.push(step_time)
+                    if not ai.degraded:
+                        full_step_time = step_time
 
                     if out_of_budget and time_penalty is not None:
                         if time_penalty == "resign":
@@ -257,7 +291,11 @@ async def _play_game(
     if isinstance(player, Human):
         result = await _play_game_human(client, player_id, realtime, game_time_limit)
     else:
-        result = await _play_game_ai(client, player_id, player.ai, realtime, step_time_limit, game_time_limit)
+        try:
+            result = await _play_game_ai(client, player_id, player.ai, realtime, step_time_limit, game_time_limit)
+        finally:
+            client.stop_recording()
+            player.ai._write_step_profile()
 
     logging.info(f"Result for player {player_id} - {player.name if player.name else str(player)}: {result._name_}")
 
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from .main import SlidingTimeWindow, _update_degraded
+
+
+def degraded_history(step_times, degraded_step_time: float, time_limit: float, window_size: int, threshold=0.75):
+    """ Runs _update_degraded the same way as main._play_game_ai with the given times of the full steps. """
+    ai = SimpleNamespace(degrade_threshold=threshold, degraded=False)
+    time_window = SlidingTimeWindow(window_size)
+    full_step_time = 0.0
+    history = []
+    for full_time in step_times:
+        _update_degraded(ai, time_window, time_limit, full_step_time)
+        history.append(ai.degraded)
+        step_time = degraded_step_time if ai.degraded else full_time
+        time_window.push(step_time)
+        if not ai.degraded:
+            full_step_time = step_time
+    return history
+
+
+class TestUpdateDegraded:
+    def test_steps_are_degraded_before_time_limit(self):
+        # Two full steps would use 80% of the window, then the window recovers after each degraded step
+        history = degraded_history([0.04] * 6, 0.001, time_limit=0.1, window_size=3)
+
+        assert history == [False, False, True, False, True, False]
+
+    def test_degraded_until_window_recovers(self):
+        # Slow degraded steps keep the window above 75% of the threshold
+        history = degraded_history([0.02, 0.07, 0.02, 0.02, 0.02], 0.03, time_limit=0.1, window_size=3)
+
+        assert history == [False, False, True, True, True]
+
+    def test_never_degraded_without_threshold(self):
+        history = degraded_history([1.0] * 4, 0.001, time_limit=0.1, window_size=3, threshold=None)
+
+        assert history == [False] * 4
@@ -0,0 +1,51 @@
+import struct
+from typing import BinaryIO, Iterator
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+# Every record is the length of the serialized response as unsigned 32 bit little endian, followed by the response
+RECORD_HEADER = struct.Struct("<I")
+# Requests whose responses are recorded, the keyword arguments of Protocol._execute
+RECORDED_REQUESTS = {"data", "game_info", "observation"}
+
+
+class ObservationRecorder:
+    """ Writes the raw responses of the game to a file, so that a game can be replayed without the game, see
+    observation_replayer.py.
+
+    The first record is a join game response with the player id of the bot, followed by the game data, game info and
+    observation responses in the order they were received. """
+
+    def __init__(self, path: str, player_id: int):
+        """
+        :param path:
+        :param player_id:
+        """
+        self.path: str = path
+        self._file: BinaryIO = open(path, "wb")
+        self.record(sc_pb.Response(join_game=sc_pb.ResponseJoinGame(player_id=player_id)))
+
+    def record(self, response: sc_pb.Response):
+        data = response.SerializeToString()
+        self._file.write(RECORD_HEADER.pack(len(data)))
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+
+def read_responses(path: str) -> Iterator[sc_pb.Response]:
+    """ Yields the responses that were written by ObservationRecorder.
+
+    :param path: """
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            (length,) = RECORD_HEADER.unpack(header)
+            data = file.read(length)
+            assert len(data) == length, f"Truncated record in {path}"
+            response = sc_pb.Response()
+            response.ParseFromString(data)
+            yield response
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import math
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from s2clientprotocol import query_pb2 as query_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from .client import Client
+from .data import ActionResult, Race, Result, Status
+from .game_state import GameState
+from .observation_recorder import read_responses
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+
+
+class ReplayFrame(NamedTuple):
+    game_loop: int
+    # Wall time of BotAI._prepare_step in seconds
+    prepare_time: float
+    # Wall time of issue_events, on_step and _after_step in seconds
+    step_time: float
+
+    @property
+    def total_time(self) -> float:
+        return self.prepare_time + self.step_time
+
+
+class RecordedGame:
+    """ Answers requests from a file written by ObservationRecorder instead of a running game.
+
+    Observations are returned in the recorded order, game info requests return the game info that was recorded
+    closest before the next observation. All other requests are answered locally and do not change the game:
+    actions succeed, pathing distances are straight distances, all placements succeed and no abilities are available.
+    After the last observation the game ends with a victory of the recorded player. """
+
+    def __init__(self, path: str):
+        """
+        :param path: file written by ObservationRecorder
+        """
+        responses = read_responses(path)
+        first = next(responses)
+        assert first.HasField("join_game"), f"{path} does not start with the player id"
+        self.player_id: int = first.join_game.player_id
+        self._data_response: Optional[sc_pb.Response] = None
+        self._initial_game_info_response: Optional[sc_pb.Response] = None
+        # Observation responses and the game info response that belongs to them
+        self._frames: List[Tuple[sc_pb.Response, sc_pb.Response]] = []
+        game_info_response = None
+        for response in responses:
+            if response.HasField("data"):
+                self._data_response = self._data_response or response
+            elif response.HasField("game_info"):
+                game_info_response = response
+                if self._frames:
+                    self._frames[-1] = (self._frames[-1][0], response)
+                else:
+                    self._initial_game_info_response = response
+            elif response.HasField("observation"):
+                self._frames.append((response, game_info_response))
+        assert self._data_response is not None, f"{path} contains no game data"
+        assert self._frames, f"{path} contains no observations"
+        self._frame_index: int = -1
+        self._unit_positions: Optional[Dict[int, Tuple[float, float]]] = None
+
+    @property
+    def frames_left(self) -> int:
+        return len(self._frames) - self._frame_index - 1
+
+    @property
+    def race(self) -> Race:
+        """ Race of the recorded player. """
+        game_info = (self._initial_game_info_response or self._frames[0][1]).game_info
+        for player_info in game_info.player_info:
+            if player_info.player_id == self.player_id:
+                return Race(player_info.race_actual or player_info.race_requested)
+        return Race.Random
+
+    def respond(self, request: sc_pb.Request) -> sc_pb.Response:
+        kind = request.WhichOneof("request")
+        if kind == "data":
+            return self._data_response
+        if kind == "game_info":
+            if self._frame_index < 0:
+                return self._initial_game_info_response or self._frames[0][1]
+            return self._frames[self._frame_index][1]
+        if kind == "observation":
+            if self.frames_left == 0:
+                return self._game_end_response()
+            self._frame_index += 1
+            self._unit_positions = None
+            return self._frames[self._frame_index][0]
+        if kind == "action":
+            return sc_pb.Response(
+                action=sc_pb.ResponseAction(result=[ActionResult.Success.value] * len(request.action.actions))
+            )
+        if kind == "query":
+            return sc_pb.Response(query=self._answer_query(request.query))
+        if kind == "join_game":
+            return sc_pb.Response(join_game=sc_pb.ResponseJoinGame(player_id=self.player_id))
+        if kind == "step":
+            game_loop = self._frames[max(self._frame_index, 0)][0].observation.observation.game_loop
+            return sc_pb.Response(step=sc_pb.ResponseStep(simulation_loop=game_loop))
+        return sc_pb.Response()
+
+    def _game_end_response(self) -> sc_pb.Response:
+        response = sc_pb.Response()
+        response.CopyFrom(self._frames[-1][0])
+        game_info = (self._initial_game_info_response or self._frames[0][1]).game_info
+        for player_info in game_info.player_info:
+            result = Result.Victory if player_info.player_id == self.player_id else Result.Defeat
+            response.observation.player_result.add(player_id=player_info.player_id, result=result.value)
+        response.status = Status.ended.value
+        return response
+
+    def _answer_query(self, query: query_pb.RequestQuery) -> query_pb.ResponseQuery:
+        response = query_pb.ResponseQuery()
+        for pathing in query.pathing:
+            if pathing.HasField("start_pos"):
+                start = (pathing.start_pos.x, pathing.start_pos.y)
+            else:
+                start = self._unit_position(pathing.unit_tag)
+            response.pathing.add(distance=math.hypot(pathing.end_pos.x - start[0], pathing.end_pos.y - start[1]))
+        for _ in query.placements:
+            response.placements.add(result=ActionResult.Success.value)
+        for abilities in query.abilities:
+            response.abilities.add(unit_tag=abilities.unit_tag)
+        return response
+
+    def _unit_position(self, tag: int) -> Tuple[float, float]:
+        if self._unit_positions is None:
+            observation = self._frames[self._frame_index][0].observation.observation
+            self._unit_positions = {unit.tag: (unit.pos.x, unit.pos.y) for unit in observation.raw_data.units}
+        return self._unit_positions.get(tag, (0, 0))
+
+
+class ReplayClient(Client):
+    """ Client that answers all requests with a RecordedGame instead of a running game.
+    The requests are still serialized, so that the benchmark includes building the requests. """
+
+    def __init__(self, path: str):
+        """
+        :param path: file written by ObservationRecorder
+        """
+        # There is no connection, every request is answered by _execute
+        super().__init__(ws=path)
+        self.game: RecordedGame = RecordedGame(path)
+        self.player_id: int = self.game.player_id
+        self._status = Status.in_game
+        # Statistics
+        self.request_counts: Counter = Counter()
+        self.request_bytes: int = 0
+
+    @property
+    def frames_left(self) -> int:
+        return self.game.frames_left
+
+    async def _execute(self, **kwargs):
+        assert len(kwargs) == 1, "Only one request allowed"
+        request = sc_pb.Request(**kwargs)
+        self.request_bytes += request.ByteSize()
+        self.request_counts[request.WhichOneof("request")] += 1
+        return self.game.respond(request)
+
+
+async def replay_game(ai: BotAI, path: str, max_frames: Optional[int] = None) -> List[ReplayFrame]:
+    """ Runs the bot on a recorded game the same way as main.py does, and returns the wall time of every frame.
+    The bot's actions do not change the recorded game. on_end is not called.
+
+    :param ai:
+    :param path: file written by ObservationRecorder
+    :param max_frames: """
+    client = ReplayClient(path)
+    ai._initialize_variables()
+    game_data = await client.get_game_data()
+    game_info = await client.get_game_info()
+    ai._prepare_start(client, client.player_id, game_info, game_data)
+
+    frames: List[ReplayFrame] = []
+    iteration = 0
+    while client.frames_left > 0 and (max_frames is None or iteration < max_frames):
+        state = await client.observation()
+        gs = GameState(state.observation)
+        proto_game_info = None
+        if iteration == 0 or ai._needs_game_info(gs):
+            proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
+
+        prepare_start = time.perf_counter()
+        ai._prepare_step(gs, proto_game_info)
+        prepare_time = time.perf_counter() - prepare_start
+        if iteration == 0:
+            await ai.on_before_start()
+            ai._prepare_first_step()
+            await ai.on_start()
+        step_start = time.perf_counter()
+        await ai.issue_events()
+        await ai.on_step(iteration)
+        await ai._after_step()
+        step_end = time.perf_counter()
+
+        frames.append(ReplayFrame(gs.game_loop, prepare_time, step_end - step_start))
+        iteration += 1
+    return frames
@@ -0,0 +1,88 @@
+import asyncio
+
+from s2clientprotocol import common_pb2, raw_pb2, sc2api_pb2
+
+from .bot_ai import BotAI
+from .ids.unit_typeid import UnitTypeId
+from .observation_recorder import ObservationRecorder, read_responses
+from .observation_replayer import ReplayClient, replay_game
+
+MAP_SIZE = 16
+
+
+def create_game_info_response() -> sc2api_pb2.Response:
+    game_info = sc2api_pb2.ResponseGameInfo(map_name="Test")
+    game_info.player_info.add(player_id=1, race_requested=common_pb2.Protoss)
+    game_info.player_info.add(player_id=2, race_requested=common_pb2.Zerg)
+    start_raw = game_info.start_raw
+    start_raw.map_size.x = start_raw.map_size.y = MAP_SIZE
+    for grid, bits_per_pixel, value in (
+        (start_raw.pathing_grid, 1, b"\xff"),
+        (start_raw.placement_grid, 1, b"\xff"),
+        (start_raw.terrain_height, 8, b"\x80"),
+    ):
+        grid.size.x = grid.size.y = MAP_SIZE
+        grid.bits_per_pixel = bits_per_pixel
+        grid.data = value * (MAP_SIZE * MAP_SIZE * bits_per_pixel // 8)
+    start_raw.playable_area.p1.x = start_raw.playable_area.p1.y = MAP_SIZE
+    start_raw.start_locations.add(x=12.5, y=12.5)
+    return sc2api_pb2.Response(game_info=game_info)
+
+
+def create_observation_response(game_loop: int) -> sc2api_pb2.Response:
+    response = sc2api_pb2.Response()
+    observation = response.observation.observation
+    observation.game_loop = game_loop
+    observation.player_common.player_id = 1
+    observation.player_common.food_cap = 15
+    for tag in range(1, 4):
+        unit = observation.raw_data.units.add(
+            tag=tag, unit_type=UnitTypeId.PROBE.value, alliance=raw_pb2.Self, owner=1, build_progress=1
+        )
+        unit.pos.x, unit.pos.y = 2 + tag + game_loop / 8, 3
+    return response
+
+
+def record_game(path: str, frames: int):
+    recorder = ObservationRecorder(path, player_id=1)
+    data = sc2api_pb2.ResponseData()
+    data.units.add(unit_id=UnitTypeId.PROBE.value, name="Probe", available=True, race=common_pb2.Protoss)
+    recorder.record(sc2api_pb2.Response(data=data))
+    recorder.record(create_game_info_response())
+    for frame in range(frames):
+        recorder.record(create_observation_response(frame * 8))
+        recorder.record(create_game_info_response())
+    recorder.close()
+
+
+class MoveBot(BotAI):
+    def __init__(self):
+        self.steps = []
+
+    async def on_step(self, iteration: int):
+        self.steps.append((iteration, self.state.game_loop, len(self.units)))
+        self.units.first.move(self.game_info.map_center)
+        await self._client.query_pathing(self.units.first, self.game_info.map_center)
+
+
+class TestObservationReplayer:
+    def test_recording_is_read_in_order(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 3)
+
+        kinds = [response.WhichOneof("response") for response in read_responses(path)]
+        assert kinds == ["join_game", "data", "game_info"] + ["observation", "game_info"] * 3
+        assert ReplayClient(path).frames_left == 3
+
+    def test_bot_steps_through_all_frames(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 4)
+        bot = MoveBot()
+
+        frames = asyncio.run(replay_game(bot, path))
+
+        assert [frame.game_loop for frame in frames] == [0, 8, 16, 24]
+        assert bot.steps == [(0, 0, 3), (1, 8, 3), (2, 16, 3), (3, 24, 3)]
+        assert all(frame.total_time >= 0 for frame in frames)
+        assert bot._client.request_counts["action"] == 4
+        assert bot._client.request_counts["query"] == 4
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import math
+from typing import Dict, Optional, Set, Tuple, TYPE_CHECKING
+
+from .ids.unit_typeid import UnitTypeId
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+    from .game_state import GameState
+    from .unit import Unit
+
+# (x0, y0, x1, y1) cell rectangle, x1 and y1 exclusive
+Footprint = Tuple[int, int, int, int]
+
+# Structures that do not block ground pathing even though they are on the ground
+NON_BLOCKING_STRUCTURES: Set[UnitTypeId] = {
+    UnitTypeId.SUPPLYDEPOTLOWERED,
+    UnitTypeId.CREEPTUMOR,
+    UnitTypeId.CREEPTUMORBURROWED,
+    UnitTypeId.CREEPTUMORQUEEN,
+}
+
+
+class PathingGridTracker:
+    """ Keeps 'BotAI._game_info.pathing_grid' up to date without requesting the game info every step.
+
+    After every full resync from a RequestGameInfo response, the footprints of all structures and resources are
+    remembered. On the following steps only the footprints that appeared, moved or disappeared are written to the grid.
+    A full resync is requested when 'resync_interval' game loops have passed, when a destructible rock or a resource
+    died (their footprints can not be restored exactly) or when a structure with an unknown footprint left the grid. """
+
+    def __init__(self, resync_interval: int):
+        """
+        :param resync_interval: amount of game loops after which the grid is always fetched from the game again
+        """
+        assert resync_interval > 0, f"resync_interval has to be positive, was {resync_interval}"
+        self.resync_interval: int = resync_interval
+        self._last_resync_loop: int = -resync_interval
+        self._resync_requested: bool = True
+        # Footprints that are currently stamped into the pathing grid
+        self._footprints: Dict[int, Footprint] = {}
+        # Tags of blocking units that had no known footprint during the last resync
+        self._unknown_footprint_tags: Set[int] = set()
+        # Tags of destructible rocks and resources that were part of the last resync
+        self._neutral_blocker_tags: Set[int] = set()
+        # Changes whenever a footprint was added or removed, or the grid was replaced
+        self.version: int = 0
+        # Statistics
+        self.resync_count: int = 0
+        self.incremental_update_count: int = 0
+
+    def needs_resync(self, state: GameState) -> bool:
+        """ Returns True if the next step has to request the full pathing grid from the game.
+
+        :param state: """
+        if self._resync_requested:
+            return True
+        if state.game_loop - self._last_resync_loop >= self.resync_interval:
+            return True
+        return not self._neutral_blocker_tags.isdisjoint(state.dead_units)
+
+    def resync(self, bot: BotAI):
+        """ Called after the pathing grid was replaced by the one from the game info response.
+
+        :param bot: """
+        self._footprints, self._unknown_footprint_tags = self._collect_footprints(bot)
+        self._neutral_blocker_tags = {unit.tag for unit in bot.destructables} | {unit.tag for unit in bot.resources}
+        self._last_resync_loop = bot.state.game_loop
+        self._resync_requested = False
+        self.resync_count += 1
+        self.version += 1
+
+    def update(self, bot: BotAI):
+        """ Applies the footprint changes since the last step to the pathing grid.
+
+        :param bot: """
+        footprints, unknown_footprint_tags = self._collect_footprints(bot)
+        if not self._unknown_footprint_tags.issubset(unknown_footprint_tags):
+            # A structure that is in the grid left, but we don't know which cells it blocked
+            self._resync_requested = True
+        # Structures with unknown footprint that appear since the last resync are added on the next resync
+        self._resync_requested |= not unknown_footprint_tags.issubset(self._unknown_footprint_tags)
+
+        old_footprints = self._footprints
+        removed = [rect for tag, rect in old_footprints.items() if footprints.get(tag) != rect]
+        added = [rect for tag, rect in footprints.items() if old_footprints.get(tag) != rect]
+        if not removed and not added:
+            return
+
+        grid = bot._game_info.pathing_grid.data_numpy
+        for x0, y0, x1, y1 in removed:
+            grid[y0:y1, x0:x1] = 1
+        # Removing a footprint may have cleared cells of an overlapping footprint, so stamp all of them again
+        for x0, y0, x1, y1 in footprints.values() if removed else added:
+            grid[y0:y1, x0:x1] = 0
+        self._footprints = footprints
+        self.incremental_update_count += 1
+        self.version += 1
+
+    def _collect_footprints(self, bot: BotAI) -> Tuple[Dict[int, Footprint], Set[int]]:
+        footprints: Dict[int, Footprint] = {}
+        unknown: Set[int] = set()
+        height, width = bot._game_info.pathing_grid.data_numpy.shape
+        for units in (bot.structures, bot.enemy_structures, bot.mineral_field, bot.vespene_geyser):
+            for unit in units:
+                if unit.is_flying or unit.type_id in NON_BLOCKING_STRUCTURES:
+                    continue
+                rect = self.footprint(unit)
+                if rect is None:
+                    unknown.add(unit.tag)
+                    continue
+                x0, y0, x1, y1 = rect
+                footprints[unit.tag] = (max(x0, 0), max(y0, 0), min(x1, width), min(y1, height))
+        return footprints, unknown
+
+    @staticmethod
+    def footprint(unit: Unit) -> Optional[Footprint]:
+        """ Returns the grid cells the unit blocks as (x0, y0, x1, y1), or None if it is not known.
+
+        :param unit: """
+        x, y = unit.position_tuple
+        if unit.is_mineral_field:
+            # Mineral fields are 2x1
+            x0, y0 = int(round(x - 1)), int(round(y - 0.5))
+            return x0, y0, x0 + 2, y0 + 1
+        footprint_radius = 0
+        creation_ability = unit._type_data.creation_ability
+        if creation_ability is not None:
+            footprint_radius = creation_ability._proto.footprint_radius
+        if not footprint_radius:
+            # Geysers and morphed structures (e.g. orbital command) have no creation footprint,
+            # their footprint is the unit radius rounded down to the next half cell
+            footprint_radius = math.floor(unit.radius * 2) / 2
+        if footprint_radius <= 0:
+            return None
+        size = int(footprint_radius * 2)
+        x0, y0 = int(round(x - footprint_radius)), int(round(y - footprint_radius))
+        return x0, y0, x0 + size, y0 + size
@@ -0,0 +1,91 @@
+from unittest import mock
+
+import numpy as np
+
+from sc2 import UnitTypeId
+
+from .pathing_grid_tracker import PathingGridTracker
+
+
+def mock_structure(tag: int, x: float, y: float, footprint_radius: float, type_id=UnitTypeId.GATEWAY) -> mock.Mock:
+    unit = mock.Mock()
+    unit.tag = tag
+    unit.type_id = type_id
+    unit.position_tuple = (x, y)
+    unit.is_flying = False
+    unit.is_mineral_field = False
+    unit.radius = footprint_radius + 0.3
+    unit._type_data.creation_ability._proto.footprint_radius = footprint_radius
+    return unit
+
+
+def mock_bot(structures, game_loop: int = 0, dead_units=()) -> mock.Mock:
+    bot = mock.Mock()
+    bot._game_info.pathing_grid.data_numpy = np.ones((32, 32), dtype=np.uint8)
+    bot.state.game_loop = game_loop
+    bot.state.dead_units = set(dead_units)
+    bot.structures = structures
+    bot.enemy_structures = []
+    bot.mineral_field = []
+    bot.vespene_geyser = []
+    bot.destructables = []
+    bot.resources = []
+    return bot
+
+
+class TestPathingGridTracker:
+    def test_footprint_of_3x3_structure(self):
+        gateway = mock_structure(1, 10.5, 10.5, 1.5)
+
+        assert PathingGridTracker.footprint(gateway) == (9, 9, 12, 12)
+
+    def test_footprint_falls_back_to_radius_for_morphed_structures(self):
+        orbital = mock_structure(1, 20.5, 20.5, 0, UnitTypeId.ORBITALCOMMAND)
+        orbital.radius = 2.75
+
+        assert PathingGridTracker.footprint(orbital) == (18, 18, 23, 23)
+
+    def test_new_structure_is_stamped_and_removed_structure_is_cleared(self):
+        tracker = PathingGridTracker(resync_interval=100)
+        bot = mock_bot([])
+        tracker.resync(bot)
+        grid = bot._game_info.pathing_grid.data_numpy
+
+        bot.structures = [mock_structure(1, 10.5, 10.5, 1.5)]
+        tracker.update(bot)
+        assert not grid[9:12, 9:12].any()
+        assert grid.sum() == 32 * 32 - 9
+
+        bot.structures = []
+        tracker.update(bot)
+        assert grid.all()
+
+    def test_overlapping_footprint_stays_blocked_when_other_is_removed(self):
+        tracker = PathingGridTracker(resync_interval=100)
+        depot = mock_structure(1, 10, 10, 1)
+        pylon = mock_structure(2, 11, 10, 1)
+        bot = mock_bot([depot, pylon])
+        tracker.resync(bot)
+        grid = bot._game_info.pathing_grid.data_numpy
+
+        bot.structures = [pylon]
+        tracker.update(bot)
+
+        assert grid[9, 9] == 1
+        assert not grid[9:11, 10:12].any()
+
+    def test_needs_resync_after_interval_and_when_rock_dies(self):
+        tracker = PathingGridTracker(resync_interval=100)
+        bot = mock_bot([], game_loop=10)
+        rock = mock.Mock(tag=5)
+        bot.destructables = [rock]
+        assert tracker.needs_resync(bot.state)
+        tracker.resync(bot)
+
+        bot.state.game_loop = 50
+        assert not tracker.needs_resync(bot.state)
+        bot.state.dead_units = {5}
+        assert tracker.needs_resync(bot.state)
+        bot.state.dead_units = set()
+        bot.state.game_loop = 110
+        assert tracker.needs_resync(bot.state)
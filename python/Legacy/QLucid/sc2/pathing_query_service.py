@@ -0,0 +1,101 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+from .position import Point2, Point3
+from .unit import Unit
+
+if TYPE_CHECKING:
+    from .client import Client
+
+PathingStart = Union[Unit, Point2, Point3]
+PathingQuery = Tuple[PathingStart, Union[Point2, Point3]]
+
+
+class PathingQueryService:
+    """ Answers pathing distance queries from a memo, and sends all queries that are not memoized in one request.
+
+    Results are memoized per quantized start and end cell and per structure footprint version. Any structure or rock
+    that is added or removed changes the version, so old results are never returned after the pathing changed.
+    Queries that start at a unit are memoized per unit tag, because the path depends on the unit (e.g. its size).
+    The memo is limited to 'max_size' entries, the least recently used entries are removed first. """
+
+    def __init__(
+        self, client: Client, footprint_version: Callable[[], Hashable], max_size: int = 4096, cell_size: float = 1
+    ):
+        """
+        :param client:
+        :param footprint_version: returns a value that changes whenever the structure footprints change
+        :param max_size: maximum amount of memoized results
+        :param cell_size: start and end positions in the same cell of this size share their result
+        """
+        assert max_size > 0, f"max_size has to be positive, was {max_size}"
+        assert cell_size > 0, f"cell_size has to be positive, was {cell_size}"
+        self._client: Client = client
+        self._footprint_version: Callable[[], Hashable] = footprint_version
+        self.max_size: int = max_size
+        self.cell_size: float = cell_size
+        self._memo: OrderedDict = OrderedDict()
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.requests: int = 0
+
+    async def distance(self, start: PathingStart, end: Union[Point2, Point3]) -> Optional[float]:
+        """ Same as client.query_pathing, returns None when there is no path.
+
+        :param start:
+        :param end: """
+        return (await self.distances([(start, end)]))[0]
+
+    async def distances(self, queries: Sequence[PathingQuery]) -> List[Optional[float]]:
+        """ Returns the pathing distances of all (start, end) pairs, None when there is no path.
+        The queries that are not memoized are sent in one request per start type (unit or position).
+
+        :param queries: """
+        version = self._footprint_version()
+        results: List[Optional[float]] = [None] * len(queries)
+        # Indices of the queries that are not memoized, per key, for queries that start at a position or a unit
+        missing_points: Dict[Hashable, List[int]] = {}
+        missing_units: Dict[Hashable, List[int]] = {}
+        for index, (start, end) in enumerate(queries):
+            key = self._key(start, end, version)
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                results[index] = self._memo[key]
+                self.hits += 1
+            else:
+                missing = missing_units if isinstance(start, Unit) else missing_points
+                missing.setdefault(key, []).append(index)
+
+        for missing in (missing_points, missing_units):
+            if not missing:
+                continue
+            self.requests += 1
+            self.misses += len(missing)
+            first_indices = [indices[0] for indices in missing.values()]
+            distances = await self._client.query_pathings([list(queries[index]) for index in first_indices])
+            for (key, indices), distance in zip(missing.items(), distances):
+                # Distance 0 means there is no path
+                result = distance if distance > 0 else None
+                for index in indices:
+                    results[index] = result
+                self._remember(key, result)
+        return results
+
+    def clear(self):
+        self._memo.clear()
+
+    def _key(self, start: PathingStart, end: Union[Point2, Point3], version: Hashable) -> Hashable:
+        if isinstance(start, Unit):
+            return start.tag, self._cell(start.position_tuple), self._cell(end), version
+        return self._cell(start), self._cell(end), version
+
+    def _cell(self, position: Tuple[float, float]) -> Tuple[int, int]:
+        return int(position[0] // self.cell_size), int(position[1] // self.cell_size)
+
+    def _remember(self, key: Hashable, result: Optional[float]):
+        self._memo[key] = result
+        self._memo.move_to_end(key)
+        if len(self._memo) > self.max_size:
+            self._memo.popitem(last=False)
@@ -0,0 +1,60 @@
+import asyncio
+
+from .pathing_query_service import PathingQueryService
+from .position import Point2
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+
+    async def query_pathings(self, zipped_list):
+        self.requests.append(zipped_list)
+        # No path to positions with negative x, otherwise the straight distance
+        return [0 if end.x < 0 else start.distance_to(end) for start, end in zipped_list]
+
+
+class TestPathingQueryService:
+    def test_queries_are_batched_and_memoized(self):
+        client = FakeClient()
+        service = PathingQueryService(client, lambda: 0)
+        start = Point2((0.5, 0.5))
+        queries = [(start, Point2((10.5, 0.5))), (start, Point2((-5, 0.5))), (start, Point2((10.5, 0.5)))]
+
+        assert asyncio.run(service.distances(queries)) == [10, None, 10]
+        assert len(client.requests) == 1
+        assert len(client.requests[0]) == 2
+
+        # Same cells are answered from the memo
+        assert asyncio.run(service.distance(Point2((0.7, 0.2)), Point2((10.1, 0.9)))) == 10
+        assert len(client.requests) == 1
+        assert service.hits == 1
+        assert service.misses == 2
+
+    def test_footprint_version_change_queries_again(self):
+        client = FakeClient()
+        version = [0]
+        service = PathingQueryService(client, lambda: version[0])
+        query = (Point2((0.5, 0.5)), Point2((10.5, 0.5)))
+
+        asyncio.run(service.distance(*query))
+        version[0] = 1
+        asyncio.run(service.distance(*query))
+
+        assert len(client.requests) == 2
+
+    def test_least_recently_used_result_is_removed(self):
+        client = FakeClient()
+        service = PathingQueryService(client, lambda: 0, max_size=2)
+        start = Point2((0.5, 0.5))
+        end1, end2, end3 = Point2((1.5, 0.5)), Point2((2.5, 0.5)), Point2((3.5, 0.5))
+
+        asyncio.run(service.distances([(start, end1), (start, end2)]))
+        asyncio.run(service.distance(start, end1))
+        asyncio.run(service.distance(start, end3))
+        assert len(client.requests) == 2
+
+        asyncio.run(service.distance(start, end1))
+        assert len(client.requests) == 2
+        asyncio.run(service.distance(start, end2))
+        assert len(client.requests) == 3
@@ -0,0 +1,182 @@
+from __future__ import annotations
+from math import floor
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .constants import ALL_GAS
+from .data import Race
+from .ids.unit_typeid import UnitTypeId
+from .pathing_grid_tracker import Footprint
+from .position import Point2
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+    from .game_data import AbilityData, UnitTypeData
+    from .unit import Unit
+
+# Protoss structures that do not need to be placed in a power field
+UNPOWERED_PROTOSS_STRUCTURES = {UnitTypeId.NEXUS, UnitTypeId.PYLON, UnitTypeId.ASSIMILATOR, UnitTypeId.ASSIMILATORRICH}
+# Zerg structures that do not need to be placed on creep
+CREEPLESS_ZERG_STRUCTURES = {UnitTypeId.HATCHERY, UnitTypeId.EXTRACTOR, UnitTypeId.EXTRACTORRICH}
+PYLON_POWER_RADIUS = 6.5
+WARP_PRISM_POWER_RADIUS = 3.75
+
+
+class PlacementEngine:
+    """ Checks building placements locally, so that positions that are certainly invalid are not sent to the game.
+
+    A position is only rejected on exact data: the footprint of the building leaves the placement grid, overlaps the
+    footprint of a mineral field or of a structure created with a known footprint, or does not meet the creep and
+    power requirements of its race. Geysers, rocks and morphed structures, whose footprints are not known exactly,
+    units and resource distance rules of townhalls are not modeled, so the positions that pass still have to be
+    confirmed with a placement query. """
+
+    def __init__(self, bot: BotAI):
+        """
+        :param bot:
+        """
+        self._bot: BotAI = bot
+        self._game_loop: int = -1
+        # Summed area tables of the blocked cells and the creep cells, shape (height + 1, width + 1)
+        self._blocked_table: Optional[np.ndarray] = None
+        self._creep_table: Optional[np.ndarray] = None
+        # Centers and radii of the power fields of pylons and phasing warp prisms
+        self._power_positions: Optional[np.ndarray] = None
+        self._power_radii: Optional[np.ndarray] = None
+        # Unit type data per creation ability id, built on first use
+        self._created_units: Optional[Dict[int, UnitTypeData]] = None
+        # Statistics
+        self.checked_count: int = 0
+        self.rejected_count: int = 0
+
+    def supports(self, ability: AbilityData) -> bool:
+        """ Returns True if the placement of the ability can be checked locally. Gas buildings are placed on geysers
+        and have to be checked by the game.
+
+        :param ability: """
+        unit_data = self._created_unit(ability)
+        return unit_data is not None and unit_data.id not in ALL_GAS and ability._proto.footprint_radius > 0
+
+    def check(self, ability: AbilityData, positions: Sequence[Tuple[float, float]]) -> np.ndarray:
+        """ Returns a boolean array, True for the positions where the building can probably be placed.
+
+        :param ability:
+        :param positions: """
+        if not positions:
+            return np.zeros(0, dtype=bool)
+        self._prepare()
+        unit_data = self._created_unit(ability)
+        unit_type = unit_data.id
+        race = Race(unit_data._proto.race)
+        radius = ability._proto.footprint_radius
+        size = int(radius * 2)
+        height, width = self._blocked_table.shape[0] - 1, self._blocked_table.shape[1] - 1
+
+        centers = np.array(positions, dtype=float)[:, :2]
+        x0 = np.floor(centers[:, 0] - radius + 0.5).astype(int)
+        y0 = np.floor(centers[:, 1] - radius + 0.5).astype(int)
+        valid = (x0 >= 0) & (y0 >= 0) & (x0 + size <= width) & (y0 + size <= height)
+        x0 = np.clip(x0, 0, width - size)
+        y0 = np.clip(y0, 0, height - size)
+
+        valid &= self._area_sum(self._blocked_table, x0, y0, size) == 0
+        if race == Race.Zerg:
+            if unit_type not in CREEPLESS_ZERG_STRUCTURES:
+                valid &= self._area_sum(self._creep_table, x0, y0, size) == size * size
+        else:
+            valid &= self._area_sum(self._creep_table, x0, y0, size) == 0
+        if race == Race.Protoss and unit_type not in UNPOWERED_PROTOSS_STRUCTURES:
+            if len(self._power_positions):
+                differences = centers[:, None, :] - self._power_positions[None, :, :]
+                valid &= ((differences ** 2).sum(axis=2) <= self._power_radii[None, :] ** 2).any(axis=1)
+            else:
+                valid[:] = False
+
+        self.checked_count += len(valid)
+        self.rejected_count += len(valid) - int(valid.sum())
+        return valid
+
+    def _created_unit(self, ability: AbilityData) -> Optional[UnitTypeData]:
+        """ Returns the type data of the unit that is created by the ability. """
+        if self._created_units is None:
+            self._created_units = {}
+            for unit_data in self._bot._game_data.units.values():
+                self._created_units.setdefault(unit_data._proto.ability_id, unit_data)
+        return self._created_units.get(ability._proto.ability_id)
+
+    def _prepare(self):
+        """ Builds the grids once per frame. """
+        bot = self._bot
+        if self._game_loop == bot.state.game_loop:
+            return
+        self._game_loop = bot.state.game_loop
+        blocked = bot._game_info.placement_grid.data_numpy == 0
+        height, width = blocked.shape
+        for units in (bot.structures, bot.enemy_structures, bot.mineral_field):
+            for unit in units:
+                if unit.is_flying:
+                    continue
+                rect = self.footprint(unit)
+                if rect is None:
+                    continue
+                x0, y0, x1, y1 = rect
+                blocked[max(y0, 0) : min(y1, height), max(x0, 0) : min(x1, width)] = True
+        self._blocked_table = self._summed_area_table(blocked)
+        self._creep_table = self._summed_area_table(bot.state.creep.data_numpy != 0)
+        power_fields = [
+            (pylon.position_tuple, PYLON_POWER_RADIUS)
+            for pylon in bot.structures
+            if pylon.type_id == UnitTypeId.PYLON and pylon.is_ready
+        ]
+        power_fields += [
+            (prism.position_tuple, WARP_PRISM_POWER_RADIUS)
+            for prism in bot.units
+            if prism.type_id == UnitTypeId.WARPPRISMPHASING
+        ]
+        self._power_positions = np.array([position for position, _ in power_fields], dtype=float).reshape((-1, 2))
+        self._power_radii = np.array([radius for _, radius in power_fields], dtype=float)
+
+    @staticmethod
+    def footprint(unit: Unit) -> Optional[Footprint]:
+        """ Returns the grid cells the unit blocks as (x0, y0, x1, y1), or None if they are not known exactly.
+        Only mineral fields and units created with a footprint are known, unlike PathingGridTracker.footprint
+        the size is never guessed from the unit radius.
+
+        :param unit: """
+        x, y = unit.position_tuple
+        if unit.is_mineral_field:
+            x0, y0 = floor(x - 0.5), floor(y)
+            return x0, y0, x0 + 2, y0 + 1
+        creation_ability = unit._type_data.creation_ability
+        if creation_ability is None or creation_ability._proto.footprint_radius <= 0:
+            return None
+        radius = creation_ability._proto.footprint_radius
+        size = int(radius * 2)
+        x0, y0 = floor(x - radius + 0.5), floor(y - radius + 0.5)
+        return x0, y0, x0 + size, y0 + size
+
+    @staticmethod
+    def _summed_area_table(grid: np.ndarray) -> np.ndarray:
+        table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int32)
+        table[1:, 1:] = grid.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+        return table
+
+    @staticmethod
+    def _area_sum(table: np.ndarray, x0: np.ndarray, y0: np.ndarray, size: int) -> np.ndarray:
+        x1 = x0 + size
+        y1 = y0 + size
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+
+def ring_positions(near: Point2, distance: int, step: int) -> List[Point2]:
+    """ Positions on the square ring around 'near', in the same order as BotAI.find_placement checks them. """
+    return [
+        Point2(p).offset(near).to2
+        for p in (
+            [(dx, -distance) for dx in range(-distance, distance + 1, step)]
+            + [(dx, distance) for dx in range(-distance, distance + 1, step)]
+            + [(-distance, dy) for dy in range(-distance, distance + 1, step)]
+            + [(distance, dy) for dy in range(-distance, distance + 1, step)]
+        )
+    ]
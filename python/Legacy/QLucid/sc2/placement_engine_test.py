@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from .bot_ai import BotAI
+from .data import Race
+from .ids.ability_id import AbilityId
+from .ids.unit_typeid import UnitTypeId
+from .placement_engine import PlacementEngine, ring_positions
+from .position import Point2
+
+
+def create_ability(ability_id: AbilityId, footprint_radius: float):
+    return SimpleNamespace(_proto=SimpleNamespace(ability_id=ability_id.value, footprint_radius=footprint_radius))
+
+
+def create_structure(type_id: UnitTypeId, position, footprint_radius: float):
+    unit = mock.Mock(type_id=type_id, position_tuple=position, is_flying=False, is_mineral_field=False, is_ready=True)
+    unit._type_data.creation_ability._proto.footprint_radius = footprint_radius
+    return unit
+
+
+def create_rock(position, radius: float):
+    unit = mock.Mock(position_tuple=position, radius=radius, is_flying=False, is_mineral_field=False)
+    unit._type_data.creation_ability = None
+    return unit
+
+
+def create_bot(structures, creep=None, own_units=(), destructables=()) -> SimpleNamespace:
+    created_units = {
+        UnitTypeId.GATEWAY: (AbilityId.PROTOSSBUILD_GATEWAY, Race.Protoss),
+        UnitTypeId.SPAWNINGPOOL: (AbilityId.ZERGBUILD_SPAWNINGPOOL, Race.Zerg),
+        UnitTypeId.SUPPLYDEPOT: (AbilityId.TERRANBUILD_SUPPLYDEPOT, Race.Terran),
+    }
+    units = {
+        type_id.value: SimpleNamespace(id=type_id, _proto=SimpleNamespace(ability_id=ability_id.value, race=race.value))
+        for type_id, (ability_id, race) in created_units.items()
+    }
+    return SimpleNamespace(
+        _game_info=SimpleNamespace(placement_grid=SimpleNamespace(data_numpy=np.ones((32, 32), dtype=np.uint8))),
+        _game_data=SimpleNamespace(units=units),
+        state=SimpleNamespace(
+            game_loop=0, creep=SimpleNamespace(data_numpy=creep if creep is not None else np.zeros((32, 32)))
+        ),
+        structures=structures,
+        units=list(own_units),
+        enemy_structures=[],
+        mineral_field=[],
+        vespene_geyser=[],
+        destructables=list(destructables),
+    )
+
+
+class PlacementClient:
+    """ Answers placement queries with a set of valid positions and records the queried positions. """
+
+    def __init__(self, valid_positions):
+        self.valid_positions = valid_positions
+        self.queries = []
+
+    async def _query_building_placement_fast(self, ability, positions):
+        self.queries.append(list(positions))
+        return [position in self.valid_positions for position in positions]
+
+
+def find_placement_local(engine_valid, client: PlacementClient, near: Point2, max_distance: int):
+    engine = SimpleNamespace(check=lambda ability, positions: np.array([engine_valid(p) for p in positions]))
+    bot = SimpleNamespace(_placement_engine=engine, _client=client)
+    return asyncio.run(BotAI._find_placement_local(bot, None, near, max_distance, False, 2))
+
+
+class TestPlacementEngine:
+    def test_footprints_and_power(self):
+        pylon = create_structure(UnitTypeId.PYLON, (10, 10), 1)
+        engine = PlacementEngine(create_bot([pylon]))
+        gateway = create_ability(AbilityId.PROTOSSBUILD_GATEWAY, 1.5)
+
+        # Overlapping the pylon, free and powered, free without power, outside of the map
+        valid = engine.check(gateway, [(11.5, 11.5), (12.5, 10.5), (20.5, 20.5), (31.5, 31.5)])
+
+        assert valid.tolist() == [False, True, False, False]
+        assert engine.checked_count == 4
+        assert engine.rejected_count == 3
+
+    def test_creep(self):
+        creep = np.zeros((32, 32))
+        creep[:16, :16] = 1
+        engine = PlacementEngine(create_bot([], creep))
+        pool = create_ability(AbilityId.ZERGBUILD_SPAWNINGPOOL, 1.5)
+        depot = create_ability(AbilityId.TERRANBUILD_SUPPLYDEPOT, 1)
+
+        assert engine.check(pool, [(5.5, 5.5), (15.5, 5.5), (25.5, 5.5)]).tolist() == [True, False, False]
+        assert engine.check(depot, [(5, 5), (17, 5), (25, 5)]).tolist() == [False, True, True]
+
+    def test_warp_prism_power(self):
+        prism = mock.Mock(type_id=UnitTypeId.WARPPRISMPHASING, position_tuple=(20, 20))
+        engine = PlacementEngine(create_bot([], own_units=[prism]))
+        gateway = create_ability(AbilityId.PROTOSSBUILD_GATEWAY, 1.5)
+
+        assert engine.check(gateway, [(21.5, 22.5), (24.5, 20.5), (10.5, 10.5)]).tolist() == [True, False, False]
+
+    def test_inexact_footprints_are_not_rejected(self):
+        # Footprints guessed from the radius of rocks could be wrong, only the game can reject them
+        rock = create_rock((10, 10), 3)
+        depot = create_ability(AbilityId.TERRANBUILD_SUPPLYDEPOT, 1)
+        engine = PlacementEngine(create_bot([], destructables=[rock]))
+
+        assert engine.check(depot, [(10, 10)]).tolist() == [True]
+
+    def test_half_cell_positions(self):
+        depot = create_structure(UnitTypeId.SUPPLYDEPOT, (10, 10), 1)
+        engine = PlacementEngine(create_bot([depot]))
+        depot_ability = create_ability(AbilityId.TERRANBUILD_SUPPLYDEPOT, 1)
+
+        # Footprints start at floor(11.5 - 1 + 0.5) = 11 next to the depot and at floor(10.5 - 1 + 0.5) = 10 on it,
+        # rounding half to even would move the first one onto the depot
+        assert engine.check(depot_ability, [(11.5, 10), (10.5, 10)]).tolist() == [True, False]
+        assert PlacementEngine.footprint(depot) == (9, 9, 11, 11)
+
+
+class TestFindPlacementLocal:
+    def test_confirms_local_candidates_in_one_query(self):
+        near = Point2((10, 10))
+        client = PlacementClient({Point2((12, 10)), Point2((14, 14))})
+
+        result = find_placement_local(lambda p: True, client, near, 6)
+
+        assert result == Point2((12, 10))
+        assert len(client.queries) == 1
+
+    def test_no_query_when_every_ring_is_rejected(self):
+        near = Point2((10, 10))
+        client = PlacementClient({Point2((8, 8))})
+
+        assert find_placement_local(lambda p: False, client, near, 6) is None
+        assert client.queries == []
+
+    def test_rejected_rings_are_not_queried_again(self):
+        near = Point2((10, 10))
+        # Only the outer ring passes locally and the game confirms one of its positions
+        client = PlacementClient({Point2((14, 14))})
+
+        result = find_placement_local(lambda p: near.distance_to_point2(p) > 4, client, near, 6)
+
+        assert result == Point2((14, 14))
+        assert len(client.queries) == 1
+        assert all(near.distance_to_point2(p) > 4 for p in client.queries[0])
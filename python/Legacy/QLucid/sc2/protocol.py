@@ -2,10 +2,13 @@ import asyncio
 
 import logging
 import sys
+import time
+from typing import Optional
 
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
 from .data import Status
+from .step_profiler import StepProfiler
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +31,12 @@ class Protocol:
         assert ws
         self._ws = ws
         self._status = None
+        # Set by the bot to time sending and receiving every request, see step_profiler.py
+        self.step_profiler: Optional[StepProfiler] = None
 
     async def __request(self, request):
         logger.debug(f"Sending request: {request !r}")
+        send_start = time.perf_counter()
         try:
             await self._ws.send_bytes(request.SerializeToString())
         except TypeError:
@@ -39,6 +45,7 @@ class Protocol:
         logger.debug(f"Request sent")
 
         response = sc_pb.Response()
+        receive_start = time.perf_counter()
         try:
             response_bytes = await self._ws.receive_bytes()
         except TypeError:
@@ -57,6 +64,11 @@ class Protocol:
 
         response.ParseFromString(response_bytes)
         logger.debug(f"Response received")
+        if self.step_profiler is not None:
+            kind = request.WhichOneof("request")
+            # Receiving includes the time the game takes to answer, e.g. to simulate the requested game loops
+            self.step_profiler.record(f"protocol.send.{kind}", receive_start - send_start)
+            self.step_profiler.record(f"protocol.receive.{kind}", time.perf_counter() - receive_start)
         return response
 
     async def _execute(self, **kwargs):
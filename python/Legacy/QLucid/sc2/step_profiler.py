@@ -0,0 +1,168 @@
+from __future__ import annotations
+import csv
+import heapq
+import json
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class SectionTimes:
+    """ Times of one section: count, total and maximum of the whole game and the latest samples in a ring buffer. """
+
+    __slots__ = ("count", "total", "max", "_buffer")
+
+    def __init__(self, size: int):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self._buffer: array = array("d", [0.0]) * size
+
+    def add(self, seconds: float):
+        self._buffer[self.count % len(self._buffer)] = seconds
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def recent(self, window: Optional[int] = None) -> array:
+        """ The latest samples in the order they were recorded, at most 'window' and the size of the buffer. """
+        size = len(self._buffer)
+        length = min(self.count, size if window is None else min(window, size))
+        end = self.count % size
+        if length <= end:
+            return self._buffer[end - length : end]
+        return self._buffer[size - (length - end) :] + self._buffer[:end]
+
+    def __len__(self) -> int:
+        return min(self.count, len(self._buffer))
+
+
+class StepProfiler:
+    """ Collects the wall time of named sections of each step, e.g. the managers, build order acts and requests.
+
+    Profiling is enabled by setting 'step_profile_dir' on the bot, which writes a JSON and a CSV report at the end of
+    the game. When it is disabled, 'BotAI.step_profiler' is None and the measured code only checks for that.
+
+    Section names are prefixed by what they measure:
+    'bot.' for the step phases in BotAI, 'manager.' for Knowledge managers, 'act.' for the build order tree
+    (the time of an act includes the time of its child acts) and 'protocol.' for sending and receiving requests.
+
+    Example::
+
+        profiler = StepProfiler()
+        start = time.perf_counter()
+        do_work()
+        profiler.record("work", time.perf_counter() - start)
+        profiler.percentiles("work", window=224)  # {0.5: ..., 0.95: ..., 0.99: ...} of the last 224 samples
+
+    Only the last 'window' samples of each section are kept, the percentiles are rolling percentiles of those.
+    Count, total and maximum cover the whole game.
+    """
+
+    def __init__(self, slowest_steps: int = 20, window: int = 2048):
+        """
+        :param slowest_steps: how many of the slowest steps are kept with the time of each section
+        :param window: how many of the latest samples of each section are kept for the percentiles
+        """
+        assert window > 0, f"window has to be positive, was {window}"
+        self.window: int = window
+        self.sections: Dict[str, SectionTimes] = {}
+        self.steps: int = 0
+        self._slowest_steps_count: int = slowest_steps
+        # Min-heap of (step time, step, game loop, section times) of the slowest steps
+        self._slowest_steps: List[Tuple[float, int, int, Dict[str, float]]] = []
+        self._current_step: Dict[str, float] = {}
+
+    @property
+    def samples(self) -> Dict[str, array]:
+        """ The kept samples of every section in seconds, in the order they were recorded. """
+        return {name: section.recent() for name, section in self.sections.items()}
+
+    def record(self, name: str, seconds: float):
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = SectionTimes(self.window)
+        section.add(seconds)
+        self._current_step[name] = self._current_step.get(name, 0) + seconds
+
+    def end_step(self, game_loop: int, step_time: float):
+        """ Closes the sections of the current step, called once per step by BotAI._after_step.
+
+        :param game_loop:
+        :param step_time: seconds """
+        self.steps += 1
+        entry = (step_time, self.steps, game_loop, self._current_step)
+        if len(self._slowest_steps) < self._slowest_steps_count:
+            heapq.heappush(self._slowest_steps, entry)
+        elif step_time > self._slowest_steps[0][0]:
+            heapq.heapreplace(self._slowest_steps, entry)
+        self._current_step = {}
+
+    def percentiles(
+        self, name: str, window: Optional[int] = None, fractions: Iterable[float] = PERCENTILES
+    ) -> Dict[float, float]:
+        """ Returns the percentiles of a section in seconds, of the kept samples or of the last 'window' of them.
+
+        :param name:
+        :param window:
+        :param fractions: """
+        section = self.sections.get(name)
+        if section is None or not section.count:
+            return {fraction: 0.0 for fraction in fractions}
+        values = sorted(section.recent(window))
+        return {fraction: values[min(len(values) - 1, int(fraction * len(values)))] for fraction in fractions}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Statistics of all sections in milliseconds, sorted by the total time. The percentiles are of the kept
+        samples, all other values of the whole game. """
+        result = {}
+        for name, section in self.sections.items():
+            percentiles = self.percentiles(name)
+            total = section.total
+            result[name] = {
+                "count": section.count,
+                "total": total * 1000,
+                "mean": total / section.count * 1000,
+                "p50": percentiles[0.5] * 1000,
+                "p95": percentiles[0.95] * 1000,
+                "p99": percentiles[0.99] * 1000,
+                "max": section.max * 1000,
+                # Average time per step, also for sections that do not run every step
+                "per_step": total / max(self.steps, 1) * 1000,
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]["total"], reverse=True))
+
+    def slowest_steps(self) -> List[Dict]:
+        """ The slowest steps with the time of each section in milliseconds, slowest first. """
+        return [
+            {
+                "game_loop": game_loop,
+                "step_time": step_time * 1000,
+                "sections": {
+                    name: seconds * 1000
+                    for name, seconds in sorted(sections.items(), key=lambda item: item[1], reverse=True)
+                },
+            }
+            for step_time, _, game_loop, sections in sorted(self._slowest_steps, reverse=True)
+        ]
+
+    def write_json(self, path: str):
+        report = {"steps": self.steps, "sections": self.summary(), "slowest_steps": self.slowest_steps()}
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    def write_csv(self, path: str):
+        columns = ["count", "total", "mean", "p50", "p95", "p99", "max", "per_step"]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["section"] + [f"{column}_ms" if column != "count" else column for column in columns])
+            for name, statistics in self.summary().items():
+                writer.writerow([name] + [round(statistics[column], 4) for column in columns])
+
+    def write_reports(self, path_without_extension: str):
+        """ Writes the report to 'path_without_extension' with .json and .csv added. """
+        self.write_json(path_without_extension + ".json")
+        self.write_csv(path_without_extension + ".csv")
+
@@ -0,0 +1,76 @@
+import asyncio
+import csv
+import json
+import os
+
+import pytest
+
+from .local_server import LocalServer, play_local_game
+from .observation_replayer import RecordedGame
+from .observation_replayer_test import MoveBot, record_game
+from .step_profiler import StepProfiler
+
+
+class TestStepProfiler:
+    def test_percentiles(self):
+        profiler = StepProfiler()
+        for value in range(1, 101):
+            profiler.record("section", value / 1000)
+
+        assert profiler.percentiles("section") == {0.5: 0.051, 0.95: 0.096, 0.99: 0.1}
+        # The last 10 samples are 91 ... 100 ms
+        assert profiler.percentiles("section", window=10)[0.5] == 0.096
+        assert profiler.percentiles("unknown") == {0.5: 0, 0.95: 0, 0.99: 0}
+
+    def test_only_the_window_is_kept(self):
+        profiler = StepProfiler(window=10)
+        for value in range(1, 26):
+            profiler.record("section", value / 1000)
+
+        assert profiler.samples["section"].tolist() == [value / 1000 for value in range(16, 26)]
+        assert profiler.percentiles("section")[0.5] == 0.021
+        assert profiler.percentiles("section", window=4)[0.5] == 0.024
+        summary = profiler.summary()["section"]
+        assert summary["count"] == 25
+        assert summary["total"] == pytest.approx(325)
+        assert summary["max"] == 25
+        assert summary["p99"] == 25
+
+    def test_slowest_steps_keep_the_sections(self):
+        profiler = StepProfiler(slowest_steps=2)
+        for game_loop, step_time in enumerate((0.01, 0.05, 0.02, 0.04)):
+            profiler.record("a", step_time / 2)
+            profiler.record("b", step_time / 2)
+            profiler.end_step(game_loop, step_time)
+
+        slowest = profiler.slowest_steps()
+        assert [step["game_loop"] for step in slowest] == [1, 3]
+        assert slowest[0]["sections"] == {"a": 25, "b": 25}
+        assert profiler.summary()["a"]["per_step"] == profiler.summary()["a"]["total"] / 4
+
+    def test_reports_are_written_at_game_end(self, tmp_path):
+        path = str(tmp_path / "game.sc2obs")
+        record_game(path, 4)
+        bot = MoveBot()
+        bot.step_profile_dir = str(tmp_path / "profiles")
+
+        async def play():
+            async with LocalServer(RecordedGame(path)) as server:
+                await play_local_game(bot, server)
+
+        asyncio.run(play())
+
+        files = sorted(os.listdir(bot.step_profile_dir))
+        assert [os.path.splitext(name)[1] for name in files] == [".csv", ".json"]
+        with open(os.path.join(bot.step_profile_dir, files[1])) as file:
+            report = json.load(file)
+        assert report["steps"] == 4
+        sections = report["sections"]
+        for name in ("bot.prepare_step", "bot.issue_events", "bot.step", "bot.after_step"):
+            assert sections[name]["count"] == 4
+        assert sections["protocol.receive.query"]["count"] == 4
+        assert sections["protocol.send.action"]["count"] == 4
+        with open(os.path.join(bot.step_profile_dir, files[0])) as file:
+            rows = list(csv.reader(file))
+        assert rows[0][:3] == ["section", "count", "total_ms"]
+        assert {row[0] for row in rows[1:]} == set(sections)
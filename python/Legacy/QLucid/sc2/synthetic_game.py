@@ -0,0 +1,656 @@
+"""
+Builds game data, game info and observation protos of a made-up game, so that large game states can be tested and
+benchmarked without the game.
+
+The unit values (health, weapons, costs, ...) are close to the real ones, but they are not meant to be exact.
+
+Example::
+
+    game = SyntheticGame(map_size=(160, 140))
+    bot = game.start_bot(MyBot(), game.observation(own_count=500, enemy_count=500))
+"""
+from __future__ import annotations
+import itertools
+import math
+import random
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+from s2clientprotocol import common_pb2 as common_pb
+from s2clientprotocol import data_pb2 as data_pb
+from s2clientprotocol import raw_pb2 as raw_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from .data import Race
+from .game_data import GameData
+from .game_info import GameInfo
+from .game_state import GameState
+from .ids.ability_id import AbilityId
+from .ids.unit_typeid import UnitTypeId
+from .observation_recorder import ObservationRecorder
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+
+OWN_PLAYER_ID = 1
+ENEMY_PLAYER_ID = 2
+LOW_GROUND_HEIGHT = 100
+HIGH_GROUND_HEIGHT = 140
+# Half size of the high ground around the start locations
+PLATEAU_RADIUS = 13
+RAMP_LENGTH = 6
+RAMP_WIDTH = 4
+EXPANSION_SPACING = 36
+MAP_MARGIN = 8
+
+LIGHT = data_pb.Light
+ARMORED = data_pb.Armored
+BIOLOGICAL = data_pb.Biological
+MECHANICAL = data_pb.Mechanical
+MASSIVE = data_pb.Massive
+STRUCTURE = data_pb.Structure
+GROUND = data_pb.Weapon.Ground
+AIR = data_pb.Weapon.Air
+ANY = data_pb.Weapon.Any
+# 'None' is a keyword in Python
+NO_TARGET = data_pb.AbilityData.Target.Value("None")
+
+
+class UnitSpec(NamedTuple):
+    race: Race
+    radius: float
+    health: float
+    shield: float = 0
+    attributes: Tuple[int, ...] = ()
+    # (target type, damage, range, cooldown)
+    weapons: Tuple[Tuple[int, float, float, float], ...] = ()
+    food: float = 0
+    minerals: int = 0
+    vespene: int = 0
+    speed: float = 0
+    sight: float = 9
+    is_flying: bool = False
+    # Only structures have a footprint
+    footprint_radius: float = 0
+
+
+UNIT_SPECS: Dict[UnitTypeId, UnitSpec] = {
+    # Protoss
+    UnitTypeId.PROBE: UnitSpec(
+        Race.Protoss, 0.375, 20, 20, (LIGHT, MECHANICAL), ((GROUND, 5, 0.1, 1.07),), 1, 50, 0, 3.94, 8
+    ),
+    UnitTypeId.ZEALOT: UnitSpec(
+        Race.Protoss, 0.5, 100, 50, (LIGHT, BIOLOGICAL), ((GROUND, 8, 0.1, 0.86),), 2, 100, 0, 3.15
+    ),
+    UnitTypeId.STALKER: UnitSpec(
+        Race.Protoss, 0.625, 80, 80, (ARMORED, MECHANICAL), ((ANY, 13, 6, 1.34),), 2, 125, 50, 4.13, 10
+    ),
+    UnitTypeId.IMMORTAL: UnitSpec(
+        Race.Protoss, 0.75, 200, 100, (ARMORED, MECHANICAL), ((GROUND, 20, 6, 1.04),), 4, 275, 100, 3.15
+    ),
+    UnitTypeId.COLOSSUS: UnitSpec(
+        Race.Protoss, 1, 200, 150, (ARMORED, MECHANICAL, MASSIVE), ((GROUND, 10, 7, 1.07),), 6, 300, 200, 3.15, 10
+    ),
+    UnitTypeId.OBSERVER: UnitSpec(Race.Protoss, 0.5, 40, 20, (LIGHT, MECHANICAL), (), 1, 25, 75, 2.63, 11, True),
+    UnitTypeId.NEXUS: UnitSpec(
+        Race.Protoss, 2.75, 1000, 1000, (ARMORED, STRUCTURE), minerals=400, sight=11, footprint_radius=2.5
+    ),
+    UnitTypeId.PYLON: UnitSpec(
+        Race.Protoss, 1.125, 200, 200, (ARMORED, STRUCTURE), minerals=100, sight=9, footprint_radius=1
+    ),
+    UnitTypeId.GATEWAY: UnitSpec(
+        Race.Protoss, 1.8125, 500, 500, (ARMORED, STRUCTURE), minerals=150, sight=9, footprint_radius=1.5
+    ),
+    # Terran
+    UnitTypeId.SCV: UnitSpec(
+        Race.Terran, 0.375, 45, 0, (LIGHT, BIOLOGICAL, MECHANICAL), ((GROUND, 5, 0.1, 1.07),), 1, 50, 0, 3.94, 8
+    ),
+    UnitTypeId.MARINE: UnitSpec(Race.Terran, 0.375, 45, 0, (LIGHT, BIOLOGICAL), ((ANY, 6, 5, 0.61),), 1, 50, 0, 3.15),
+    UnitTypeId.MARAUDER: UnitSpec(
+        Race.Terran, 0.5625, 125, 0, (ARMORED, BIOLOGICAL), ((GROUND, 10, 6, 1.07),), 2, 100, 25, 3.15, 10
+    ),
+    UnitTypeId.SIEGETANK: UnitSpec(
+        Race.Terran, 0.875, 175, 0, (ARMORED, MECHANICAL), ((GROUND, 15, 7, 0.74),), 3, 150, 125, 3.15, 11
+    ),
+    UnitTypeId.MEDIVAC: UnitSpec(Race.Terran, 0.75, 150, 0, (ARMORED, MECHANICAL), (), 2, 100, 100, 3.5, 11, True),
+    UnitTypeId.VIKINGFIGHTER: UnitSpec(
+        Race.Terran, 0.75, 135, 0, (ARMORED, MECHANICAL), ((AIR, 10, 9, 1.43),), 2, 150, 75, 3.85, 10, True
+    ),
+    UnitTypeId.COMMANDCENTER: UnitSpec(
+        Race.Terran, 2.75, 1500, 0, (ARMORED, MECHANICAL, STRUCTURE), minerals=400, sight=11, footprint_radius=2.5
+    ),
+    UnitTypeId.SUPPLYDEPOT: UnitSpec(
+        Race.Terran, 1.125, 400, 0, (ARMORED, MECHANICAL, STRUCTURE), minerals=100, sight=9, footprint_radius=1
+    ),
+    UnitTypeId.BARRACKS: UnitSpec(
+        Race.Terran, 1.8125, 1000, 0, (ARMORED, MECHANICAL, STRUCTURE), minerals=150, sight=9, footprint_radius=1.5
+    ),
+    # Zerg
+    UnitTypeId.DRONE: UnitSpec(
+        Race.Zerg, 0.375, 40, 0, (LIGHT, BIOLOGICAL), ((GROUND, 5, 0.1, 1.07),), 1, 50, 0, 3.94, 8
+    ),
+    UnitTypeId.ZERGLING: UnitSpec(
+        Race.Zerg, 0.375, 35, 0, (LIGHT, BIOLOGICAL), ((GROUND, 5, 0.1, 0.497),), 0.5, 25, 0, 4.13, 8
+    ),
+    UnitTypeId.ROACH: UnitSpec(
+        Race.Zerg, 0.625, 145, 0, (ARMORED, BIOLOGICAL), ((GROUND, 16, 4, 1.43),), 2, 75, 25, 3.15
+    ),
+    UnitTypeId.HYDRALISK: UnitSpec(
+        Race.Zerg, 0.625, 90, 0, (LIGHT, BIOLOGICAL), ((ANY, 12, 5, 0.59),), 2, 100, 50, 3.15
+    ),
+    UnitTypeId.MUTALISK: UnitSpec(
+        Race.Zerg, 0.5, 120, 0, (LIGHT, BIOLOGICAL), ((ANY, 9, 3, 1.09),), 2, 100, 100, 5.6, 11, True
+    ),
+    UnitTypeId.QUEEN: UnitSpec(
+        Race.Zerg, 0.875, 175, 0, (BIOLOGICAL,), ((GROUND, 4, 5, 0.71), (AIR, 9, 7, 0.71)), 2, 150, 0, 1.31
+    ),
+    UnitTypeId.HATCHERY: UnitSpec(
+        Race.Zerg, 2.75, 1500, 0, (ARMORED, BIOLOGICAL, STRUCTURE), minerals=300, sight=12, footprint_radius=2.5
+    ),
+    UnitTypeId.SPINECRAWLER: UnitSpec(
+        Race.Zerg,
+        1,
+        300,
+        0,
+        (ARMORED, BIOLOGICAL, STRUCTURE),
+        weapons=((GROUND, 25, 7, 1.32),),
+        minerals=100,
+        sight=11,
+        footprint_radius=1,
+    ),
+    UnitTypeId.SPAWNINGPOOL: UnitSpec(
+        Race.Zerg, 1.8125, 1000, 0, (ARMORED, BIOLOGICAL, STRUCTURE), minerals=200, sight=9, footprint_radius=1.5
+    ),
+    # Resources
+    UnitTypeId.MINERALFIELD: UnitSpec(Race.NoRace, 1.125, 0, 0, (STRUCTURE,)),
+    UnitTypeId.VESPENEGEYSER: UnitSpec(Race.NoRace, 1.8125, 0, 0, (STRUCTURE,)),
+}
+
+CREATION_ABILITIES: Dict[UnitTypeId, AbilityId] = {
+    UnitTypeId.NEXUS: AbilityId.PROTOSSBUILD_NEXUS,
+    UnitTypeId.PYLON: AbilityId.PROTOSSBUILD_PYLON,
+    UnitTypeId.GATEWAY: AbilityId.PROTOSSBUILD_GATEWAY,
+    UnitTypeId.COMMANDCENTER: AbilityId.TERRANBUILD_COMMANDCENTER,
+    UnitTypeId.SUPPLYDEPOT: AbilityId.TERRANBUILD_SUPPLYDEPOT,
+    UnitTypeId.BARRACKS: AbilityId.TERRANBUILD_BARRACKS,
+    UnitTypeId.HATCHERY: AbilityId.ZERGBUILD_HATCHERY,
+    UnitTypeId.SPINECRAWLER: AbilityId.ZERGBUILD_SPINECRAWLER,
+    UnitTypeId.SPAWNINGPOOL: AbilityId.ZERGBUILD_SPAWNINGPOOL,
+    UnitTypeId.PROBE: AbilityId.NEXUSTRAIN_PROBE,
+    UnitTypeId.ZEALOT: AbilityId.GATEWAYTRAIN_ZEALOT,
+    UnitTypeId.STALKER: AbilityId.GATEWAYTRAIN_STALKER,
+    UnitTypeId.IMMORTAL: AbilityId.ROBOTICSFACILITYTRAIN_IMMORTAL,
+    UnitTypeId.COLOSSUS: AbilityId.ROBOTICSFACILITYTRAIN_COLOSSUS,
+    UnitTypeId.OBSERVER: AbilityId.ROBOTICSFACILITYTRAIN_OBSERVER,
+    UnitTypeId.SCV: AbilityId.COMMANDCENTERTRAIN_SCV,
+    UnitTypeId.MARINE: AbilityId.BARRACKSTRAIN_MARINE,
+    UnitTypeId.MARAUDER: AbilityId.BARRACKSTRAIN_MARAUDER,
+    UnitTypeId.SIEGETANK: AbilityId.FACTORYTRAIN_SIEGETANK,
+    UnitTypeId.MEDIVAC: AbilityId.STARPORTTRAIN_MEDIVAC,
+    UnitTypeId.VIKINGFIGHTER: AbilityId.STARPORTTRAIN_VIKINGFIGHTER,
+    UnitTypeId.DRONE: AbilityId.LARVATRAIN_DRONE,
+    UnitTypeId.ZERGLING: AbilityId.LARVATRAIN_ZERGLING,
+    UnitTypeId.ROACH: AbilityId.LARVATRAIN_ROACH,
+    UnitTypeId.HYDRALISK: AbilityId.LARVATRAIN_HYDRALISK,
+    UnitTypeId.MUTALISK: AbilityId.LARVATRAIN_MUTALISK,
+    UnitTypeId.QUEEN: AbilityId.TRAINQUEEN_QUEEN,
+}
+
+TOWNHALLS: Dict[Race, UnitTypeId] = {
+    Race.Protoss: UnitTypeId.NEXUS,
+    Race.Terran: UnitTypeId.COMMANDCENTER,
+    Race.Zerg: UnitTypeId.HATCHERY,
+}
+
+# Share of the unit types in the generated units per race
+DEFAULT_MIXES: Dict[Race, Dict[UnitTypeId, float]] = {
+    Race.Protoss: {
+        UnitTypeId.PROBE: 0.2,
+        UnitTypeId.ZEALOT: 0.25,
+        UnitTypeId.STALKER: 0.25,
+        UnitTypeId.IMMORTAL: 0.1,
+        UnitTypeId.COLOSSUS: 0.05,
+        UnitTypeId.OBSERVER: 0.05,
+        UnitTypeId.PYLON: 0.05,
+        UnitTypeId.GATEWAY: 0.05,
+    },
+    Race.Terran: {
+        UnitTypeId.SCV: 0.2,
+        UnitTypeId.MARINE: 0.35,
+        UnitTypeId.MARAUDER: 0.15,
+        UnitTypeId.SIEGETANK: 0.1,
+        UnitTypeId.MEDIVAC: 0.05,
+        UnitTypeId.VIKINGFIGHTER: 0.05,
+        UnitTypeId.SUPPLYDEPOT: 0.05,
+        UnitTypeId.BARRACKS: 0.05,
+    },
+    Race.Zerg: {
+        UnitTypeId.DRONE: 0.2,
+        UnitTypeId.ZERGLING: 0.3,
+        UnitTypeId.ROACH: 0.2,
+        UnitTypeId.HYDRALISK: 0.15,
+        UnitTypeId.MUTALISK: 0.05,
+        UnitTypeId.QUEEN: 0.05,
+        UnitTypeId.SPINECRAWLER: 0.025,
+        UnitTypeId.SPAWNINGPOOL: 0.025,
+    },
+}
+
+
+class SyntheticGame:
+    """ A made-up game on a generated map with a high ground main base and a ramp per start location, and mineral
+    fields and geysers at every expansion. The own player starts in the bottom left, the enemy in the top right. """
+
+    def __init__(
+        self,
+        map_size: Tuple[int, int] = (160, 140),
+        own_race: Race = Race.Protoss,
+        enemy_race: Race = Race.Zerg,
+        seed: int = 0,
+    ):
+        """
+        :param map_size: width and height
+        :param own_race:
+        :param enemy_race:
+        :param seed: the same seed and arguments generate the same game
+        """
+        self.width, self.height = map_size
+        self.own_race: Race = own_race
+        self.enemy_race: Race = enemy_race
+        self.seed: int = seed
+        self.playable_area: Tuple[int, int, int, int] = (
+            MAP_MARGIN,
+            MAP_MARGIN,
+            self.width - MAP_MARGIN,
+            self.height - MAP_MARGIN,
+        )
+        x0, y0, x1, y1 = self.playable_area
+        inset = PLATEAU_RADIUS + 7
+        self.own_start: Tuple[float, float] = (x0 + inset + 0.5, y0 + inset + 0.5)
+        self.enemy_start: Tuple[float, float] = (x1 - inset - 0.5, y1 - inset - 0.5)
+        self.expansions: List[Tuple[float, float]] = self._create_expansions()
+        self._resources: List[Tuple[UnitTypeId, Tuple[float, float], int]] = self._create_resources()
+        self._game_info: Optional[sc_pb.ResponseGameInfo] = None
+        self._game_data: Optional[sc_pb.ResponseData] = None
+
+    def game_data(self) -> sc_pb.ResponseData:
+        """ Type data of all units in UNIT_SPECS and the abilities that create them. """
+        if self._game_data is None:
+            data = sc_pb.ResponseData()
+            for unit_type, spec in UNIT_SPECS.items():
+                unit_data = data.units.add(
+                    unit_id=unit_type.value,
+                    name=unit_type.name.title().replace("_", ""),
+                    available=True,
+                    race=spec.race.value,
+                    food_required=spec.food,
+                    mineral_cost=spec.minerals,
+                    vespene_cost=spec.vespene,
+                    movement_speed=spec.speed,
+                    sight_range=spec.sight,
+                )
+                unit_data.attributes.extend(spec.attributes)
+                for target_type, damage, weapon_range, cooldown in spec.weapons:
+                    unit_data.weapons.add(
+                        type=target_type, damage=damage, attacks=1, range=weapon_range, speed=cooldown
+                    )
+                if unit_type in CREATION_ABILITIES:
+                    ability = CREATION_ABILITIES[unit_type]
+                    unit_data.ability_id = ability.value
+                    # Structures are placed at a point, units are trained without a target
+                    target = data_pb.AbilityData.Point if spec.footprint_radius else NO_TARGET
+                    data.abilities.add(
+                        ability_id=ability.value,
+                        link_name=unit_type.name,
+                        available=True,
+                        target=target,
+                        footprint_radius=spec.footprint_radius,
+                    )
+            self._game_data = data
+        return self._game_data
+
+    def game_info(self) -> sc_pb.ResponseGameInfo:
+        if self._game_info is None:
+            self._game_info = self._create_game_info()
+        return self._game_info
+
+    def observation(
+        self,
+        own_count: int,
+        enemy_count: int,
+        own_mix: Dict[UnitTypeId, float] = None,
+        enemy_mix: Dict[UnitTypeId, float] = None,
+        clusters: int = 4,
+        cluster_spread: float = 6,
+        full_vision: bool = True,
+        cloaked_fraction: float = 0,
+        game_loop: int = 0,
+    ) -> sc_pb.ResponseObservation:
+        """ Returns an observation with a townhall at each start location, the resources at every expansion and
+        'own_count' and 'enemy_count' other units. Calls with the same arguments and another 'game_loop' return the
+        same units, moved along their own direction.
+
+        :param own_count:
+        :param enemy_count:
+        :param own_mix: share of each unit type, see DEFAULT_MIXES
+        :param enemy_mix:
+        :param clusters: units of each player are placed around this many random centers
+        :param cluster_spread: standard deviation of the distance of the units to their cluster center
+        :param full_vision: if False, only the area in sight range of own units is visible, enemy units outside of it
+            are not observed and enemy structures are snapshots
+        :param cloaked_fraction: share of the enemy units that are cloaked
+        :param game_loop:
+        """
+        response = sc_pb.ResponseObservation()
+        observation = response.observation
+        observation.game_loop = game_loop
+        raw = observation.raw_data
+
+        rng = random.Random(f"{self.seed} {own_count} {enemy_count}")
+        own_units = self._create_units(
+            raw,
+            rng,
+            OWN_PLAYER_ID,
+            own_count,
+            own_mix or DEFAULT_MIXES[self.own_race],
+            clusters,
+            cluster_spread,
+            game_loop,
+        )
+        enemy_units = self._create_units(
+            raw,
+            rng,
+            ENEMY_PLAYER_ID,
+            enemy_count,
+            enemy_mix or DEFAULT_MIXES[self.enemy_race],
+            clusters,
+            cluster_spread,
+            game_loop,
+            cloaked_fraction,
+        )
+        self._add_resources(raw)
+
+        visibility = self._visibility(own_units, full_vision)
+        raw.map_state.visibility.CopyFrom(self._image(visibility, 8))
+        if not full_vision:
+            hidden_tags = set()
+            for unit in enemy_units:
+                x, y = int(unit.pos.x), int(unit.pos.y)
+                if visibility[y, x] == 2:
+                    continue
+                if STRUCTURE in UNIT_SPECS[UnitTypeId(unit.unit_type)].attributes:
+                    unit.display_type = raw_pb.Snapshot
+                else:
+                    hidden_tags.add(unit.tag)
+            # Removing single units from a repeated field compares whole messages, rebuilding the field is faster
+            observed = [unit for unit in raw.units if unit.tag not in hidden_tags]
+            del raw.units[:]
+            raw.units.extend(observed)
+        raw.map_state.creep.CopyFrom(self._image(self._creep(raw), 1))
+
+        common = observation.player_common
+        common.player_id = OWN_PLAYER_ID
+        common.minerals = 1000
+        common.vespene = 500
+        common.food_used = int(sum(UNIT_SPECS[UnitTypeId(unit.unit_type)].food for unit in own_units))
+        common.food_cap = 200
+        for unit in own_units:
+            if unit.unit_type == UnitTypeId.PYLON.value:
+                raw.player.power_sources.add(pos=unit.pos, radius=6.5, tag=unit.tag)
+        return response
+
+    def start_bot(self, bot: BotAI, observation: sc_pb.ResponseObservation, client=None) -> BotAI:
+        """ Runs the same preparations as main.py until the first on_step.
+
+        :param bot:
+        :param observation:
+        :param client: """
+        bot._initialize_variables()
+        bot._prepare_start(client, OWN_PLAYER_ID, GameInfo(self.game_info()), GameData(self.game_data()))
+        bot._prepare_step(GameState(observation), sc_pb.Response(game_info=self.game_info()))
+        bot._prepare_first_step()
+        return bot
+
+    def write_recording(self, path: str, frames: int, game_step: int = 8, **observation_kwargs):
+        """ Writes a game in the format of ObservationRecorder, e.g. for benchmarks/benchmark_replay.py.
+
+        :param path:
+        :param frames:
+        :param game_step: game loops between the observations
+        :param observation_kwargs: see observation """
+        recorder = ObservationRecorder(path, OWN_PLAYER_ID)
+        try:
+            recorder.record(sc_pb.Response(data=self.game_data()))
+            recorder.record(sc_pb.Response(game_info=self.game_info()))
+            for frame in range(frames):
+                observation = self.observation(game_loop=frame * game_step, **observation_kwargs)
+                recorder.record(sc_pb.Response(observation=observation))
+                recorder.record(sc_pb.Response(game_info=self.game_info()))
+        finally:
+            recorder.close()
+
+    def _create_expansions(self) -> List[Tuple[float, float]]:
+        x0, y0, x1, y1 = self.playable_area
+        expansions = [self.own_start, self.enemy_start]
+        inset = 14
+        for x in np.arange(x0 + inset, x1 - inset + 1, EXPANSION_SPACING):
+            for y in np.arange(y0 + inset, y1 - inset + 1, EXPANSION_SPACING):
+                position = (int(x) + 0.5, int(y) + 0.5)
+                if all(math.hypot(position[0] - e[0], position[1] - e[1]) >= EXPANSION_SPACING for e in expansions):
+                    expansions.append(position)
+        return expansions
+
+    def _create_game_info(self) -> sc_pb.ResponseGameInfo:
+        game_info = sc_pb.ResponseGameInfo(map_name=f"Synthetic{self.width}x{self.height}")
+        game_info.player_info.add(
+            player_id=OWN_PLAYER_ID, type=sc_pb.Participant, race_requested=self.own_race.value
+        )
+        game_info.player_info.add(
+            player_id=ENEMY_PLAYER_ID, type=sc_pb.Participant, race_requested=self.enemy_race.value
+        )
+        start_raw = game_info.start_raw
+        start_raw.map_size.x, start_raw.map_size.y = self.width, self.height
+        x0, y0, x1, y1 = self.playable_area
+        start_raw.playable_area.p0.x, start_raw.playable_area.p0.y = x0, y0
+        start_raw.playable_area.p1.x, start_raw.playable_area.p1.y = x1, y1
+        start_raw.start_locations.add(x=self.enemy_start[0], y=self.enemy_start[1])
+
+        pathable = np.zeros((self.height, self.width), dtype=bool)
+        pathable[y0:y1, x0:x1] = True
+        placeable = pathable.copy()
+        height = np.full((self.height, self.width), LOW_GROUND_HEIGHT, dtype=np.uint8)
+        map_center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        for start in (self.own_start, self.enemy_start):
+            sx, sy = int(start[0]), int(start[1])
+            top, bottom = sy - PLATEAU_RADIUS, sy + PLATEAU_RADIUS + 1
+            left, right = sx - PLATEAU_RADIUS, sx + PLATEAU_RADIUS + 1
+            height[top:bottom, left:right] = HIGH_GROUND_HEIGHT
+            # The cliff around the high ground
+            for grid in (pathable, placeable):
+                grid[top - 1 : bottom + 1, left - 1 : right + 1] = False
+                grid[top:bottom, left:right] = True
+            # The ramp leads from the side of the high ground towards the map center
+            direction = 1 if map_center[0] > start[0] else -1
+            edge = right if direction == 1 else left - 1
+            for step in range(RAMP_LENGTH):
+                x = edge + direction * step
+                drop = (HIGH_GROUND_HEIGHT - LOW_GROUND_HEIGHT) * (step + 1) / (RAMP_LENGTH + 1)
+                for y in range(sy - RAMP_WIDTH // 2, sy + RAMP_WIDTH - RAMP_WIDTH // 2):
+                    pathable[y, x] = True
+                    placeable[y, x] = False
+                    height[y, x] = int(HIGH_GROUND_HEIGHT - drop)
+
+        start_raw.pathing_grid.CopyFrom(self._image(pathable, 1))
+        start_raw.placement_grid.CopyFrom(self._image(placeable, 1))
+        start_raw.terrain_height.CopyFrom(self._image(height, 8))
+        return game_info
+
+    def _create_units(
+        self,
+        raw: raw_pb.ObservationRaw,
+        rng: random.Random,
+        owner: int,
+        count: int,
+        mix: Dict[UnitTypeId, float],
+        clusters: int,
+        cluster_spread: float,
+        game_loop: int,
+        cloaked_fraction: float = 0,
+    ) -> List[raw_pb.Unit]:
+        is_own = owner == OWN_PLAYER_ID
+        alliance = raw_pb.Self if is_own else raw_pb.Enemy
+        x0, y0, x1, y1 = self.playable_area
+        start = self.own_start if is_own else self.enemy_start
+        townhall = TOWNHALLS[self.own_race if is_own else self.enemy_race]
+        tag_base = owner << 32
+
+        units = [self._add_unit(raw, tag_base, townhall, alliance, owner, start)]
+        centers = [start] + [(rng.uniform(x0 + 4, x1 - 4), rng.uniform(y0 + 4, y1 - 4)) for _ in range(clusters - 1)]
+        unit_types = rng.choices(list(mix.keys()), weights=list(mix.values()), k=count)
+        for index, unit_type in enumerate(unit_types):
+            center = centers[index % len(centers)]
+            x = center[0] + rng.gauss(0, cluster_spread)
+            y = center[1] + rng.gauss(0, cluster_spread)
+            spec = UNIT_SPECS[unit_type]
+            if spec.speed > 0:
+                angle = rng.uniform(0, 2 * math.pi)
+                # Game speed faster has 22.4 game loops per second, movement speed is per normal speed second
+                distance = spec.speed * 1.4 * game_loop / 22.4
+                x += math.cos(angle) * distance
+                y += math.sin(angle) * distance
+            elif spec.footprint_radius:
+                # Structures are placed on the grid
+                offset = 0.5 if spec.footprint_radius * 2 % 2 else 0
+                x, y = round(x) + offset, round(y) + offset
+            x = min(max(x, x0 + 1), x1 - 1)
+            y = min(max(y, y0 + 1), y1 - 1)
+            unit = self._add_unit(raw, tag_base + index + 1, unit_type, alliance, owner, (x, y))
+            if not is_own and spec.speed > 0 and rng.random() < cloaked_fraction:
+                unit.cloak = raw_pb.Cloaked
+            units.append(unit)
+        return units
+
+    def _add_unit(
+        self,
+        raw: raw_pb.ObservationRaw,
+        tag: int,
+        unit_type: UnitTypeId,
+        alliance: int,
+        owner: int,
+        position: Tuple[float, float],
+    ) -> raw_pb.Unit:
+        spec = UNIT_SPECS[unit_type]
+        unit = raw.units.add(
+            tag=tag,
+            unit_type=unit_type.value,
+            alliance=alliance,
+            owner=owner,
+            display_type=raw_pb.Visible,
+            cloak=raw_pb.NotCloaked,
+            radius=spec.radius,
+            build_progress=1,
+            health=spec.health,
+            health_max=spec.health,
+            shield=spec.shield,
+            shield_max=spec.shield,
+            is_flying=spec.is_flying,
+            facing=0,
+        )
+        unit.pos.x, unit.pos.y = position
+        unit.pos.z = self._height_at(position) / 255 * 32 - 16 + (2 if spec.is_flying else 0)
+        return unit
+
+    def _create_resources(self) -> List[Tuple[UnitTypeId, Tuple[float, float], int]]:
+        """ Returns the type, position and contents of the mineral fields and geysers of all expansions. """
+        x0, y0, x1, y1 = self.playable_area
+        map_center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        resources = []
+        for expansion in self.expansions:
+            # Resources are behind the townhall, away from the map center
+            angle = math.atan2(expansion[1] - map_center[1], expansion[0] - map_center[0])
+            group = []
+            for index in range(8):
+                mineral_angle = angle + math.radians(-60 + index * 120 / 7)
+                x = int(expansion[0] + 7 * math.cos(mineral_angle))
+                y = int(expansion[1] + 7 * math.sin(mineral_angle)) + 0.5
+                group.append((UnitTypeId.MINERALFIELD, (x, y), 1800 if index % 2 else 900))
+            for side in (-1, 1):
+                geyser_angle = angle + math.radians(side * 90)
+                x = int(expansion[0] + 8 * math.cos(geyser_angle)) + 0.5
+                y = int(expansion[1] + 8 * math.sin(geyser_angle)) + 0.5
+                group.append((UnitTypeId.VESPENEGEYSER, (x, y), 2250))
+            # Moves the resources so that BotAI finds the expansion at the same location, the start locations
+            # are compared by value
+            found = self._expansion_location(group)
+            dx, dy = expansion[0] - found[0], expansion[1] - found[1]
+            resources.extend((unit_type, (x + dx, y + dy), contents) for unit_type, (x, y), contents in group)
+        return resources
+
+    @staticmethod
+    def _expansion_location(group: List[Tuple[UnitTypeId, Tuple[float, float], int]]) -> Tuple[float, float]:
+        """ The expansion location of a resource group as in BotAI._find_expansion_locations, without the placement
+        grid, which is free around all expansions. """
+        center_x = int(sum(position[0] for _, position, _ in group) / len(group)) + 0.5
+        center_y = int(sum(position[1] for _, position, _ in group) / len(group)) + 0.5
+        points = [
+            (center_x + x, center_y + y)
+            for x, y in itertools.product(range(-7, 8), repeat=2)
+            if math.hypot(x, y) <= 8
+            and all(
+                math.dist((center_x + x, center_y + y), position) > (7 if unit_type == UnitTypeId.VESPENEGEYSER else 6)
+                for unit_type, position, _ in group
+            )
+        ]
+        return min(points, key=lambda point: sum(math.dist(point, position) for _, position, _ in group))
+
+    def _add_resources(self, raw: raw_pb.ObservationRaw):
+        tag = 3 << 32
+        for unit_type, position, contents in self._resources:
+            tag += 1
+            resource = self._add_unit(raw, tag, unit_type, raw_pb.Neutral, 16, position)
+            if unit_type == UnitTypeId.MINERALFIELD:
+                resource.mineral_contents = contents
+            else:
+                resource.vespene_contents = contents
+
+    def _visibility(self, own_units: Sequence[raw_pb.Unit], full_vision: bool) -> np.ndarray:
+        """ 0 hidden, 1 fogged, 2 visible """
+        if full_vision:
+            return np.full((self.height, self.width), 2, dtype=np.uint8)
+        visibility = np.ones((self.height, self.width), dtype=np.uint8)
+        ys, xs = np.mgrid[0 : self.height, 0 : self.width]
+        for unit in own_units:
+            sight = UNIT_SPECS[UnitTypeId(unit.unit_type)].sight
+            left, right = max(int(unit.pos.x - sight), 0), min(int(unit.pos.x + sight) + 1, self.width)
+            top, bottom = max(int(unit.pos.y - sight), 0), min(int(unit.pos.y + sight) + 1, self.height)
+            in_sight = (xs[top:bottom, left:right] + 0.5 - unit.pos.x) ** 2 + (
+                ys[top:bottom, left:right] + 0.5 - unit.pos.y
+            ) ** 2 <= sight ** 2
+            visibility[top:bottom, left:right][in_sight] = 2
+        return visibility
+
+    def _creep(self, raw: raw_pb.ObservationRaw) -> np.ndarray:
+        creep = np.zeros((self.height, self.width), dtype=bool)
+        ys, xs = np.mgrid[0 : self.height, 0 : self.width]
+        for unit in raw.units:
+            if unit.unit_type == UnitTypeId.HATCHERY.value:
+                creep |= (xs + 0.5 - unit.pos.x) ** 2 + (ys + 0.5 - unit.pos.y) ** 2 <= 12 ** 2
+        return creep
+
+    def _height_at(self, position: Tuple[float, float]) -> int:
+        x, y = int(position[0]), int(position[1])
+        for start in (self.own_start, self.enemy_start):
+            if abs(x - int(start[0])) <= PLATEAU_RADIUS and abs(y - int(start[1])) <= PLATEAU_RADIUS:
+                return HIGH_GROUND_HEIGHT
+        return LOW_GROUND_HEIGHT
+
+    @staticmethod
+    def _image(grid: np.ndarray, bits_per_pixel: int) -> common_pb.ImageData:
+        """ Encodes a grid the same way as the game, row 0 is y = 0. """
+        image = common_pb.ImageData(bits_per_pixel=bits_per_pixel)
+        image.size.y, image.size.x = grid.shape
+        if bits_per_pixel == 1:
+            image.data = np.packbits(grid.astype(bool), axis=None).tobytes()
+        else:
+            image.data = grid.astype(np.uint8).tobytes()
+        return image
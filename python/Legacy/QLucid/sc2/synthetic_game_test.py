@@ -0,0 +1,54 @@
+import asyncio
+
+from .bot_ai import BotAI
+from .ids.unit_typeid import UnitTypeId
+from .observation_replayer import replay_game
+from .observation_replayer_test import MoveBot
+from .synthetic_game import SyntheticGame
+
+
+def test_prepare_step():
+    game = SyntheticGame(map_size=(120, 100), seed=1)
+    bot = game.start_bot(BotAI(), game.observation(own_count=200, enemy_count=150, clusters=3))
+
+    assert len(bot.units) + len(bot.structures) == 201
+    assert len(bot.enemy_units) + len(bot.enemy_structures) == 151
+    assert bot.townhalls.first.position == bot.start_location
+    assert sorted(bot.expansion_locations_list) == sorted(game.expansions)
+    assert bot.enemy_start_locations[0] in bot.expansion_locations_list
+    assert bot.game_info.map_ramps
+    assert bot.supply_used > 0
+
+
+def test_observation_is_deterministic():
+    game = SyntheticGame(seed=2)
+    first = game.observation(50, 50, game_loop=0)
+    assert first == game.observation(50, 50, game_loop=0)
+
+    moved = game.observation(50, 50, game_loop=224)
+    assert moved.observation.game_loop == 224
+    assert len(moved.observation.raw_data.units) == len(first.observation.raw_data.units)
+    assert moved.observation.raw_data.units != first.observation.raw_data.units
+
+
+def test_limited_vision():
+    game = SyntheticGame(seed=3)
+    full = game.start_bot(BotAI(), game.observation(50, 300, cloaked_fraction=0.5))
+    limited = game.start_bot(BotAI(), game.observation(50, 300, full_vision=False, cloaked_fraction=0.5))
+
+    assert full.enemy_units(UnitTypeId.ZERGLING).filter(lambda unit: unit.is_cloaked)
+    assert len(limited.enemy_units) < len(full.enemy_units)
+    # Structures out of vision are snapshots
+    assert len(limited.enemy_structures) == len(full.enemy_structures)
+    assert limited.enemy_structures.filter(lambda unit: unit.is_snapshot)
+    assert limited.state.visibility[limited.start_location.rounded] == 2
+
+
+def test_write_recording(tmp_path):
+    path = str(tmp_path / "synthetic.sc2obs")
+    SyntheticGame(seed=4).write_recording(path, frames=3, own_count=20, enemy_count=20)
+
+    bot = MoveBot()
+    frames = asyncio.run(replay_game(bot, path))
+    assert [frame.game_loop for frame in frames] == [0, 8, 16]
+    assert [iteration for iteration, _, _ in bot.steps] == [0, 1, 2]
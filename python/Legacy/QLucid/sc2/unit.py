@@ -3,7 +3,7 @@ import warnings
 import math
 from typing import Any, Dict, List, Optional, Set, Tuple, Union, TYPE_CHECKING
 
-from .cache import property_immutable_cache, property_mutable_cache
+from .cache import property_immutable_cache, property_mutable_cache, property_slot_cache
 from .constants import (
     transforming,
     DAMAGE_BONUS_PER_UPGRADE,
@@ -96,6 +96,25 @@ class UnitOrder:
 
 
 class Unit:
+    # Thousands of units are created every step, so the instances have no cache dict by default and the most used
+    # derived values are cached in slots, see property_slot_cache.
+    # '__dict__' is kept so that bots can still store their own attributes on units, it is only created when used.
+    __slots__ = (
+        "_proto",
+        "_bot_object",
+        "_cache",
+        "game_loop",
+        "distance_calculation_index",
+        "_cached_type_id",
+        "_cached_type_data",
+        "_cached_is_structure",
+        "_cached_position_tuple",
+        "_cached_radius",
+        "_cached_ground_range",
+        "_cached_air_range",
+        "__dict__",
+    )
+
     def __init__(self, proto_data, bot_object: BotAI, distance_calculation_index: int = -1):
         """
         :param proto_data:
@@ -103,17 +122,31 @@ class Unit:
         """
         self._proto = proto_data
         self._bot_object: BotAI = bot_object
-        # Used by property_immutable_cache
-        self.cache = {}
+        self._cache: Optional[Dict[str, Any]] = None
         self.game_loop: int = bot_object.state.game_loop
         # Index used in the 2D numpy array to access the 2D distance between two units
         self.distance_calculation_index: int = distance_calculation_index
+        # Used by property_slot_cache
+        self._cached_type_id = None
+        self._cached_type_data = None
+        self._cached_is_structure = None
+        self._cached_position_tuple = None
+        self._cached_radius = None
+        self._cached_ground_range = None
+        self._cached_air_range = None
+
+    @property
+    def cache(self) -> Dict[str, Any]:
+        """ Used by property_immutable_cache, created on first use. """
+        if self._cache is None:
+            self._cache = {}
+        return self._cache
 
     def __repr__(self) -> str:
         """ Returns string of this form: Unit(name='SCV', tag=4396941328). """
         return f"Unit(name={self.name !r}, tag={self.tag})"
 
-    @property_immutable_cache
+    @property_slot_cache
     def type_id(self) -> UnitTypeId:
         """ UnitTypeId found in sc2/ids/unit_typeid.
         Caches all type_ids of the same unit type. """
@@ -122,7 +155,7 @@ class Unit:
             self._bot_object._game_data.unit_types[unit_type] = UnitTypeId(unit_type)
         return self._bot_object._game_data.unit_types[unit_type]
 
-    @property_immutable_cache
+    @property_slot_cache
     def _type_data(self) -> UnitTypeData:
         """ Provides the unit type data. """
         return self._bot_object._game_data.units[self._proto.unit_type]
@@ -147,7 +180,7 @@ class Unit:
         """ Returns the unique tag of the unit. """
         return self._proto.tag
 
-    @property
+    @property_slot_cache
     def is_structure(self) -> bool:
         """ Checks if the unit is a structure. """
         return IS_STRUCTURE in self._type_data.attributes
@@ -233,7 +266,7 @@ class Unit:
                 return (weapon.damage * weapon.attacks) / weapon.speed
         return 0
 
-    @property_immutable_cache
+    @property_slot_cache
     def ground_range(self) -> float:
         """ Returns the range against ground units. Does not include upgrades. """
         if self.type_id == UNIT_ORACLE:
@@ -264,7 +297,7 @@ class Unit:
                 return (weapon.damage * weapon.attacks) / weapon.speed
         return 0
 
-    @property_immutable_cache
+    @property_slot_cache
     def air_range(self) -> float:
         """ Returns the range against air units. Does not include upgrades. """
         if self.type_id == UNIT_BATTLECRUISER:
@@ -498,7 +531,7 @@ class Unit:
         """ Returns the owner of the unit. This is a value of 1 or 2 in a two player game. """
         return self._proto.owner
 
-    @property
+    @property_slot_cache
     def position_tuple(self) -> Tuple[float, float]:
         """ Returns the 2d position of the unit as tuple without conversion to Point2. """
         return self._proto.pos.x, self._proto.pos.y
@@ -825,7 +858,7 @@ class Unit:
         For sensor tower, creep tumor, this return 0.5 """
         return self._bot_object._game_data.units[self._proto.unit_type].footprint_radius
 
-    @property
+    @property_slot_cache
     def radius(self) -> float:
         """ Half of unit size. See https://liquipedia.net/starcraft2/Unit_Statistics_(Legacy_of_the_Void) """
         return self._proto.radius
@@ -0,0 +1,253 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union, TYPE_CHECKING
+
+import numpy as np
+
+from .position import Point2
+from .unit import Unit
+from .units import Units
+
+if TYPE_CHECKING:
+    from .bot_ai import BotAI
+
+# Bits of UnitColumns.flags
+FLAG_FLYING = 1
+FLAG_BURROWED = 2
+FLAG_HALLUCINATION = 4
+FLAG_POWERED = 8
+FLAG_ACTIVE = 16
+FLAG_ON_SCREEN = 32
+FLAG_SELECTED = 64
+
+
+class UnitColumns:
+    """ Column-wise decoded unit protos of one observation.
+
+    All numeric fields that are needed to sort units into the BotAI collections are copied into numpy arrays in a
+    single pass over the protos. The row index of a unit is also its 'distance_calculation_index'.
+    Unit objects are only created when they are accessed, see self.unit and ColumnarUnits. """
+
+    def __init__(self, protos: List[Any], bot_object: BotAI):
+        """
+        :param protos: unit protos without blips and fake effects
+        :param bot_object:
+        """
+        self.protos: List[Any] = protos
+        self._bot_object: BotAI = bot_object
+        self._units: List[Optional[Unit]] = [None] * len(protos)
+        self._row_by_tag: Optional[Dict[int, int]] = None
+
+        count = len(protos)
+        self.tag: np.ndarray = np.fromiter((p.tag for p in protos), dtype=np.uint64, count=count)
+        rows = [
+            (
+                p.unit_type,
+                p.alliance,
+                p.display_type,
+                p.pos.x,
+                p.pos.y,
+                p.pos.z,
+                p.health,
+                p.shield,
+                p.energy,
+                p.build_progress,
+                p.vespene_contents,
+                p.is_flying
+                | p.is_burrowed << 1
+                | p.is_hallucination << 2
+                | p.is_powered << 3
+                | p.is_active << 4
+                | p.is_on_screen << 5
+                | p.is_selected << 6,
+            )
+            for p in protos
+        ]
+        table = np.array(rows, dtype=np.float64).reshape((count, 12))
+        self.type_id: np.ndarray = table[:, 0].astype(np.int32)
+        self.alliance: np.ndarray = table[:, 1].astype(np.int8)
+        self.display_type: np.ndarray = table[:, 2].astype(np.int8)
+        # Shape (n, 2), can be used directly for distance calculations
+        self.positions: np.ndarray = table[:, 3:5]
+        self.z: np.ndarray = table[:, 5]
+        self.health: np.ndarray = table[:, 6]
+        self.shield: np.ndarray = table[:, 7]
+        self.energy: np.ndarray = table[:, 8]
+        self.build_progress: np.ndarray = table[:, 9]
+        self.vespene_contents: np.ndarray = table[:, 10]
+        self.flags: np.ndarray = table[:, 11].astype(np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.protos)
+
+    @property
+    def row_by_tag(self) -> Dict[int, int]:
+        """ Maps the unit tags of this observation to their row index. """
+        if self._row_by_tag is None:
+            self._row_by_tag = dict(zip(self.tag.tolist(), range(len(self))))
+        return self._row_by_tag
+
+    def has_flag(self, flag: int) -> np.ndarray:
+        """ Returns a boolean mask of the units that have the flag set, e.g. has_flag(FLAG_FLYING)
+
+        :param flag: """
+        return (self.flags & flag) != 0
+
+    def type_in(self, type_values: Iterable[int]) -> np.ndarray:
+        """ Returns a boolean mask of the units whose unit type value is in type_values.
+
+        :param type_values: """
+        return np.isin(self.type_id, np.fromiter(type_values, dtype=np.int32))
+
+    def unit(self, index: int) -> Unit:
+        """ Returns the Unit object of a row, it is created on first access and shared by all collections.
+
+        :param index: """
+        unit = self._units[index]
+        if unit is None:
+            unit = Unit(self.protos[index], self._bot_object, distance_calculation_index=index)
+            self._units[index] = unit
+        return unit
+
+    def units(self, indices: np.ndarray) -> ColumnarUnits:
+        """ Returns a lazy Units collection of the given rows.
+
+        :param indices: """
+        return ColumnarUnits(self, indices, self._bot_object)
+
+
+class ColumnarUnits(Units):
+    """ Units collection that is an index view over UnitColumns.
+
+    The Unit objects are only created when the collection is accessed like a list. Length, tags and center are
+    answered from the columns directly. Any modification turns it into a regular list of the Unit objects. """
+
+    def __init__(self, columns: UnitColumns, indices: np.ndarray, bot_object: BotAI):
+        """
+        :param columns:
+        :param indices:
+        :param bot_object:
+        """
+        super().__init__((), bot_object)
+        self._columns: UnitColumns = columns
+        self._indices: np.ndarray = indices
+        self._materialized: bool = len(indices) == 0
+        self._row_mask: Optional[np.ndarray] = None
+
+    def _materialize(self):
+        if not self._materialized:
+            self._materialized = True
+            unit = self._columns.unit
+            list.extend(self, [unit(index) for index in self._indices.tolist()])
+
+    def __len__(self) -> int:
+        if self._materialized:
+            return list.__len__(self)
+        return len(self._indices)
+
+    def __iter__(self):
+        self._materialize()
+        return super().__iter__()
+
+    def _contains_row(self, row: int) -> bool:
+        if self._row_mask is None:
+            self._row_mask = np.zeros(len(self._columns), dtype=bool)
+            self._row_mask[self._indices] = True
+        return self._row_mask[row]
+
+    def find_by_tag(self, tag) -> Optional[Unit]:
+        if self._materialized:
+            return super().find_by_tag(tag)
+        row = self._columns.row_by_tag.get(tag)
+        if row is None or not self._contains_row(row):
+            return None
+        return self._columns.unit(row)
+
+    def __contains__(self, item) -> bool:
+        if self._materialized or not hasattr(item, "tag"):
+            self._materialize()
+            return super().__contains__(item)
+        return self.find_by_tag(item.tag) is not None
+
+    def tags_in(self, other: Union[Set[int], List[int], Dict[int, Any]]) -> Units:
+        if self._materialized:
+            return super().tags_in(other)
+        return self._subgroup_mask(np.isin(self._columns.tag[self._indices], self._tag_array(other)))
+
+    def tags_not_in(self, other: Union[Set[int], List[int], Dict[int, Any]]) -> Units:
+        if self._materialized:
+            return super().tags_not_in(other)
+        return self._subgroup_mask(~np.isin(self._columns.tag[self._indices], self._tag_array(other)))
+
+    @staticmethod
+    def _tag_array(tags: Iterable[int]) -> np.ndarray:
+        return np.fromiter(tags, dtype=np.uint64)
+
+    def _positions_array(self) -> np.ndarray:
+        if self._materialized:
+            return super()._positions_array()
+        return self._columns.positions[self._indices]
+
+    def _distance_calculation_indices(self) -> np.ndarray:
+        if self._materialized:
+            return super()._distance_calculation_indices()
+        return self._indices
+
+    def _subgroup_mask(self, mask: np.ndarray) -> Units:
+        if self._materialized:
+            return super()._subgroup_mask(mask)
+        return ColumnarUnits(self._columns, self._indices[mask], self._bot_object)
+
+    def _unit_at(self, index) -> Unit:
+        if self._materialized:
+            return super()._unit_at(index)
+        return self._columns.unit(int(self._indices[index]))
+
+    @property
+    def tags(self) -> Set[int]:
+        if self._materialized:
+            return super().tags
+        return set(self._columns.tag[self._indices].tolist())
+
+    @property
+    def center(self) -> Point2:
+        if self._materialized:
+            return super().center
+        assert len(self._indices), f"Units object is empty"
+        x, y = self._columns.positions[self._indices].mean(axis=0)
+        return Point2((float(x), float(y)))
+
+
+def _materializing(name: str) -> Callable:
+    units_method = getattr(Units, name)
+
+    def method(self, *args, **kwargs):
+        self._materialize()
+        return units_method(self, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    "__getitem__",
+    "__setitem__",
+    "__delitem__",
+    "__reversed__",
+    "__eq__",
+    "__ne__",
+    "__iadd__",
+    "__imul__",
+    "__mul__",
+    "__repr__",
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "index",
+    "count",
+    "sort",
+    "reverse",
+):
+    setattr(ColumnarUnits, _name, _materializing(_name))
@@ -0,0 +1,79 @@
+from unittest import mock
+
+import numpy as np
+from s2clientprotocol import raw_pb2 as raw_pb
+
+from sc2 import UnitTypeId
+
+from .unit_columns import FLAG_FLYING, UnitColumns
+
+
+def unit_proto(tag: int, unit_type: UnitTypeId, x: float, y: float, alliance: int = 1, is_flying: bool = False):
+    proto = raw_pb.Unit()
+    proto.tag = tag
+    proto.unit_type = unit_type.value
+    proto.alliance = alliance
+    proto.display_type = 1
+    proto.pos.x = x
+    proto.pos.y = y
+    proto.health = 40
+    proto.is_flying = is_flying
+    return proto
+
+
+def mock_bot() -> mock.Mock:
+    bot = mock.Mock()
+    bot.state.game_loop = 0
+    return bot
+
+
+class TestUnitColumns:
+    def test_columns_follow_observation_order(self):
+        protos = [
+            unit_proto(10, UnitTypeId.PROBE, 1, 2),
+            unit_proto(11, UnitTypeId.OBSERVER, 3, 4, is_flying=True),
+            unit_proto(12, UnitTypeId.MINERALFIELD, 5, 6, alliance=3),
+        ]
+        columns = UnitColumns(protos, mock_bot())
+
+        assert len(columns) == 3
+        assert columns.tag.tolist() == [10, 11, 12]
+        assert columns.alliance.tolist() == [1, 1, 3]
+        assert np.array_equal(columns.positions, [[1, 2], [3, 4], [5, 6]])
+        assert columns.has_flag(FLAG_FLYING).tolist() == [False, True, False]
+        assert columns.type_in([UnitTypeId.PROBE.value, UnitTypeId.MINERALFIELD.value]).tolist() == [True, False, True]
+
+    def test_empty_observation(self):
+        columns = UnitColumns([], mock_bot())
+
+        assert len(columns) == 0
+        assert columns.positions.shape == (0, 2)
+        assert not columns.units(np.flatnonzero(columns.alliance == 1))
+
+    def test_units_are_created_lazily_and_shared(self):
+        protos = [unit_proto(tag, UnitTypeId.PROBE, tag, tag) for tag in range(1, 6)]
+        columns = UnitColumns(protos, mock_bot())
+        own = columns.units(np.arange(5))
+        odd = columns.units(np.array([0, 2, 4]))
+
+        assert len(odd) == 3
+        assert odd.tags == {1, 3, 5}
+        assert odd.center == (3, 3)
+        assert columns._units == [None] * 5
+
+        assert [unit.tag for unit in odd] == [1, 3, 5]
+        assert columns._units[1] is None
+        assert odd[0] is own[0]
+        assert odd[1].distance_calculation_index == 2
+
+    def test_tag_lookup_without_creating_units(self):
+        protos = [unit_proto(tag, UnitTypeId.PROBE, tag, tag) for tag in range(1, 6)]
+        columns = UnitColumns(protos, mock_bot())
+        odd = columns.units(np.array([0, 2, 4]))
+
+        assert odd.find_by_tag(2) is None
+        assert odd.find_by_tag(3).tag == 3
+        assert sorted(odd.tags_in([1, 2, 3]).tags) == [1, 3]
+        assert sorted(odd.tags_not_in({1: None}).tags) == [3, 5]
+        assert columns._units.count(None) == 4
+        assert odd.find_by_tag(3) in odd
@@ -2,8 +2,8 @@ from __future__ import annotations
 import random
 import warnings
 import math
-from itertools import chain
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, Generator, TYPE_CHECKING
+from itertools import chain, compress
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union, Generator, TYPE_CHECKING
 
 from .ids.unit_typeid import UnitTypeId
 from .position import Point2, Point3
@@ -19,6 +19,9 @@ if TYPE_CHECKING:
 class Units(list):
     """A collection of Unit objects. Makes it easy to select units by selectors."""
 
+    # Distance queries on Units objects with at least this many units are calculated with numpy instead of a python loop
+    VECTORIZED_QUERY_MIN_UNITS: int = 24
+
     @classmethod
     def from_proto(cls, units, bot_object: BotAI):
         return cls((Unit(u, bot_object=bot_object) for u in units))
@@ -30,6 +33,9 @@ class Units(list):
         """
         super().__init__(units)
         self._bot_object = bot_object
+        # Tag to unit lookup, built on the second lookup and reset when the list is modified, see _find_tag
+        self._tag_map: Optional[Dict[int, Unit]] = None
+        self._tag_lookups: int = 0
 
     def __call__(self, *args, **kwargs):
         return UnitSelection(self, *args, **kwargs)
@@ -44,34 +50,55 @@ class Units(list):
         return self.subgroup(self)
 
     def __or__(self, other: Units) -> Units:
+        self_tags = self._units_by_tag
         return Units(
-            chain(
-                iter(self),
-                (other_unit for other_unit in other if other_unit.tag not in (self_unit.tag for self_unit in self)),
-            ),
+            chain(iter(self), (other_unit for other_unit in other if other_unit.tag not in self_tags)),
             self._bot_object,
         )
 
     def __add__(self, other: Units) -> Units:
+        self_tags = self._units_by_tag
         return Units(
-            chain(
-                iter(self),
-                (other_unit for other_unit in other if other_unit.tag not in (self_unit.tag for self_unit in self)),
-            ),
+            chain(iter(self), (other_unit for other_unit in other if other_unit.tag not in self_tags)),
             self._bot_object,
         )
 
     def __and__(self, other: Units) -> Units:
-        return Units(
-            (other_unit for other_unit in other if other_unit.tag in (self_unit.tag for self_unit in self)),
-            self._bot_object,
-        )
+        self_tags = self._units_by_tag
+        return Units((other_unit for other_unit in other if other_unit.tag in self_tags), self._bot_object)
 
     def __sub__(self, other: Units) -> Units:
-        return Units(
-            (self_unit for self_unit in self if self_unit.tag not in (other_unit.tag for other_unit in other)),
-            self._bot_object,
-        )
+        other_tags = {other_unit.tag for other_unit in other}
+        return Units((self_unit for self_unit in self if self_unit.tag not in other_tags), self._bot_object)
+
+    def __contains__(self, item) -> bool:
+        # Unit.__eq__ compares the tags
+        try:
+            tag = item.tag
+        except AttributeError:
+            return list.__contains__(self, item)
+        return self._find_tag(tag) is not None
+
+    def _find_tag(self, tag: int) -> Optional[Unit]:
+        """ The first lookup scans the units and stops at the match, like the lookups did before the tag map.
+        Most filtered collections are only asked once, the map is only built when a collection is asked again.
+        all_units gets the frame-level map from BotAI._prepare_units. """
+        if self._tag_map is not None:
+            return self._tag_map.get(tag)
+        if self._tag_lookups == 0:
+            self._tag_lookups = 1
+            for unit in self:
+                if unit.tag == tag:
+                    return unit
+            return None
+        return self._units_by_tag.get(tag)
+
+    @property
+    def _units_by_tag(self) -> Dict[int, Unit]:
+        """ Maps the tags to the first unit with that tag. """
+        if self._tag_map is None:
+            self._tag_map = {unit.tag: unit for unit in reversed(self)}
+        return self._tag_map
 
     def __hash__(self):
         return hash(unit.tag for unit in self)
@@ -89,10 +116,7 @@ class Units(list):
         return bool(self)
 
     def find_by_tag(self, tag) -> Optional[Unit]:
-        for unit in self:
-            if unit.tag == tag:
-                return unit
-        return None
+        return self._find_tag(tag)
 
     def by_tag(self, tag):
         unit = self.find_by_tag(tag)
@@ -128,6 +152,25 @@ class Units(list):
         else:
             return self.subgroup(random.sample(self, n))
 
+    def _positions_array(self) -> np.ndarray:
+        """ Positions of the units as array of shape (n, 2). """
+        flat_units_positions = (coord for unit in self for coord in unit.position_tuple)
+        return np.fromiter(flat_units_positions, dtype=float, count=2 * len(self)).reshape((len(self), 2))
+
+    def _distance_calculation_indices(self) -> np.ndarray:
+        """ Rows of the units in the distance matrix of the bot, see DistanceCalculation. """
+        return np.fromiter((unit.distance_calculation_index for unit in self), dtype=np.intp, count=len(self))
+
+    def _is_vectorized(self) -> bool:
+        return len(self) >= self.VECTORIZED_QUERY_MIN_UNITS
+
+    def _subgroup_mask(self, mask: np.ndarray) -> Units:
+        """ Returns the units where mask is True as new Units object. """
+        return self.subgroup(compress(self, mask.tolist()))
+
+    def _unit_at(self, index) -> Unit:
+        return self[int(index)]
+
     # TODO: append, insert, remove, pop and extend functions should reset the cache for Units.positions because the number of units in the list has changed
     # @property_immutable_cache
     # def positions(self) -> np.ndarray:
@@ -158,7 +201,24 @@ class Units(list):
 
         :param unit:
         :param bonus_distance: """
-        return self.filter(lambda x: unit.target_in_range(x, bonus_distance=bonus_distance))
+        if not self._is_vectorized():
+            return self.filter(lambda x: unit.target_in_range(x, bonus_distance=bonus_distance))
+        # Same formula as Unit.target_in_range, targets that can not be attacked get a negative limit
+        can_attack_ground = unit.can_attack_ground
+        can_attack_air = unit.can_attack_air
+        ground_range = unit.ground_range if can_attack_ground else 0
+        air_range = unit.air_range if can_attack_air else 0
+        radius = unit.radius
+        limits = []
+        for target in self:
+            if can_attack_ground and not target.is_flying:
+                limits.append((radius + target.radius + ground_range + bonus_distance) ** 2)
+            elif can_attack_air and (target.is_flying or target.type_id == UnitTypeId.COLOSSUS):
+                limits.append((radius + target.radius + air_range + bonus_distance) ** 2)
+            else:
+                limits.append(-1)
+        distances = self._bot_object._distances_squared_units_to_unit(self, unit)
+        return self._subgroup_mask(distances <= np.array(limits))
 
     def closest_distance_to(self, position: Union[Unit, Point2, Point3]) -> float:
         """
@@ -174,6 +234,10 @@ class Units(list):
 
         :param position: """
         assert self, "Units object is empty"
+        if self._is_vectorized():
+            if isinstance(position, Unit):
+                return float(self._bot_object._distances_squared_units_to_unit(self, position).min()) ** 0.5
+            return float(self._bot_object._distances_units_to_pos_array(self, position).min())
         if isinstance(position, Unit):
             return min(self._bot_object._distance_squared_unit_to_unit(unit, position) for unit in self) ** 0.5
         return min(self._bot_object._distance_units_to_pos(self, position))
@@ -193,6 +257,10 @@ class Units(list):
 
         :param position: """
         assert self, "Units object is empty"
+        if self._is_vectorized():
+            if isinstance(position, Unit):
+                return float(self._bot_object._distances_squared_units_to_unit(self, position).max()) ** 0.5
+            return float(self._bot_object._distances_units_to_pos_array(self, position).max())
         if isinstance(position, Unit):
             return max(self._bot_object._distance_squared_unit_to_unit(unit, position) for unit in self) ** 0.5
         return max(self._bot_object._distance_units_to_pos(self, position))
@@ -211,6 +279,9 @@ class Units(list):
 
         :param position: """
         assert self, "Units object is empty"
+        if self._is_vectorized():
+            # argmin returns the first unit with the smallest distance, same as min()
+            return self._unit_at(self._distances_to(position).argmin())
         if isinstance(position, Unit):
             return min(
                 (unit1 for unit1 in self),
@@ -234,6 +305,8 @@ class Units(list):
 
         :param position: """
         assert self, "Units object is empty"
+        if self._is_vectorized():
+            return self._unit_at(self._distances_to(position).argmax())
         if isinstance(position, Unit):
             return max(
                 (unit1 for unit1 in self),
@@ -259,6 +332,10 @@ class Units(list):
         """
         if not self:
             return self
+        if self._is_vectorized():
+            if isinstance(position, Unit):
+                return self._subgroup_mask(self._distances_to(position) < distance ** 2)
+            return self._subgroup_mask(self._distances_to(position) < distance)
         if isinstance(position, Unit):
             distance_squared = distance ** 2
             return self.subgroup(
@@ -286,6 +363,10 @@ class Units(list):
         """
         if not self:
             return self
+        if self._is_vectorized():
+            if isinstance(position, Unit):
+                return self._subgroup_mask(distance ** 2 < self._distances_to(position))
+            return self._subgroup_mask(distance < self._distances_to(position))
         if isinstance(position, Unit):
             distance_squared = distance ** 2
             return self.subgroup(
@@ -316,6 +397,11 @@ class Units(list):
         """
         if not self:
             return self
+        if self._is_vectorized():
+            distances = self._distances_to(position)
+            if isinstance(position, Unit):
+                return self._subgroup_mask((distance1 ** 2 < distances) & (distances < distance2 ** 2))
+            return self._subgroup_mask((distance1 < distances) & (distances < distance2))
         if isinstance(position, Unit):
             distance1_squared = distance1 ** 2
             distance2_squared = distance2 ** 2
@@ -387,6 +473,11 @@ class Units(list):
             else:
                 return self.subgroup([])
 
+        if max(len(self), len(other_units)) >= self.VECTORIZED_QUERY_MIN_UNITS:
+            if not isinstance(other_units, Units):
+                other_units = self.subgroup(other_units)
+            distances = self._bot_object._distances_squared_units_to_units(self, other_units)
+            return self._subgroup_mask((distances < distance_squared).any(axis=1))
         return self.subgroup(
             self_unit
             for self_unit in self
@@ -412,8 +503,18 @@ class Units(list):
             ),
         )
 
+    def _distances_to(self, position: Union[Unit, Point2, Point3]) -> np.ndarray:
+        """ Squared distances to a unit, or distances to a position, as numpy array in the order of the units. """
+        if isinstance(position, Unit):
+            return self._bot_object._distances_squared_units_to_unit(self, position)
+        return self._bot_object._distances_units_to_pos_array(self, position)
+
     def _list_sorted_closest_to_distance(self, position: Union[Unit, Point2], distance: float) -> List[Unit]:
         """ This function should be a bit faster than using units.sorted(key=lambda u: u.distance_to(position)) """
+        if self._is_vectorized():
+            # A stable sort of the negated keys keeps the order of equal keys, same as sorted(..., reverse=True)
+            order = np.argsort(-np.abs(self._distances_to(position) - distance), kind="stable")
+            return [self[index] for index in order.tolist()]
         if isinstance(position, Unit):
             return sorted(
                 self,
@@ -494,6 +595,8 @@ class Units(list):
 
         :param other:
         """
+        if isinstance(other, (list, tuple)):
+            other = set(other)
         return self.filter(lambda unit: unit.tag in other)
 
     def tags_not_in(self, other: Union[Set[int], List[int], Dict[int, Any]]) -> Units:
@@ -509,6 +612,8 @@ class Units(list):
 
         :param other:
         """
+        if isinstance(other, (list, tuple)):
+            other = set(other)
         return self.filter(lambda unit: unit.tag not in other)
 
     def of_type(self, other: Union[UnitTypeId, Set[UnitTypeId], List[UnitTypeId], Dict[UnitTypeId, Any]]) -> Units:
@@ -715,6 +820,22 @@ class Units(list):
         return self.sorted(lambda unit: unit.is_idle, reverse=True)
 
 
+def _resetting_tag_map(name: str) -> Callable:
+    list_method = getattr(list, name)
+
+    def method(self, *args, **kwargs):
+        self._tag_map = None
+        self._tag_lookups = 0
+        return list_method(self, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "remove", "pop", "clear"):
+    setattr(Units, _name, _resetting_tag_map(_name))
+
+
 class UnitSelection(Units):
     def __init__(self, parent, selection=None):
         if isinstance(selection, (UnitTypeId)):
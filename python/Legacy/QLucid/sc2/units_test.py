@@ -0,0 +1,151 @@
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from s2clientprotocol import data_pb2, raw_pb2, sc2api_pb2
+
+from sc2 import UnitTypeId
+
+from .distances import DistanceCalculation
+from .game_data import GameData
+from .position import Point2
+from .unit import Unit
+from .units import Units
+
+
+class DistanceBot(DistanceCalculation):
+    def __init__(self, method: int):
+        super().__init__()
+        data = sc2api_pb2.ResponseData()
+        marine = data.units.add(unit_id=UnitTypeId.MARINE.value, name="Marine", available=True)
+        marine.weapons.add(type=data_pb2.Weapon.Any, damage=6, attacks=1, range=5, speed=0.61)
+        zealot = data.units.add(unit_id=UnitTypeId.ZEALOT.value, name="Zealot", available=True)
+        zealot.weapons.add(type=data_pb2.Weapon.Ground, damage=8, attacks=2, range=0.1, speed=0.86)
+        data.units.add(unit_id=UnitTypeId.MEDIVAC.value, name="Medivac", available=True)
+        self._game_data = GameData(data)
+        self.state = SimpleNamespace(game_loop=0)
+        self.distance_calculation_method = method
+        self._distances_override_functions(method)
+        self.all_units = Units([], self)
+
+
+def create_units(bot: DistanceBot, count: int) -> Units:
+    rng = random.Random(count)
+    for index in range(count):
+        unit_type = rng.choice([UnitTypeId.MARINE, UnitTypeId.ZEALOT, UnitTypeId.MEDIVAC])
+        proto = raw_pb2.Unit(tag=index + 1, unit_type=unit_type.value, radius=0.375)
+        proto.is_flying = unit_type == UnitTypeId.MEDIVAC
+        # Integer positions so that there are many equal distances
+        proto.pos.x = rng.randint(0, 20)
+        proto.pos.y = rng.randint(0, 20)
+        bot.all_units.append(Unit(proto, bot, distance_calculation_index=index))
+    return bot.all_units
+
+
+@pytest.fixture(params=[0, 2])
+def units(request) -> Units:
+    return create_units(DistanceBot(request.param), 60)
+
+
+def loop_and_vectorized(query):
+    """ Returns the result of query with the python loop and with numpy """
+    with mock.patch.object(Units, "VECTORIZED_QUERY_MIN_UNITS", 10 ** 6):
+        loop_result = query()
+    with mock.patch.object(Units, "VECTORIZED_QUERY_MIN_UNITS", 1):
+        vectorized_result = query()
+    return loop_result, vectorized_result
+
+
+def tags(result):
+    if isinstance(result, Unit):
+        return result.tag
+    if isinstance(result, Units):
+        return [unit.tag for unit in result]
+    return result
+
+
+class TestVectorizedUnitsQueries:
+    def test_queries_match_python_loop(self, units: Units):
+        unit = units[7]
+        position = Point2((10, 10))
+        queries = [
+            lambda: units.closest_to(unit),
+            lambda: units.closest_to(position),
+            lambda: units.furthest_to(unit),
+            lambda: units.furthest_to(position),
+            lambda: units.closest_distance_to(unit),
+            lambda: units.closest_distance_to(position),
+            lambda: units.furthest_distance_to(unit),
+            lambda: units.furthest_distance_to(position),
+            lambda: units.closer_than(5, unit),
+            lambda: units.closer_than(5, position),
+            lambda: units.further_than(5, unit),
+            lambda: units.further_than(5, position),
+            lambda: units.in_distance_between(unit, 3, 8),
+            lambda: units.in_distance_between(position, 3, 8),
+            lambda: units.n_closest_to_distance(position, 5, 10),
+            lambda: units.n_closest_to_distance(unit, 5, 10),
+            lambda: units.n_furthest_to_distance(position, 5, 10),
+            lambda: units.in_distance_of_group(units[:5], 4),
+            lambda: units.subgroup(units[5:]).in_distance_of_group(units[:5], 4),
+        ]
+        for query in queries:
+            loop_result, vectorized_result = loop_and_vectorized(query)
+            assert tags(loop_result) == tags(vectorized_result)
+
+    def test_in_attack_range_of_matches_python_loop(self, units: Units):
+        for attacker in units[:10]:
+            for bonus_distance in (0, 2):
+                loop_result, vectorized_result = loop_and_vectorized(
+                    lambda: units.in_attack_range_of(attacker, bonus_distance)
+                )
+                assert tags(loop_result) == tags(vectorized_result)
+
+
+class TestUnitsTagLookup:
+    def test_find_by_tag_and_contains(self):
+        units = create_units(DistanceBot(0), 10)
+        subset = units.filter(lambda unit: unit.tag % 2 == 0)
+
+        assert units.find_by_tag(3) is units[2]
+        assert subset.find_by_tag(3) is None
+        assert subset.by_tag(4) is units[3]
+        with pytest.raises(KeyError):
+            subset.by_tag(3)
+        assert units[3] in subset
+        assert units[2] not in subset
+        assert 4 not in subset
+
+    def test_map_is_built_on_the_second_lookup(self):
+        units = create_units(DistanceBot(0), 10)
+        subset = units.filter(lambda unit: unit.tag > 2)
+
+        assert subset.find_by_tag(4) is units[3]
+        assert subset._tag_map is None
+        assert units[0] not in subset
+        assert subset._tag_map == {unit.tag: unit for unit in units[2:]}
+
+    def test_lookup_follows_modifications(self):
+        units = create_units(DistanceBot(0), 10)
+        subset = units.subgroup(units[:3])
+        assert subset.find_by_tag(5) is None
+
+        subset.append(units[4])
+        assert subset.find_by_tag(5) is units[4]
+        subset.remove(units[4])
+        assert units[4] not in subset
+        subset.extend(units[5:7])
+        assert subset.tags == {1, 2, 3, 6, 7}
+
+    def test_set_operators_and_tag_filters(self):
+        units = create_units(DistanceBot(0), 10)
+        first = units.subgroup(units[:6])
+        second = units.subgroup(units[4:])
+
+        assert [unit.tag for unit in first | second] == list(range(1, 11))
+        assert [unit.tag for unit in first + second] == list(range(1, 11))
+        assert [unit.tag for unit in first & second] == [5, 6]
+        assert [unit.tag for unit in first - second] == [1, 2, 3, 4]
+        assert [unit.tag for unit in units.tags_in([2, 4, 11])] == [2, 4]
+        assert [unit.tag for unit in units.tags_not_in([2, 4, 11])] == [1, 3, 5, 6, 7, 8, 9, 10]
@@ -1 +1,7 @@
-from .path_finder import PathFinder
+from .numpy_path_finder import NumpyPathFinder
+
+try:
+    from .path_finder import PathFinder
+except ImportError:
+    # The prebuilt sc2pathlib binaries do not load on this platform or Python version
+    PathFinder = NumpyPathFinder
@@ -0,0 +1,439 @@
+from collections import OrderedDict
+from math import ceil, floor, hypot, sqrt
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.ndimage import binary_erosion
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+SQRT2 = sqrt(2)
+# Neighbour offsets and lengths of the moves in the 8-connected grid
+MOVES = ((1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1), (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+# Sources of the walk influence that are searched at once, limits the size of the distance matrix
+WALK_INFLUENCE_BATCH = 16
+# Walk influence sources in the same tile of this size are searched in one area of the map
+WALK_INFLUENCE_TILE = 32
+
+Box = Tuple[slice, slice]
+
+
+def grid_graph(free: np.ndarray, costs: Optional[np.ndarray] = None) -> csr_matrix:
+    """
+    Creates the graph of the moves between free cells of the grid for scipy.sparse.csgraph.
+    Cell (x, y) is node x * height + y. Diagonal moves are only possible when both cells next to them are free.
+
+    :param free: boolean array [x][y] of the cells that can be walked through
+    :param costs: cost of moving to each cell per distance, move lengths are used when None
+    :return: sparse matrix of the move costs
+    """
+    width, height = free.shape
+    size = width * height
+    # Targets and costs of the moves from each node, one column per move
+    targets = np.zeros((width, height, len(MOVES)), dtype=np.int32)
+    weights = np.zeros((width, height, len(MOVES)))
+    valid = np.zeros((width, height, len(MOVES)), dtype=bool)
+    indices = np.arange(size, dtype=np.int32).reshape(width, height)
+
+    for move, (dx, dy, length) in enumerate(MOVES):
+        source = (slice(max(0, -dx), width - max(0, dx)), slice(max(0, -dy), height - max(0, dy)))
+        target = (slice(max(0, dx), width - max(0, -dx)), slice(max(0, dy), height - max(0, -dy)))
+        moves = free[source] & free[target]
+        if dx and dy:
+            moves &= free[target[0], source[1]] & free[source[0], target[1]]
+        valid[source + (move,)] = moves
+        targets[source + (move,)] = indices[target]
+        weights[source + (move,)] = length if costs is None else costs[target] * length
+
+    valid = valid.reshape(size, len(MOVES))
+    indptr = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(np.count_nonzero(valid, axis=1), out=indptr[1:])
+    return csr_matrix((weights.reshape(size, -1)[valid], targets.reshape(size, -1)[valid], indptr), shape=(size, size))
+
+
+class NumpyPathFinder:
+    """
+    Path finder with the same interface as PathFinder, written with NumPy and SciPy instead of the prebuilt
+    sc2pathlib binaries.
+
+    Paths are searched with the Dijkstra of scipy.sparse.csgraph over the grid graph of the map. A search is first
+    limited to a short distance from the start and the limit is doubled until the targets are found. The graphs are
+    created again only after the map has changed and the latest searches are memoized, so several paths from the
+    same start cost one search. find_paths and find_paths_influence return the paths to several targets at once.
+    """
+
+    def __init__(self, maze: Union[List[List[int]], np.array], memo_size: int = 8):
+        """
+        pathing values need to be integers to improve performance.
+        Initialization should be done with array consisting values of 0 and 1.
+        """
+        self._original_map: np.ndarray = np.array(maze, dtype=np.int64)
+        self._map: np.ndarray = self._original_map.copy()
+        self.normal_influence: int = 1
+        self.heuristic_accuracy = 1  # Not used, searches are exact
+        self.memo_size = memo_size
+        # Graphs and the lowest cost of a move per distance by (large, influence), see _graph
+        self._graphs: Dict[Tuple[bool, bool], Tuple[csr_matrix, float]] = {}
+        # Free cells for small and large units, see _free
+        self._free_cells: Dict[bool, np.ndarray] = {}
+        # Distances, predecessors and search limit by (large, influence, start node)
+        self._searches: OrderedDict = OrderedDict()
+
+    def normalize_influence(self, value: int):
+        """
+        Normalizes influence to integral value.
+        Influence does not need to be calculated each frame, but this quickly resets
+        influence values to specified value without changing available paths.
+        """
+        self._map[self._map > 0] = value
+        self.normal_influence = value
+        self._influence_changed()
+
+    @property
+    def width(self) -> int:
+        """
+        :return: Width of the defined map
+        """
+        return self._map.shape[0]
+
+    @property
+    def height(self) -> int:
+        """
+        :return: Height of the defined map
+        """
+        return self._map.shape[1]
+
+    @property
+    def map(self) -> List[List[int]]:
+        """
+        :return: map as list of lists [x][y] in python readable format
+        """
+        return self._map.tolist()
+
+    def reset(self):
+        """
+        Reset the pathfind map data to it's original state
+        """
+        self._map = self._original_map.copy()
+        self._blocks_changed()
+
+    def set_map(self, data: List[List[int]]):
+        self._map = np.array(data, dtype=np.int64)
+        self._blocks_changed()
+
+    def create_block(self, center: Union[Tuple[float, float], List[Tuple[float, float]]], size: Tuple[int, int]):
+        for box in self._block_boxes(center, size):
+            self._map[box] = 0
+        self._blocks_changed()
+
+    def remove_block(self, center: Union[Tuple[float, float], List[Tuple[float, float]]], size: Tuple[int, int]):
+        for box in self._block_boxes(center, size):
+            self._map[box] = self.normal_influence
+        self._blocks_changed()
+
+    def find_path(
+        self, start: (float, float), end: (float, float), large: bool = False
+    ) -> Tuple[List[Tuple[int, int]], float]:
+        """
+        Finds a path ignoring influence.
+
+        :param start: Start position in float tuple
+        :param end: Start position in float tuple
+        :param large: Unit is large and requires path to have width of 2 to pass
+        :return: Tuple of points and total distance.
+        """
+        return self.find_paths(start, [end], large)[0]
+
+    def find_path_influence(
+        self, start: (float, float), end: (float, float), large: bool = False
+    ) -> (List[Tuple[int, int]], float):
+        """
+        Finds a path that takes influence into account
+
+        :param start: Start position in float tuple
+        :param end: Start position in float tuple
+        :param large: Unit is large and requires path to have width of 2 to pass
+        :return: Tuple of points and total distance including influence.
+        """
+        return self.find_paths_influence(start, [end], large)[0]
+
+    def find_paths(
+        self, start: (float, float), ends: Sequence[Tuple[float, float]], large: bool = False
+    ) -> List[Tuple[List[Tuple[int, int]], float]]:
+        """
+        Finds the paths from start to all ends with one search, ignoring influence.
+
+        :return: Tuple of points and total distance for each end, no points when there is no path
+        """
+        return self._find_paths(start, ends, large, False)
+
+    def find_paths_influence(
+        self, start: (float, float), ends: Sequence[Tuple[float, float]], large: bool = False
+    ) -> List[Tuple[List[Tuple[int, int]], float]]:
+        """
+        Finds the paths from start to all ends with one search, taking influence into account.
+
+        :return: Tuple of points and total distance including influence for each end, no points when there is no path
+        """
+        return self._find_paths(start, ends, large, True)
+
+    def safest_spot(self, destination_center: (float, float), walk_distance: float) -> (Tuple[int, int], float):
+        destination_int = (floor(destination_center[0]), floor(destination_center[1]))
+        if not self._is_free(destination_int):
+            return destination_int, 0
+        distances, _ = self._search(destination_int, False, False, lambda found: True, walk_distance)
+        box = self._box(destination_int, destination_int, ceil(walk_distance))
+        reached = distances.reshape(self._map.shape)[box] <= walk_distance
+        return self._lowest_influence(box, reached.reshape(-1), destination_int)
+
+    def lowest_influence_in_grid(self, destination_center: (float, float), radius: int) -> (Tuple[int, int], float):
+        destination_int = (floor(destination_center[0]), floor(destination_center[1]))
+        box = self._box(destination_int, destination_int, radius)
+        return self._lowest_influence(box, self._map[box].reshape(-1) > 0, destination_int)
+
+    def add_influence(self, points: List[Tuple[float, float]], value: float, distance: float, flat: bool = False):
+        reach = ceil(distance)
+        offsets = np.arange(-reach, reach + 1)
+        d = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])
+        kernel = np.where(d < distance, self._influence(d, value, distance, flat), 0)
+
+        for point in points:
+            x, y = floor(point[0]), floor(point[1])
+            box = self._box((x, y), (x, y), reach)
+            window = self._map[box]
+            if window.size == 0:
+                continue
+            kernel_box = (
+                slice(box[0].start - x + reach, box[0].stop - x + reach),
+                slice(box[1].start - y + reach, box[1].stop - y + reach),
+            )
+            window += np.where(window > 0, kernel[kernel_box], 0)
+        self._influence_changed()
+
+    def add_influence_walk(self, points: List[Tuple[float, float]], value: float, distance: float, flat: bool = False):
+        cells = [(floor(point[0]), floor(point[1])) for point in points if self._is_free(point)]
+        for box, distances in self._walk_distances(cells, distance):
+            reached = distances < distance
+            added = np.where(reached, self._influence(np.where(reached, distances, 0), value, distance, flat), 0)
+            self._map[box] += added.sum(axis=0).reshape(self._map[box].shape)
+        self._influence_changed()
+
+    def find_low_inside_walk(
+        self, start: (float, float), target: (float, float), distance: Union[int, float]
+    ) -> (Tuple[float, float], float):
+        """
+        Finds a compromise where low influence matches with close position to the start position.
+
+        This is intended for finding optimal position for unit with more range to find optimal position to fight from
+        :param start: This is the starting position of the unit with more range
+        :param target: Target that the optimal position should be optimized for
+        :param distance: This should represent the firing distance of the unit with more range
+        :return: Tuple for position and influence distance to reach the destination
+        """
+        start_int = (floor(start[0]), floor(start[1]))
+        box = self._box((floor(target[0]), floor(target[1])), (floor(target[0]), floor(target[1])), ceil(distance))
+        xs, ys = np.meshgrid(np.arange(box[0].start, box[0].stop), np.arange(box[1].start, box[1].stop), indexing="ij")
+        inside = (np.hypot(xs + 0.5 - target[0], ys + 0.5 - target[1]) <= distance) & (self._map[box] > 0)
+        nodes = (xs * self.height + ys)[inside]
+        if not self._is_free(start_int) or len(nodes) == 0:
+            return start, 0
+
+        first_limit = max(0.0, hypot(start[0] - target[0], start[1] - target[1]) - distance) + 10
+        costs, _ = self._search(start_int, False, True, lambda found: np.isfinite(found[nodes]).any(), first_limit)
+        best = nodes[np.argmin(costs[nodes])]
+        if not np.isfinite(costs[best]):
+            return start, 0
+        x, y = divmod(int(best), self.height)
+        return (x + 0.5, y + 0.5), float(costs[best])
+
+    def plot(self, path: List[Tuple[int, int]], image_name: str = "map", resize: int = 4):
+        """
+        Uses cv2 to draw current pathing grid.
+
+        requires opencv-python
+
+        :param path: list of points to colorize
+        :param image_name: name of the window to show the image in. Unique names update only when used multiple times.
+        :param resize: multiplier for resizing the image
+        :return: None
+        """
+        import cv2
+
+        image = np.array(self._map, dtype=np.uint8)
+        for point in path:
+            image[point] = 255
+        image = np.rot90(image, 1)
+        resized = cv2.resize(image, dsize=None, fx=resize, fy=resize)
+        cv2.imshow(image_name, resized)
+        cv2.waitKey(1)
+
+    def _find_paths(
+        self, start: (float, float), ends: Sequence[Tuple[float, float]], large: bool, influence: bool
+    ) -> List[Tuple[List[Tuple[int, int]], float]]:
+        start_int = (floor(start[0]), floor(start[1]))
+        ends_int = [(floor(end[0]), floor(end[1])) for end in ends]
+        free = self._free(large)
+        reachable = [end for end in ends_int if self._is_free(end, free)]
+        if not self._is_free(start_int, free) or not reachable:
+            return [([], 0)] * len(ends)
+
+        end_nodes = [end[0] * self.height + end[1] for end in reachable]
+        first_limit = max(self._octile(start_int, end) for end in reachable) + 10
+        distances, predecessors = self._search(
+            start_int, large, influence, lambda found: np.isfinite(found[end_nodes]).all(), first_limit
+        )
+
+        results = []
+        for end in ends_int:
+            node = end[0] * self.height + end[1]
+            if not self._is_free(end, free) or not np.isfinite(distances[node]):
+                results.append(([], 0))
+                continue
+            path = []
+            while node >= 0:
+                path.append(divmod(node, self.height))
+                node = predecessors[node]
+            path.reverse()
+            results.append((path, float(distances[end[0] * self.height + end[1]])))
+        return results
+
+    def _search(
+        self,
+        start: Tuple[int, int],
+        large: bool,
+        influence: bool,
+        found: Callable[[np.ndarray], bool],
+        first_limit: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distances and predecessors of the nodes from start, memoized until the map changes.
+        The search is limited to first_limit times the lowest cost of a move and the limit is doubled until found
+        returns True for the distances or the whole map has been searched.
+        """
+        key = (large, influence, start[0] * self.height + start[1])
+        memo = self._searches.get(key)
+        if memo is not None and (memo[2] == np.inf or found(memo[0])):
+            self._searches.move_to_end(key)
+            return memo[0], memo[1]
+
+        graph, lowest_cost = self._graph(large, influence)
+        limit = first_limit * lowest_cost
+        if memo is not None:
+            limit = max(limit, memo[2] * 2)
+        while True:
+            if limit > 4 * (self.width + self.height) * lowest_cost:
+                # Paths this long wind around the map, search everything
+                limit = np.inf
+            distances, predecessors = dijkstra(graph, indices=key[2], return_predecessors=True, limit=limit)
+            if limit == np.inf or found(distances):
+                break
+            limit *= 2
+
+        self._searches[key] = (distances, predecessors, limit)
+        self._searches.move_to_end(key)
+        if len(self._searches) > self.memo_size:
+            self._searches.popitem(last=False)
+        return distances, predecessors
+
+    def _walk_distances(self, cells: List[Tuple[int, int]], distance: float) -> Iterator[Tuple[Box, np.ndarray]]:
+        """
+        Walking distances up to distance from each cell, searched in the area around the cells.
+        Cells close to each other are searched in the same area.
+
+        :return: the areas and the distances from each cell in the area to all cells of the area
+        """
+        reach = ceil(distance)
+        tiles: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for cell in cells:
+            tiles.setdefault((cell[0] // WALK_INFLUENCE_TILE, cell[1] // WALK_INFLUENCE_TILE), []).append(cell)
+
+        for tile_cells in tiles.values():
+            lowest = (min(cell[0] for cell in tile_cells), min(cell[1] for cell in tile_cells))
+            highest = (max(cell[0] for cell in tile_cells), max(cell[1] for cell in tile_cells))
+            box = self._box(lowest, highest, reach)
+            free = self._map[box] > 0
+            graph = grid_graph(free)
+            nodes = [(x - box[0].start) * free.shape[1] + y - box[1].start for x, y in tile_cells]
+            for batch in range(0, len(nodes), WALK_INFLUENCE_BATCH):
+                yield box, dijkstra(graph, indices=nodes[batch : batch + WALK_INFLUENCE_BATCH], limit=distance)
+
+    def _graph(self, large: bool, influence: bool) -> Tuple[csr_matrix, float]:
+        graph = self._graphs.get((large, influence))
+        if graph is None:
+            if influence:
+                # Same moves as without influence, the move lengths are multiplied with the cost of the target cell
+                moves = self._graph(large, False)[0]
+                costs = self._map.reshape(-1) / self.normal_influence
+                matrix = csr_matrix((moves.data * costs[moves.indices], moves.indices, moves.indptr), shape=moves.shape)
+                free_costs = costs[self._free(large).reshape(-1)]
+                graph = (matrix, float(free_costs.min()) if len(free_costs) else 1.0)
+            else:
+                graph = (grid_graph(self._free(large)), 1.0)
+            self._graphs[(large, influence)] = graph
+        return graph
+
+    def _free(self, large: bool) -> np.ndarray:
+        free = self._free_cells.get(large)
+        if free is None:
+            free = self._map > 0
+            if large:
+                # Large units need the 2x2 area from the cell up and right to be free
+                free = binary_erosion(free, np.ones((2, 2), dtype=bool), origin=(-1, -1))
+            self._free_cells[large] = free
+        return free
+
+    def _is_free(self, cell: Tuple[float, float], free: np.ndarray = None) -> bool:
+        x, y = floor(cell[0]), floor(cell[1])
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        if free is None:
+            return self._map[x, y] > 0
+        return bool(free[x, y])
+
+    def _box(self, lowest: Tuple[int, int], highest: Tuple[int, int], reach: int) -> Box:
+        """ Area of the map from lowest - reach to highest + reach. """
+        return (
+            slice(max(0, lowest[0] - reach), max(0, min(self.width, highest[0] + reach + 1))),
+            slice(max(0, lowest[1] - reach), max(0, min(self.height, highest[1] + reach + 1))),
+        )
+
+    def _lowest_influence(self, box: Box, cells: np.ndarray, center: Tuple[int, int]) -> (Tuple[int, int], float):
+        """ Cell of the area with the lowest influence, the closest one to center of those. """
+        values = self._map[box].reshape(-1)
+        indices = np.flatnonzero(cells)
+        if len(indices) == 0:
+            return center, 0
+        xs, ys = np.divmod(indices, box[1].stop - box[1].start)
+        xs += box[0].start
+        ys += box[1].start
+        best = np.lexsort((np.hypot(xs - center[0], ys - center[1]), values[indices]))[0]
+        return (int(xs[best]), int(ys[best])), float(values[indices[best]])
+
+    def _block_boxes(self, center: Union[Tuple[float, float], List[Tuple[float, float]]], size: Tuple[int, int]):
+        centers = center if isinstance(center, list) else [center]
+        for point in centers:
+            x = max(0, floor(point[0] - size[0] / 2 + 0.5))
+            y = max(0, floor(point[1] - size[1] / 2 + 0.5))
+            yield slice(x, x + size[0]), slice(y, y + size[1])
+
+    def _blocks_changed(self):
+        self._graphs.clear()
+        self._free_cells.clear()
+        self._searches.clear()
+
+    def _influence_changed(self):
+        self._graphs.pop((False, True), None)
+        self._graphs.pop((True, True), None)
+        for key in [key for key in self._searches if key[1]]:
+            del self._searches[key]
+
+    @staticmethod
+    def _influence(distances: np.ndarray, value: float, distance: float, flat: bool) -> np.ndarray:
+        if flat:
+            return np.full(np.shape(distances), int(value))
+        return (value * (1 - distances / distance)).astype(np.int64)
+
+    @staticmethod
+    def _octile(start: Tuple[int, int], end: Tuple[int, int]) -> float:
+        dx, dy = abs(start[0] - end[0]), abs(start[1] - end[1])
+        return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
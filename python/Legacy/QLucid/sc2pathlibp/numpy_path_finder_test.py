@@ -0,0 +1,104 @@
+import heapq
+from math import sqrt
+
+import numpy as np
+import pytest
+
+from .numpy_path_finder import NumpyPathFinder
+
+
+def random_maze(seed: int, width: int = 40, height: int = 30) -> np.ndarray:
+    random = np.random.RandomState(seed)
+    maze = (random.uniform(size=(width, height)) > 0.25).astype(int)
+    maze[0, 0] = maze[-1, -1] = 1
+    return maze
+
+
+def reference_distances(maze: np.ndarray, start, influence: bool = False, normal: int = 1) -> dict:
+    """ Dijkstra one cell at a time over the 8-connected grid without cutting corners. """
+    distances = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        distance, (x, y) = heapq.heappop(queue)
+        if distance > distances[(x, y)]:
+            continue
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if (dx, dy) == (0, 0) or not (0 <= nx < maze.shape[0] and 0 <= ny < maze.shape[1]):
+                    continue
+                if maze[nx, ny] <= 0 or (dx and dy and (maze[nx, y] <= 0 or maze[x, ny] <= 0)):
+                    continue
+                length = sqrt(2) if dx and dy else 1
+                cost = distance + length * (maze[nx, ny] / normal if influence else 1)
+                if cost < distances.get((nx, ny), np.inf) - 1e-9:
+                    distances[(nx, ny)] = cost
+                    heapq.heappush(queue, (cost, (nx, ny)))
+    return distances
+
+
+def path_length(path, maze: np.ndarray = None, normal: int = 1) -> float:
+    total = 0
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert max(abs(x1 - x0), abs(y1 - y0)) == 1
+        length = sqrt(2) if x0 != x1 and y0 != y1 else 1
+        total += length * (1 if maze is None else maze[x1, y1] / normal)
+    return total
+
+
+class TestNumpyPathFinder:
+    def test_paths_match_reference(self):
+        maze = random_maze(1)
+        finder = NumpyPathFinder(maze.tolist())
+        expected = reference_distances(maze, (0, 0))
+        ends = [(x + 0.5, y + 0.5) for x in range(0, 40, 3) for y in range(0, 30, 3)]
+
+        for end, (path, distance) in zip(ends, finder.find_paths((0.2, 0.7), ends)):
+            cell = (int(end[0]), int(end[1]))
+            if cell not in expected:
+                assert path == [] and distance == 0
+                continue
+            assert path[0] == (0, 0) and path[-1] == cell
+            assert all(maze[point] for point in path)
+            assert distance == pytest.approx(expected[cell])
+            assert path_length(path) == pytest.approx(distance)
+        assert finder.find_path((0, 0), (39, 29)) == finder.find_paths((0, 0), [(39, 29)])[0]
+
+    def test_influence(self):
+        maze = random_maze(2)
+        maze[10, 10] = maze[18:24, 13:18] = 1
+        finder = NumpyPathFinder(maze)
+        finder.normalize_influence(20)
+        finder.add_influence([(20.5, 15.5), (22, 15)], 100, 6)
+        finder.add_influence_walk([(10, 10)], 50, 5)
+        grid = np.array(finder.map)
+        assert ((grid > 0) == (maze > 0)).all()
+        assert grid[20, 15] == 20 + 100 + int(100 * (1 - 2 / 6))
+        assert grid[10, 10] == 70 and grid[30, 5] == 20
+
+        expected = reference_distances(grid, (0, 0), True, 20)
+        path, distance = finder.find_path_influence((0, 0), (39, 29))
+        assert distance == pytest.approx(expected[(39, 29)])
+        assert path_length(path, grid, 20) == pytest.approx(distance)
+        assert finder.find_path((0, 0), (39, 29))[1] < distance
+
+        position, influence = finder.lowest_influence_in_grid((21, 15), 3)
+        assert influence == grid[position] and influence == grid[19:25, 12:19][grid[19:25, 12:19] > 0].min()
+        position, _ = finder.safest_spot((21, 15), 8)
+        assert grid[position] == 20
+        position, cost = finder.find_low_inside_walk((0, 0), (21, 15), 7)
+        assert np.hypot(position[0] - 21, position[1] - 15) <= 7 and cost > 0
+
+    def test_blocks(self):
+        finder = NumpyPathFinder(np.ones((20, 20), dtype=int))
+        finder.create_block([(10, 5), (10, 15)], (2, 10))
+        assert finder.find_path((2, 10), (18, 10))[0] == []
+        finder.remove_block((10, 10), (2, 2))
+        path, _ = finder.find_path((2, 10), (18, 10))
+        assert (9, 10) in path or (10, 9) in path or (9, 9) in path
+        # Large units do not fit through the gap of one cell
+        finder.create_block((10, 10.5), (2, 1))
+        assert finder.find_path((2, 10), (18, 10))[0] != []
+        assert finder.find_path((2, 10), (18, 10), large=True)[0] == []
+        finder.reset()
+        assert np.array(finder.map).all()
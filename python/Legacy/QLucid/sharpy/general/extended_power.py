@@ -1,10 +1,15 @@
-from typing import Union, List, Set
+from typing import Dict, Union, List, Optional, Set, TYPE_CHECKING
+
+import numpy as np
 
 from sc2 import UnitTypeId
 from sc2.unit import Unit
 
 from sharpy.general.unit_feature import UnitFeature
 
+if TYPE_CHECKING:
+    from sharpy.managers.unit_value import UnitData, UnitValue
+
 melee = {
     UnitTypeId.ZERGLING,
     UnitTypeId.ULTRALISK,
@@ -33,7 +38,85 @@ siege = {
 }
 
 
+# Fields of ExtendedPower in the order of ExtendedPower.vector
+FIELDS = (
+    "power",
+    "air_presence",
+    "ground_presence",
+    "air_power",
+    "ground_power",
+    "melee_power",
+    "siege_power",
+    "detectors",
+    "stealth_power",
+)
+SIEGE_INDEX = FIELDS.index("siege_power")
+
+
+class PowerTables:
+    """Per unit type vectors of ExtendedPower, rows are indexed by UnitTypeId.value.
+
+    Adding a unit with power p adds p * weights[type] + constants[type] to ExtendedPower.vector.
+    """
+
+    def __init__(self, unit_data: Dict[UnitTypeId, "UnitData"], size: int):
+        self.weights = np.zeros((size, len(FIELDS)))
+        self.constants = np.zeros((size, len(FIELDS)))
+        # Types that set siege_power instead of adding to it
+        self.siege = np.zeros(size, dtype=bool)
+
+        self.weights[:, FIELDS.index("power")] = 1
+        # Unknown types are on the ground
+        self.weights[:, FIELDS.index("ground_presence")] = 1
+        for unit_type, data in unit_data.items():
+            row = self.weights[unit_type.value]
+            features = data.features
+            if UnitFeature.Flying in features:
+                row[FIELDS.index("air_presence")] = 1
+                row[FIELDS.index("ground_presence")] = 0
+            if UnitFeature.HitsGround in features:
+                row[FIELDS.index("ground_power")] = 1
+                if unit_type in melee:
+                    row[FIELDS.index("melee_power")] = 1
+            if UnitFeature.ShootsAir in features:
+                if unit_type == UnitTypeId.SENTRY:
+                    # Exception to the rule due to weak attack
+                    self.constants[unit_type.value, FIELDS.index("air_power")] = 0.5
+                else:
+                    row[FIELDS.index("air_power")] = 1
+            if unit_type in siege:
+                self.siege[unit_type.value] = True
+            if UnitFeature.Cloak in features:
+                row[FIELDS.index("stealth_power")] = 1
+            if UnitFeature.Detector in features:
+                self.constants[unit_type.value, FIELDS.index("detectors")] = 1
+
+
+def _field(name: str) -> property:
+    """ Property for the field 'name' of ExtendedPower.vector. """
+    index = FIELDS.index(name)
+
+    def get(self: "ExtendedPower") -> float:
+        return self.vector[index]
+
+    def set(self: "ExtendedPower", value: float):
+        self.vector[index] = value
+
+    return property(get, set)
+
+
 class ExtendedPower:
+    power: float = _field("power")
+    air_presence: float = _field("air_presence")
+    ground_presence: float = _field("ground_presence")
+    air_power: float = _field("air_power")
+    ground_power: float = _field("ground_power")
+    melee_power: float = _field("melee_power")
+    siege_power: float = _field("siege_power")
+    # count of units
+    detectors: float = _field("detectors")
+    stealth_power: float = _field("stealth_power")
+
     def is_enough_for(self, enemies: "ExtendedPower", our_percentage: float = 1.1) -> bool:
         # reduce some variable from air / ground power so that we don't fight against 100 roach with
         # 20 stalkers and observer.
@@ -50,16 +133,8 @@ class ExtendedPower:
 
     def __init__(self, values: "UnitValue"):
         self.values = values
-        self.power: float = 0
-        self.air_presence: float = 0
-        self.ground_presence: float = 0
-        self.air_power: float = 0
-        self.ground_power: float = 0
-        self.melee_power: float = 0
-        self.siege_power: float = 0
-        # count of units
-        self.detectors: int = 0
-        self.stealth_power: float = 0
+        # Values of the fields in the order of FIELDS
+        self.vector: np.ndarray = np.zeros(len(FIELDS))
 
     @property
     def melee_percentage(self) -> float:
@@ -74,12 +149,35 @@ class ExtendedPower:
         return 0
 
     def add_units(self, units: Union[List[Unit], Set[Unit]]):
-        for unit in units:
-            self.add_unit(unit)
+        if not units:
+            return
+        type_values, powers = self.values.power_rows(units)
+        self.add_type_values(type_values, powers)
+
+    def add_type_values(
+        self, type_values: np.ndarray, powers: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None
+    ):
+        """
+        Adds units by UnitTypeId.value all at once.
+
+        :param type_values: UnitTypeId.value of the units
+        :param powers: power of each unit, power_by_type of the full health units when None
+        :param counts: how many units of the type each row is, see add_unit
+        """
+        if len(type_values) == 0:
+            return
+        tables = self.values.power_tables
+        if powers is None:
+            powers = self.values.combat_value_table[type_values]
+        if counts is not None:
+            powers = powers * counts
+
+        self.vector += powers @ tables.weights[type_values] + tables.constants[type_values].sum(axis=0)
+        sieges = np.flatnonzero(tables.siege[type_values])
+        if len(sieges):
+            self.vector[SIEGE_INDEX] = powers[sieges[-1]]
 
     def add_unit(self, unit: Union[Unit, UnitTypeId], count=1):
-        unit_type: UnitTypeId
-
         if type(unit) is Unit:
             pwr = self.values.power(unit)
             unit_type = unit.type_id
@@ -89,92 +187,23 @@ class ExtendedPower:
             unit_type = unit
 
         pwr *= count
-        self.power += pwr
-
-        unit_data = self.values.unit_data.get(unit_type, None)
-        if unit_data is None:
-            self.ground_presence += pwr
-        else:
-            features = unit_data.features
-
-            if UnitFeature.Flying in features:
-                self.air_presence += pwr
-            else:
-                self.ground_presence += pwr
-
-            if UnitFeature.HitsGround in features:
-                self.ground_power += pwr
-                if unit_type in melee:
-                    self.melee_power += pwr
-            if UnitFeature.ShootsAir in features:
-                if unit_type == UnitTypeId.SENTRY:
-                    # Exception to the rule due to weak attack
-                    self.air_power += 0.5
-                else:
-                    self.air_power += pwr
-
-            if unit_type in siege:
-                self.siege_power = pwr
-
-            if UnitFeature.Cloak in features:
-                self.stealth_power += pwr
-
-            if UnitFeature.Detector in features:
-                self.detectors += 1
+        tables = self.values.power_tables
+        type_value = unit_type.value
+        self.vector += pwr * tables.weights[type_value] + tables.constants[type_value]
+        if tables.siege[type_value]:
+            self.vector[SIEGE_INDEX] = pwr
 
     def add_power(self, extended_power: "ExtendedPower"):
-        self.power += extended_power.power
-        self.air_presence += extended_power.air_presence
-        self.ground_presence += extended_power.ground_presence
-        self.air_power += extended_power.air_power
-        self.ground_power += extended_power.ground_power
-        self.melee_power += extended_power.melee_power
-        self.siege_power += extended_power.siege_power
-        # count of units
-        self.detectors += extended_power.detectors
-        self.stealth_power += extended_power.stealth_power
+        self.vector += extended_power.vector
 
     def substract_power(self, extended_power: "ExtendedPower"):
-        self.power -= extended_power.power
-        self.air_presence -= extended_power.air_presence
-        self.ground_presence -= extended_power.ground_presence
-        self.air_power -= extended_power.air_power
-        self.ground_power -= extended_power.ground_power
-        self.melee_power -= extended_power.melee_power
-        self.siege_power -= extended_power.siege_power
-        # count of units
-        self.detectors -= extended_power.detectors
-        self.stealth_power -= extended_power.stealth_power
+        self.vector -= extended_power.vector
 
     def add(self, value_to_add: float):
-        self.power += value_to_add
-        self.air_presence += value_to_add
-        self.ground_presence += value_to_add
-        self.air_power += value_to_add
-        self.ground_power += value_to_add
-        self.melee_power += value_to_add
-        self.siege_power += value_to_add
-        self.detectors += value_to_add
-        self.stealth_power += value_to_add
+        self.vector += value_to_add
 
     def multiply(self, multiplier: float):
-        self.power *= multiplier
-        self.air_presence *= multiplier
-        self.ground_presence *= multiplier
-        self.air_power *= multiplier
-        self.ground_power *= multiplier
-        self.melee_power *= multiplier
-        self.siege_power *= multiplier
-        self.detectors *= multiplier
-        self.stealth_power *= multiplier
+        self.vector *= multiplier
 
     def clear(self):
-        self.power = 0
-        self.air_presence = 0
-        self.ground_presence = 0
-        self.air_power = 0
-        self.ground_power = 0
-        self.melee_power = 0
-        self.siege_power = 0
-        self.detectors = 0
-        self.stealth_power = 0
+        self.vector.fill(0)
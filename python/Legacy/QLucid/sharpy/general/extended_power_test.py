@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from sc2 import UnitTypeId
+
+from sharpy.managers.unit_value import UnitValue
+from .extended_power import ExtendedPower, FIELDS, melee, siege
+from .unit_feature import UnitFeature
+
+
+def field_by_field(values: UnitValue, unit_types, counts) -> dict:
+    """ The accumulation of the old ExtendedPower.add_unit, one field at a time. """
+    fields = dict.fromkeys(FIELDS, 0)
+    for unit_type, count in zip(unit_types, counts):
+        pwr = values.power_by_type(unit_type, 1) * count
+        fields["power"] += pwr
+        unit_data = values.unit_data.get(unit_type, None)
+        if unit_data is None:
+            fields["ground_presence"] += pwr
+            continue
+        features = unit_data.features
+        fields["air_presence" if UnitFeature.Flying in features else "ground_presence"] += pwr
+        if UnitFeature.HitsGround in features:
+            fields["ground_power"] += pwr
+            if unit_type in melee:
+                fields["melee_power"] += pwr
+        if UnitFeature.ShootsAir in features:
+            fields["air_power"] += 0.5 if unit_type == UnitTypeId.SENTRY else pwr
+        if unit_type in siege:
+            fields["siege_power"] = pwr
+        if UnitFeature.Cloak in features:
+            fields["stealth_power"] += pwr
+        if UnitFeature.Detector in features:
+            fields["detectors"] += 1
+    return fields
+
+
+class TestExtendedPower:
+    def test_vectors_match_field_by_field(self):
+        values = UnitValue()
+        unit_types = [
+            UnitTypeId.ZEALOT,
+            UnitTypeId.SENTRY,
+            UnitTypeId.COLOSSUS,
+            UnitTypeId.OBSERVER,
+            UnitTypeId.DARKTEMPLAR,
+            UnitTypeId.MUTALISK,
+            UnitTypeId.SIEGETANKSIEGED,
+            UnitTypeId.ZERGLING,
+            UnitTypeId.BROODLORD,
+            UnitTypeId.MINERALFIELD,
+        ]
+        counts = [3, 2, 1, 1, 2, 5, 1, 12, 2, 1]
+        expected = field_by_field(values, unit_types, counts)
+
+        single = ExtendedPower(values)
+        for unit_type, count in zip(unit_types, counts):
+            single.add_unit(unit_type, count)
+        batched = ExtendedPower(values)
+        batched.add_type_values(np.array([unit_type.value for unit_type in unit_types]), counts=np.array(counts))
+
+        for field in FIELDS:
+            assert getattr(single, field) == expected[field]
+            assert getattr(batched, field) == pytest.approx(expected[field])
+
+    def test_vector_arithmetic(self):
+        values = UnitValue()
+        power = ExtendedPower(values)
+        power.add_unit(UnitTypeId.STALKER, 4)
+        other = ExtendedPower(values)
+        other.add_unit(UnitTypeId.PHOENIX)
+
+        power.add_power(other)
+        power.multiply(2)
+        power.substract_power(other)
+        assert power.power == values.power_by_type(UnitTypeId.STALKER) * 8 + values.power_by_type(UnitTypeId.PHOENIX)
+
+        power.power = 1
+        power.clear()
+        assert not power.vector.any()
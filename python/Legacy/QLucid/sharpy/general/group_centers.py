@@ -0,0 +1,66 @@
+import enum
+from typing import List, Optional
+
+import numpy as np
+
+from sharpy import sc2math
+
+
+class GroupCenterMode(enum.Enum):
+    # Geometric median of the group, warm-started from the median of the previous frame
+    Median = 0
+    # Mean of the units closest to the mean of the group, cheaper and close to the median
+    TrimmedMean = 1
+
+
+class GroupCenters:
+    """Calculates the centers of all groups of units in one batched pass.
+
+    In Median mode the geometric median of each group starts from the centers that its units had on the previous
+    frame, so that a group that has barely moved only needs an iteration or two instead of starting from the mean.
+    """
+
+    def __init__(self, mode: GroupCenterMode = GroupCenterMode.Median, accuracy: float = 0.5):
+        self.mode = mode
+        self.accuracy = accuracy
+        # Tags of the units of the previous frame, sorted, and the center of their group
+        self._tags: Optional[np.ndarray] = None
+        self._centers: Optional[np.ndarray] = None
+
+    def centers(self, tags: List[int], positions: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """
+        Returns the center of each group as array of shape (groups, 2).
+
+        :param tags: tags of the units, used to find the centers of the previous frame
+        :param positions: positions of the units as array of shape (n, 2)
+        :param labels: group of each unit, see UnitClusters.labels
+        """
+        if len(tags) == 0:
+            return np.empty((0, 2))
+        count = int(labels.max()) + 1
+
+        if self.mode == GroupCenterMode.TrimmedMean:
+            return sc2math.trimmed_means(positions, labels, count)
+
+        unit_tags = np.fromiter(tags, dtype=np.uint64, count=len(tags))
+        starts = self._warm_starts(unit_tags, positions, labels, count)
+        result = sc2math.geometric_medians(positions, labels, starts, self.accuracy)
+
+        order = np.argsort(unit_tags)
+        self._tags = unit_tags[order]
+        self._centers = result[labels[order]]
+        return result
+
+    def _warm_starts(self, tags: np.ndarray, positions: np.ndarray, labels: np.ndarray, count: int) -> np.ndarray:
+        """ Mean of the previous centers of the units of each group, or the mean of the group for new groups. """
+        known = np.zeros(len(tags), dtype=bool)
+        rows = np.zeros(len(tags), dtype=np.intp)
+        if self._tags is not None and len(self._tags) > 0:
+            rows = np.minimum(np.searchsorted(self._tags, tags), len(self._tags) - 1)
+            known = self._tags[rows] == tags
+
+        # Units that were not seen on the previous frame count with their own position
+        points = np.where(known[:, np.newaxis], self._centers[rows] if known.any() else positions, positions)
+        sizes = np.bincount(labels, minlength=count)
+        means = np.stack([np.bincount(labels, points[:, 0], count), np.bincount(labels, points[:, 1], count)], axis=1)
+        return means / sizes[:, np.newaxis]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from sharpy.sc2math import geometric_median, geometric_medians
+from .group_centers import GroupCenters, GroupCenterMode
+
+
+def random_groups(random: np.random.RandomState, sizes):
+    positions = np.concatenate([random.normal(random.uniform(20, 150, 2), 4, (size, 2)) for size in sizes])
+    labels = np.repeat(np.arange(len(sizes)), sizes)
+    return positions, labels
+
+
+class TestGroupCenters:
+    def test_batched_medians_match_single_medians(self):
+        random = np.random.RandomState(3)
+        positions, labels = random_groups(random, [1, 2, 5, 40, 200])
+        # Points at the mean of their group
+        positions[labels == 1] = positions[labels == 1][0]
+
+        starts = np.stack([positions[labels == label].mean(axis=0) for label in range(5)])
+        medians = geometric_medians(positions, labels, starts, 1e-5)
+        for label in range(5):
+            expected = geometric_median(positions[labels == label], 1e-5)
+            assert np.linalg.norm(medians[label] - expected) < 1e-3
+
+    def test_warm_start_follows_groups(self):
+        random = np.random.RandomState(4)
+        positions, labels = random_groups(random, [30, 60, 10])
+        tags = list(range(1000, 1000 + len(positions)))
+        centers = GroupCenters(accuracy=0.01)
+
+        for frame in range(4):
+            result = centers.centers(tags, positions, labels)
+            for label in range(labels.max() + 1):
+                expected = geometric_median(positions[labels == label], 1e-5)
+                assert np.linalg.norm(result[label] - expected) < 0.1
+            positions = positions + random.uniform(-0.5, 0.5, positions.shape)
+            # The units are listed in a different order with new units and group numbers
+            order = random.permutation(len(tags))
+            positions = np.concatenate([positions[order], random.uniform(20, 150, (1, 2))])
+            labels = np.concatenate([labels.max() - labels[order], [labels.max() + 1]])
+            tags = [tags[i] for i in order] + [2000 + frame]
+
+        # Unchanged groups stay within the accuracy of their previous centers
+        previous = centers.centers(tags, positions, labels)
+        assert np.linalg.norm(centers.centers(tags, positions, labels) - previous, axis=1).max() < 0.01
+
+    def test_trimmed_mean_ignores_stragglers(self):
+        positions = np.array([[10, 10], [11, 10], [10, 11], [11, 11], [40, 40], [5, 5]], dtype=float)
+        labels = np.array([0, 0, 0, 0, 0, 1])
+        centers = GroupCenters(GroupCenterMode.TrimmedMean)
+        assert centers.centers([1, 2, 3, 4, 5, 6], positions, labels).tolist() == [[10.5, 10.5], [5, 5]]
+        assert centers.centers([], np.empty((0, 2)), np.empty(0, dtype=np.intp)).shape == (0, 2)
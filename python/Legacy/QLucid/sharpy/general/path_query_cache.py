@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class PathQueryCache:
+    """
+    Memoizes path finder queries until the path finder changes, see new_cycle.
+
+    Results are memoized per query kind, quantized start and target cell and radius, so units of the same group that
+    ask for almost the same path share one search. The memo is limited to 'max_size' entries, the least recently used
+    entries are removed first.
+    """
+
+    def __init__(self, max_size: int = 1024, cell_size: float = 1):
+        """
+        :param max_size: maximum amount of memoized results
+        :param cell_size: start and target positions in the same cell of this size share their result
+        """
+        assert max_size > 0, f"max_size has to be positive, was {max_size}"
+        assert cell_size > 0, f"cell_size has to be positive, was {cell_size}"
+        self.max_size: int = max_size
+        self.cell_size: float = cell_size
+        # Changes whenever the influence or the blocks of the path finder change
+        self.version: int = 0
+        self._memo: OrderedDict = OrderedDict()
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def new_cycle(self):
+        """ Forgets the results, call whenever the path finder changes. """
+        self.version += 1
+        self._memo.clear()
+
+    def get(
+        self,
+        kind: str,
+        start: Optional[Tuple[float, float]],
+        target: Tuple[float, float],
+        radius: float,
+        query: Callable[[], T],
+    ) -> T:
+        """
+        Returns the memoized result of the query or calls query and memoizes its result.
+
+        :param kind: name of the query
+        :param start: start position of the query, None for queries without one
+        :param target: target position of the query
+        :param radius: radius, distance or other number that the result depends on
+        :param query: calculates the result
+        """
+        key = (kind, self._cell(start), self._cell(target), radius, self.version)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return self._memo[key]
+
+        self.misses += 1
+        result = query()
+        self._memo[key] = result
+        if len(self._memo) > self.max_size:
+            self._memo.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def _cell(self, position: Optional[Tuple[float, float]]) -> Hashable:
+        if position is None:
+            return None
+        return int(position[0] // self.cell_size), int(position[1] // self.cell_size)
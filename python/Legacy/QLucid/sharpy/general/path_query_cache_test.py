@@ -0,0 +1,33 @@
+from .path_query_cache import PathQueryCache
+
+
+class TestPathQueryCache:
+    def test_memoized_per_cell_and_cycle(self):
+        cache = PathQueryCache()
+        calls = []
+
+        def query(result):
+            calls.append(result)
+            return result
+
+        assert cache.get("find_path", (10.2, 5.7), (30, 30), 0, lambda: query(1)) == 1
+        assert cache.get("find_path", (10.9, 5.1), (30.5, 30.5), 0, lambda: query(2)) == 1
+        assert cache.get("find_path", (11.1, 5.1), (30.5, 30.5), 0, lambda: query(3)) == 3
+        assert cache.get("safest_spot", None, (30.5, 30.5), 4, lambda: query(4)) == 4
+        assert cache.get("safest_spot", None, (30.5, 30.5), 5, lambda: query(5)) == 5
+        assert calls == [1, 3, 4, 5] and cache.hits == 1 and cache.misses == 4
+
+        cache.new_cycle()
+        assert len(cache) == 0
+        assert cache.get("find_path", (10.2, 5.7), (30, 30), 0, lambda: query(6)) == 6
+
+    def test_size_cap(self):
+        cache = PathQueryCache(max_size=2)
+        cache.get("find_path", (0, 0), (1, 1), 0, lambda: 1)
+        cache.get("find_path", (0, 0), (2, 2), 0, lambda: 2)
+        # The least recently used entry is removed first
+        cache.get("find_path", (0, 0), (1, 1), 0, lambda: None)
+        cache.get("find_path", (0, 0), (3, 3), 0, lambda: 3)
+        assert len(cache) == 2
+        assert cache.get("find_path", (0, 0), (1, 1), 0, lambda: None) == 1
+        assert cache.get("find_path", (0, 0), (2, 2), 0, lambda: 4) == 4
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+
+class UnitClusters:
+    """Groups units that are within 'distance' of each other, either directly or through other units of the group.
+
+    All close pairs are found with a single KD-tree query and the groups are the connected components of the pairs.
+
+    With 'reuse_distance' the pairs are found within 'distance' + 'reuse_distance' and kept for the next frames, as
+    long as the units are the same and none of them has moved more than half of 'reuse_distance' since. Only the
+    distances of the kept pairs are then checked again, and the groups are the same as without reusing the pairs.
+    """
+
+    def __init__(self, distance: float, reuse_distance: float = 0):
+        self.distance = distance
+        self.reuse_distance = reuse_distance
+        self.reused_frames = 0
+        # Units, positions and close pairs of the last full query
+        self._row_by_tag: Optional[Dict[int, int]] = None
+        self._positions: Optional[np.ndarray] = None
+        self._pairs: Optional[np.ndarray] = None
+
+    def labels(self, tags: List[int], positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the group of each unit, numbered in the order of the first unit of each group.
+
+        :param tags: tags of the units, used to recognize the units of the previous frame
+        :param positions: positions of the units as array of shape (n, 2)
+        """
+        count = len(tags)
+        if count == 0:
+            return np.empty(0, dtype=np.intp)
+
+        pairs = self._reused_pairs(tags, positions)
+        if pairs is None:
+            tree = cKDTree(positions)
+            pairs = tree.query_pairs(self.distance + self.reuse_distance, output_type="ndarray")
+            if self.reuse_distance > 0:
+                self._row_by_tag = {tag: row for row, tag in enumerate(tags)}
+                self._positions = positions.copy()
+                self._pairs = pairs
+        else:
+            self.reused_frames += 1
+        if self.reuse_distance > 0 and len(pairs) > 0:
+            differences = positions[pairs[:, 0]] - positions[pairs[:, 1]]
+            pairs = pairs[np.einsum("ij,ij->i", differences, differences) <= self.distance ** 2]
+
+        graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(count, count))
+        _, labels = connected_components(graph, directed=False)
+        # Renumber the groups in the order of their first unit
+        _, first_rows, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        order = np.empty(len(first_rows), dtype=np.intp)
+        order[np.argsort(first_rows)] = np.arange(len(first_rows))
+        return order[inverse]
+
+    def _reused_pairs(self, tags: List[int], positions: np.ndarray) -> Optional[np.ndarray]:
+        """ Returns the pairs of the last full query in the rows of 'tags' if they are still valid. """
+        row_by_tag = self._row_by_tag
+        if row_by_tag is None or len(row_by_tag) != len(tags):
+            return None
+        try:
+            previous_rows = np.fromiter((row_by_tag[tag] for tag in tags), dtype=np.intp, count=len(tags))
+        except KeyError:
+            return None
+
+        movement = positions - self._positions[previous_rows]
+        if np.einsum("ij,ij->i", movement, movement).max() > (self.reuse_distance / 2) ** 2:
+            return None
+
+        rows = np.empty(len(tags), dtype=np.intp)
+        rows[previous_rows] = np.arange(len(tags))
+        return rows[self._pairs]
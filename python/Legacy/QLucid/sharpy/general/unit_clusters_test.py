@@ -0,0 +1,56 @@
+import numpy as np
+
+from .unit_clusters import UnitClusters
+
+
+def flood_fill_labels(positions: np.ndarray, distance: float) -> np.ndarray:
+    """ The grouping of the old recursive flood fill of GroupCombatManager. """
+    labels = np.full(len(positions), -1)
+    label = 0
+    for start in range(len(positions)):
+        if labels[start] >= 0:
+            continue
+        labels[start] = label
+        stack = [start]
+        while stack:
+            row = stack.pop()
+            close = np.flatnonzero(np.linalg.norm(positions - positions[row], axis=1) <= distance)
+            for other in close[labels[close] < 0]:
+                labels[other] = label
+                stack.append(other)
+        label += 1
+    return labels
+
+
+class TestUnitClusters:
+    def test_chains_and_threshold(self):
+        positions = np.array([[0, 0], [7, 0], [14, 0], [30, 0], [37.1, 0], [50, 50]], dtype=float)
+        labels = UnitClusters(7).labels([1, 2, 3, 4, 5, 6], positions)
+        assert labels.tolist() == [0, 0, 0, 1, 2, 3]
+
+    def test_matches_flood_fill(self):
+        random = np.random.RandomState(1)
+        positions = np.concatenate([random.normal(center, 6, (300, 2)) for center in ([30, 30], [60, 40], [90, 90])])
+        random.shuffle(positions)
+        tags = list(range(100, 100 + len(positions)))
+
+        labels = UnitClusters(7).labels(tags, positions)
+        assert labels.tolist() == flood_fill_labels(positions, 7).tolist()
+
+    def test_reused_pairs_give_same_groups(self):
+        random = np.random.RandomState(2)
+        positions = random.uniform(0, 100, (500, 2))
+        tags = list(range(len(positions)))
+        clusters = UnitClusters(7, reuse_distance=2)
+
+        for frame in range(6):
+            labels = clusters.labels(tags, positions)
+            assert labels.tolist() == UnitClusters(7).labels(tags, positions).tolist()
+            positions = positions + random.uniform(-0.3, 0.3, positions.shape)
+            # The order of the units changes
+            order = random.permutation(len(tags))
+            positions = positions[order]
+            tags = [tags[i] for i in order]
+
+        assert clusters.reused_frames >= 2
+        assert UnitClusters(7).labels([], np.empty((0, 2))).size == 0
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Mapping
 
 import sc2
 from sharpy.general.extended_ramp import ExtendedRamp
@@ -43,7 +43,7 @@ class Zone:
         self._is_enemys = False
 
         self.zone_index: int = 0
-        self.paths: Dict[int, Path] = dict()  # paths to other expansions as it is dictated in the .expansion_zones
+        self.paths: Mapping[int, Path] = dict()  # paths to other expansions as it is dictated in the .expansion_zones
         # Game time seconds when we have last had visibility on this zone.
         self.last_scouted_center: float = -1
         self.last_scouted_mineral_line: float = -1
@@ -164,7 +164,19 @@ class Zone:
         else:
             return ZoneResources.Empty
 
-    def update(self):
+    def update(
+        self,
+        our_units: Optional[Units] = None,
+        known_enemy_units: Optional[Units] = None,
+        assaulting_enemies: Optional[Units] = None,
+    ):
+        """
+        The units in the zone are queried from the unit cache when they are not given.
+
+        :param our_units: own units within the zone radius
+        :param known_enemy_units: targetable enemy units within the zone radius
+        :param assaulting_enemies: targetable enemy units within the danger radius, only used for our zones
+        """
         self.mineral_fields.clear()
         for mf in self._original_mineral_fields:
             new_mf = self.cache.mineral_fields.get(mf.position, None)
@@ -175,8 +187,12 @@ class Zone:
         self.known_enemy_power.clear()
         self.assaulting_enemy_power.clear()
 
-        self.our_units: Units = self.cache.own_in_range(self.center_location, self.radius)
-        self.known_enemy_units: Units = self.cache.enemy_in_range(self.center_location, self.radius)
+        if our_units is None:
+            our_units = self.cache.own_in_range(self.center_location, self.radius)
+        if known_enemy_units is None:
+            known_enemy_units = self.cache.enemy_in_range(self.center_location, self.radius)
+        self.our_units: Units = our_units
+        self.known_enemy_units: Units = known_enemy_units
         # Only add units that we can fight against
         self.known_enemy_units = self.known_enemy_units.filter(lambda x: x.cloak != 2)
         self.enemy_workers = self.known_enemy_units.of_type(self.unit_values.worker_types)
@@ -193,17 +209,15 @@ class Zone:
         if self.ai.is_visible(self.mineral_line_center):
             self.last_scouted_mineral_line = self.knowledge.ai.time
 
-        for unit in self.our_units:
-            # Our unit is inside the zone
-            self.our_power.add_unit(unit)
-
-        for unit in self.known_enemy_units:
-            # Enemy unit is inside the zone
-            self.known_enemy_power.add_unit(unit)
+        # Units inside the zone
+        self.our_power.add_units(self.our_units)
+        self.known_enemy_power.add_units(self.known_enemy_units)
 
         if self.is_ours:
             self.calc_needs_evacuation()
-            self.assaulting_enemies: Units = self.cache.enemy_in_range(self.center_location, self.danger_radius)
+            if assaulting_enemies is None:
+                assaulting_enemies = self.cache.enemy_in_range(self.center_location, self.danger_radius)
+            self.assaulting_enemies: Units = assaulting_enemies
             self.assaulting_enemy_power.add_units(self.assaulting_enemies)
         else:
             self.needs_evacuation = False
@@ -363,8 +377,7 @@ class Zone:
     def enemy_static_ground_power(self) -> ExtendedPower:
         """Returns power of enemy static ground defenses."""
         power = ExtendedPower(self.unit_values)
-        for ground_def in self.enemy_static_ground_defenses:
-            power.add_unit(ground_def)
+        power.add_units(self.enemy_static_ground_defenses)
         return power
 
     @property
@@ -376,8 +389,7 @@ class Zone:
     def enemy_static_air_power(self) -> ExtendedPower:
         """Returns power of enemy static ground defenses on the zone."""
         power = ExtendedPower(self.unit_values)
-        for air_def in self.enemy_static_air_defenses:
-            power.add_unit(air_def)
+        power.add_units(self.enemy_static_air_defenses)
         return power
 
     def go_mine(self, unit: Unit):
@@ -0,0 +1,152 @@
+from collections.abc import Mapping
+from math import floor
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from sc2.position import Point2
+from sc2pathlibp.numpy_path_finder import MOVES, grid_graph
+from .path import Path
+
+if TYPE_CHECKING:
+    from .zone import Zone
+
+# Distances are stored in steps of 1 / DISTANCE_SCALE
+DISTANCE_SCALE = 10
+UNREACHABLE = np.iinfo(np.uint16).max
+
+
+class ZoneDistanceFields:
+    """
+    Walking distances from every cell of the map to each zone, one uint16 field [x][y] per zone.
+
+    The fields are created with one search from the centers of all zones and created again when the terrain version
+    changes, for example when a rock is destroyed. Distances between zones and from any cell to a zone are
+    read from the fields and paths follow the fields down to the zone center.
+    """
+
+    def __init__(
+        self, centers: List[Point2], terrain: Callable[[], np.ndarray], terrain_version: Callable[[], Hashable]
+    ):
+        """
+        :param centers: center locations of the zones
+        :param terrain: returns the cells [x][y] that can be walked through
+        :param terrain_version: returns a value that changes whenever the fields have to be created again
+        """
+        self.centers: List[Point2] = centers
+        self.indices: Dict[Point2, int] = {center: index for index, center in enumerate(centers)}
+        self._terrain: Callable[[], np.ndarray] = terrain
+        self._terrain_version: Callable[[], Hashable] = terrain_version
+        self._fields: Optional[np.ndarray] = None
+        self._free: Optional[np.ndarray] = None
+        self.version: Hashable = None
+        # Statistics
+        self.builds: int = 0
+
+    @property
+    def fields(self) -> np.ndarray:
+        """ Distance fields of all zones as an uint16 array [zone][x][y], UNREACHABLE where there is no path. """
+        self.update()
+        return self._fields
+
+    def update(self):
+        """ Creates the fields again if the terrain has changed since they were created. """
+        version = self._terrain_version()
+        if self._fields is None or version != self.version:
+            self._build(self._terrain())
+            self.version = version
+
+    def distance(self, center: Point2, position: Tuple[float, float]) -> Optional[float]:
+        """ Walking distance from position to the zone at center, None when there is no path. """
+        fields = self.fields
+        x, y = floor(position[0]), floor(position[1])
+        if not (0 <= x < fields.shape[1] and 0 <= y < fields.shape[2]):
+            return None
+        value = fields[self.indices[center], x, y]
+        return None if value == UNREACHABLE else value / DISTANCE_SCALE
+
+    def distances(self, position: Tuple[float, float]) -> np.ndarray:
+        """ Walking distances from position to all zones, inf when there is no path. """
+        fields = self.fields
+        x, y = floor(position[0]), floor(position[1])
+        if not (0 <= x < fields.shape[1] and 0 <= y < fields.shape[2]):
+            return np.full(len(self.centers), np.inf)
+        values = fields[:, x, y]
+        return np.where(values == UNREACHABLE, np.inf, values / DISTANCE_SCALE)
+
+    def path(self, start: Tuple[float, float], center: Point2) -> Tuple[List[Tuple[int, int]], float]:
+        """
+        Path from start to the zone at center in the same format as PathFinder.find_path.
+        Each step goes to the neighbour cell that is closest to the zone.
+        """
+        field = self.fields[self.indices[center]]
+        width, height = field.shape
+        x, y = floor(start[0]), floor(start[1])
+        if not (0 <= x < width and 0 <= y < height) or field[x, y] == UNREACHABLE:
+            return [], 0
+
+        path = [(x, y)]
+        free = self._free
+        while field[x, y] > 0:
+            best = None
+            best_cost = None
+            for dx, dy, length in MOVES:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height) or field[nx, ny] >= field[x, y]:
+                    continue
+                if dx and dy and not (free[nx, y] and free[x, ny]):
+                    continue
+                cost = field[nx, ny] + length * DISTANCE_SCALE
+                if best is None or cost < best_cost:
+                    best = (nx, ny)
+                    best_cost = cost
+            if best is None:
+                break
+            x, y = best
+            path.append(best)
+        return path, float(field[path[0]]) / DISTANCE_SCALE
+
+    def _build(self, free: np.ndarray):
+        self._free = free
+        nodes = [floor(center.x) * free.shape[1] + floor(center.y) for center in self.centers]
+        distances = dijkstra(grid_graph(free), indices=nodes).reshape((len(nodes),) + free.shape)
+        scaled = np.minimum(np.rint(distances * DISTANCE_SCALE), UNREACHABLE - 1)
+        self._fields = np.where(np.isfinite(distances), scaled, UNREACHABLE).astype(np.uint16)
+        self.builds += 1
+
+
+class ZonePaths(Mapping):
+    """
+    Paths from a zone to other expansions by their index in expansion_zones, read from the distance fields
+    when they are needed and kept until the fields are created again.
+    """
+
+    def __init__(self, fields: ZoneDistanceFields, zone: "Zone", expansion_zones: List["Zone"]):
+        self.fields = fields
+        self.zone = zone
+        self.expansion_zones = expansion_zones
+        self._paths: Dict[Point2, Path] = {}
+        # Builds of the fields that the paths were read from
+        self._builds: int = 0
+
+    def __getitem__(self, index: int) -> Path:
+        if not 0 <= index < len(self.expansion_zones) or self.expansion_zones[index] is self.zone:
+            raise KeyError(index)
+        self.fields.update()
+        if self._builds != self.fields.builds:
+            self._paths.clear()
+            self._builds = self.fields.builds
+
+        center = self.expansion_zones[index].center_location
+        path = self._paths.get(center)
+        if path is None:
+            path = Path(self.fields.path(self.zone.center_location, center))
+            self._paths[center] = path
+        return path
+
+    def __iter__(self) -> Iterator[int]:
+        return (index for index, zone in enumerate(self.expansion_zones) if zone is not self.zone)
+
+    def __len__(self) -> int:
+        return sum(1 for zone in self.expansion_zones if zone is not self.zone)
@@ -0,0 +1,75 @@
+from math import sqrt
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from sc2.position import Point2
+from sc2pathlibp import NumpyPathFinder
+from .zone_distance_fields import ZoneDistanceFields, ZonePaths
+
+
+def create_terrain() -> np.ndarray:
+    random = np.random.RandomState(12)
+    free = random.uniform(size=(60, 50)) > 0.2
+    # A wall with a gap that a rock can block
+    free[30, :] = False
+    free[30, 20:23] = True
+    return free
+
+
+def path_length(path) -> float:
+    total = 0
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert max(abs(x1 - x0), abs(y1 - y0)) == 1
+        total += sqrt(2) if x0 != x1 and y0 != y1 else 1
+    return total
+
+
+class TestZoneDistanceFields:
+    def test_matches_path_finder(self):
+        terrain = create_terrain()
+        centers = [Point2((5.5, 5.5)), Point2((55.5, 45.5)), Point2((10.5, 40.5))]
+        for center in centers:
+            terrain[int(center.x), int(center.y)] = True
+        fields = ZoneDistanceFields(centers, lambda: terrain, lambda: 0)
+        finder = NumpyPathFinder(terrain.astype(int))
+
+        assert fields.fields.dtype == np.uint16
+        for start in centers + [Point2((20.5, 20.5)), Point2((40.5, 10.5))]:
+            for center in centers:
+                expected_path, expected = finder.find_path(start, center)
+                path, distance = fields.path(start, center)
+                if not expected_path:
+                    assert fields.distance(center, start) is None and path == []
+                    continue
+                assert fields.distance(center, start) == pytest.approx(expected, abs=0.05)
+                assert distance == fields.distance(center, start)
+                assert path[0] == (int(start.x), int(start.y)) and path[-1] == (int(center.x), int(center.y))
+                assert all(terrain[cell] for cell in path)
+                assert path_length(path) == pytest.approx(expected, abs=0.1)
+            distances = [fields.distance(center, start) for center in centers]
+            assert fields.distances(start).tolist() == [np.inf if d is None else d for d in distances]
+        assert fields.builds == 1
+
+    def test_rebuilt_when_terrain_changes(self):
+        terrain = create_terrain()
+        centers = [Point2((10.5, 20.5)), Point2((50.5, 20.5))]
+        for center in centers:
+            terrain[int(center.x), int(center.y)] = True
+        version = SimpleNamespace(value=0)
+        fields = ZoneDistanceFields(centers, lambda: terrain.copy(), lambda: version.value)
+        zones = [SimpleNamespace(center_location=center) for center in centers]
+        paths = ZonePaths(fields, zones[0], zones)
+
+        before = fields.distance(centers[1], centers[0])
+        assert list(paths) == [1] and len(paths) == 1 and 0 not in paths
+        assert paths[1].distance == before and paths[1] is paths[1]
+
+        # A rock blocks the gap, nothing changes before the version does
+        terrain[30, 20:23] = False
+        assert fields.distance(centers[1], centers[0]) == before
+        version.value += 1
+        assert fields.distance(centers[1], centers[0]) is None
+        assert paths[1].distance == 0 and paths[1].path == []
+        assert fields.builds == 2
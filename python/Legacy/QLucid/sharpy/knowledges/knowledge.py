@@ -1,5 +1,6 @@
 import logging
 import string
+import time
 from configparser import ConfigParser
 from typing import Set, List, Optional, Dict, Callable
 
@@ -74,6 +75,7 @@ class Knowledge:
         self.action_handler: ActionHandler = ActionHandler()
         self.version_manager: VersionManager = VersionManager()
         self.managers: List[ManagerBase] = []
+        self.scheduler: ManagerScheduler = ManagerScheduler()
 
     def set_managers(self, additional_managers: Optional[List[ManagerBase]]):
         """
@@ -112,6 +114,7 @@ class Knowledge:
         assert isinstance(ai, sc2.BotAI)
         self.ai: "KnowledgeBot" = ai
         self.set_managers(additional_managers)
+        self.scheduler.start(ai, self.managers, self.ai.manager_time_budget)
         self._all_own: Units = Units([], self.ai)
         self.config: ConfigParser = self.ai.config
         self.logger = sc2.main.logger
@@ -176,7 +179,7 @@ class Knowledge:
 
     @property
     def debug(self) -> bool:
-        return self._debug
+        return self._debug and not self.ai.should_skip("debug")
 
     @property
     def all_own(self) -> Units:
@@ -255,8 +258,17 @@ class Knowledge:
 
         self.iteration = iteration
 
-        for manager in self.managers:
+        profiler = self.ai.step_profiler
+        for manager in self.scheduler.select():
+            # Managers can be declared optional work by their class name
+            if self.ai.should_skip(type(manager).__name__):
+                continue
+            start = time.perf_counter()
             await manager.update()
+            duration = time.perf_counter() - start
+            self.scheduler.record(manager, duration)
+            if profiler is not None:
+                profiler.record(f"manager.{type(manager).__name__}.update", duration)
 
         if not self.supply_blocked and self.ai.supply_left == 0:
             self.supply_blocked = True
@@ -271,7 +283,11 @@ class Knowledge:
         self.expanding_to = None
         self.reserved_minerals = 0
         self.reserved_gas = 0
-        self.heat_map.update()
+        if not self.ai.should_skip("HeatMap"):
+            start = time.perf_counter()
+            self.heat_map.update()
+            if profiler is not None:
+                profiler.record("manager.HeatMap.update", time.perf_counter() - start)
         self.update_enemy_random()
 
     def update_enemy_random(self):
@@ -463,6 +479,15 @@ class Knowledge:
         step_time_max = round(self.ai.step_time[2])
         self._print(f"Step time max: {step_time_max}", stats=False)
 
+        if self.ai.degraded_steps:
+            self._print(f"Degraded steps: {self.ai.degraded_steps}", stats=False)
+
+        if self.scheduler.skip_counts:
+            skipped = ", ".join(
+                f"{type(manager).__name__} {count}" for manager, count in self.scheduler.skip_counts.items()
+            )
+            self._print(f"Skipped manager updates: {skipped}", stats=False)
+
         for manager in self.managers:
             await manager.on_end(game_result)
 
@@ -561,8 +586,16 @@ class Knowledge:
         return h
 
     async def post_update(self):
+        profiler = self.ai.step_profiler
         for manager in self.managers:
-            await manager.post_update()
+            if self.ai.should_skip(type(manager).__name__):
+                continue
+            if profiler is None:
+                await manager.post_update()
+            else:
+                start = time.perf_counter()
+                await manager.post_update()
+                profiler.record(f"manager.{type(manager).__name__}.post_update", time.perf_counter() - start)
 
         # if self.debug:
         #     await self.ai._client.send_debug()
@@ -7,6 +7,7 @@ from sc2.units import Units
 from sharpy.knowledges import Knowledge
 from sharpy.managers import ManagerBase
 from sharpy.plans import BuildOrder
+from sharpy.plans.act_profiler import profile_acts
 from config import get_config, get_version
 from sc2 import BotAI, Result, Optional, UnitTypeId, List
 from sc2.unit import Unit
@@ -16,6 +17,10 @@ import time
 class KnowledgeBot(BotAI):
     """Base class for bots that are built around Knowledge class."""
 
+    # Skipped on degraded steps: debug drawing, the managers and the heat map by their class name,
+    # and the orders of army groups that are not in combat, see BotAI.should_skip
+    optional_work = frozenset({"debug", "HeatMap", "BuildDetector", "DataManager", "non_engaged_groups"})
+
     def __init__(self, name: str):
         super().__init__()
         self.name = name
@@ -29,7 +34,12 @@ class KnowledgeBot(BotAI):
         self.realtime_split = True
         self.last_game_loop = -1
         self.distance_calculation_method = 0
+        self.incremental_pathing_grid = True
+        # CooldownManager queries the abilities of all own units every step
+        self.cached_abilities = True
         self.unit_command_uses_self_do = True
+        # Seconds per step for the manager updates, None to update every manager on every step, see manager_scheduler.py
+        self.manager_time_budget: Optional[float] = None
 
     async def real_init(self):
         self.knowledge.pre_start(self, self.configure_managers())
@@ -37,6 +47,8 @@ class KnowledgeBot(BotAI):
         self.plan = await self.create_plan()
         if self.start_plan:
             await self.plan.start(self.knowledge)
+        if self.step_profiler is not None:
+            profile_acts(self.step_profiler, self.plan)
 
         self._log_start()
 
@@ -1,5 +1,6 @@
-from .manager_base import ManagerBase
-from .unit_cache_manager import UnitCacheManager
+from .manager_base import ManagerBase, ManagerPriority
+from .manager_scheduler import ManagerScheduler
+from .unit_cache_manager import UnitCacheManager, UnitCategory
 from .zone_manager import ZoneManager
 from .cooldown_manager import CooldownManager
 from .building_solver import BuildingSolver
@@ -52,6 +52,8 @@ class EnemyMacroBuild(enum.IntEnum):
 class BuildDetector(ManagerBase):
     """Enemy build detector."""
 
+    max_update_interval = 0.5
+
     def __init__(self):
         super().__init__()
         self.rush_build = EnemyRushBuild.Macro
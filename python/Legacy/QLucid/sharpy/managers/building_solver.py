@@ -498,8 +498,9 @@ class BuildingSolver(ManagerBase):
                             )
                             continue
 
-                        lookup_distance = await self.client.query_pathing(lookup, enemy_natural)
-                        wall_distance = await self.client.query_pathing(lookup + search_vector * 5, enemy_natural)
+                        lookup_distance, wall_distance = await self.ai.pathing_queries.distances(
+                            [(lookup, enemy_natural), (lookup + search_vector * 5, enemy_natural)]
+                        )
                         if wall_distance > lookup_distance:
                             self.print(
                                 f"Wall was found at {lookup}, but disregarded due to distance check",
@@ -1,9 +1,12 @@
 from typing import Optional, Callable
 
-from sharpy.managers import ManagerBase
+from sharpy.managers import ManagerBase, ManagerPriority
 
 
 class ChatManager(ManagerBase):
+    max_update_interval = 1
+    priority = ManagerPriority.Low
+
     def __init__(self):
         super().__init__()
         self.taunted = set()
@@ -1,4 +1,5 @@
 from .combat_units import CombatUnits
+from .engagement import Engagement
 from .generic_micro import GenericMicro, CombatModel
 from .micro_step import MicroStep
 from .action import Action, NoAction
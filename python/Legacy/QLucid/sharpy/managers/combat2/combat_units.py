@@ -3,17 +3,25 @@ from typing import Optional, List
 from sc2.position import Point2
 from sharpy import sc2math
 from sharpy.general.extended_power import ExtendedPower
+from .engagement import Engagement
 
 from sc2.unit import Unit
 from sc2.units import Units
 
 
 class CombatUnits:
-    def __init__(self, units: Units, knowledge: "Knowledge"):
+    def __init__(self, units: Units, knowledge: "Knowledge", center: Optional[Point2] = None):
+        """
+        :param units:
+        :param knowledge:
+        :param center: median of the units when already calculated, see GroupCenters
+        """
         self.knowledge = knowledge
         self.unit_values = knowledge.unit_values
         self.units = units
-        self.center: Point2 = sc2math.unit_geometric_median(units)
+        if center is None:
+            center = sc2math.unit_geometric_median(units)
+        self.center: Point2 = center
         self.ground_units = self.units.not_flying
         if self.ground_units:
             self.center: Point2 = self.ground_units.closest_to((self.center)).position
@@ -25,11 +33,8 @@ class CombatUnits:
         self._area_by_circles: float = 0
         self.average_speed = 0
 
-        for unit in self.units:
-            self.average_speed += knowledge.unit_values.real_speed(unit)
-
-        if len(self.units) > 1:
-            self.average_speed /= len(self.units)
+        if self.units:
+            self.average_speed = self.unit_values.real_speeds(self.units).mean()
 
     def is_too_spread_out(self) -> bool:
         if self._total_distance is None:
@@ -56,18 +61,10 @@ class CombatUnits:
         ):
             return True
 
-        engaged_power = 0
-        total_power = 0
-
-        for unit in self.units:  # type: Unit
-            power = self.unit_values.power(unit)
-            total_power += power
-
-            for enemy_near in closest_enemies.units:
-                d = enemy_near.distance_to(unit)
-                if d < self.unit_values.real_range(unit, enemy_near):
-                    engaged_power += power
-                    break
+        powers = self.unit_values.powers(self.units)
+        can_engage = Engagement(self.units, closest_enemies.units, self.unit_values).can_engage
+        engaged_power = powers[can_engage].sum()
+        total_power = powers.sum()
 
         return engaged_power > total_power * 0.15
 
@@ -0,0 +1,50 @@
+from typing import Dict, TYPE_CHECKING
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from sc2.unit import Unit
+from sc2.units import Units
+
+if TYPE_CHECKING:
+    from sharpy.managers import UnitValue
+
+
+class Engagement:
+    """Distances and real ranges between a group of own units and the enemies close to them.
+
+    Rows of the matrices are the units and columns are the enemies.
+    """
+
+    def __init__(self, units: Units, enemies: Units, unit_values: "UnitValue"):
+        self.units = units
+        self.enemies = enemies
+        self.unit_values = unit_values
+        self.distances: np.ndarray = cdist(units._positions_array(), enemies._positions_array())
+        # Range of the units against the enemies
+        self.ranges: np.ndarray = unit_values.real_ranges(units, enemies)
+        self._enemy_ranges: np.ndarray = None
+
+    @property
+    def enemy_ranges(self) -> np.ndarray:
+        """ Range of the enemies against the units. """
+        if self._enemy_ranges is None:
+            self._enemy_ranges = self.unit_values.real_ranges(self.enemies, self.units).T
+        return self._enemy_ranges
+
+    @property
+    def can_engage(self) -> np.ndarray:
+        """ Whether each unit has an enemy in range. """
+        return (self.distances < self.ranges).any(axis=1)
+
+    @property
+    def engaged(self) -> np.ndarray:
+        """ Whether each unit is in range of an enemy. """
+        return (self.distances < self.enemy_ranges).any(axis=1)
+
+    def closest_enemies(self) -> Dict[int, Unit]:
+        """ Closest enemy by tag of each unit that has one. """
+        if not self.enemies:
+            return {}
+        closest = self.distances.argmin(axis=1)
+        return {unit.tag: self.enemies[index] for unit, index in zip(self.units, closest.tolist())}
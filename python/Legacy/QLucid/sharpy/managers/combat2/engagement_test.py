@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from sc2 import Race, UnitTypeId
+from sc2.bot_ai import BotAI
+from sc2.synthetic_game import SyntheticGame
+from sc2.units import Units
+
+from sharpy.managers.unit_value import UnitValue
+from sharpy.managers.version_manager import VersionManager
+from .engagement import Engagement
+
+
+def create_unit_values(bot: BotAI) -> UnitValue:
+    unit_values = UnitValue()
+    unit_values.ai = bot
+    unit_values.knowledge = SimpleNamespace(version_manager=VersionManager(), enemy_race=Race.Zerg)
+    return unit_values
+
+
+class TestEngagement:
+    def test_matches_pairwise_ranges(self):
+        game = SyntheticGame(seed=7)
+        own_mix = {UnitTypeId.STALKER: 0.5, UnitTypeId.OBSERVER: 0.2, UnitTypeId.ZEALOT: 0.3}
+        observation = game.observation(40, 40, own_mix=own_mix, clusters=1, cluster_spread=10)
+        bot = game.start_bot(BotAI(), observation)
+        unit_values = create_unit_values(bot)
+        army = bot.units.filter(lambda unit: unit.type_id != UnitTypeId.PROBE)
+        # Half of the army stands in for the enemies close to the other half
+        units = Units(army[::2], bot)
+        enemies = Units(army[1::2] + bot.enemy_units[:5], bot)
+
+        engagement = Engagement(units, enemies, unit_values)
+        for row, unit in enumerate(units):
+            ranges = [unit_values.real_range(unit, enemy) for enemy in enemies]
+            enemy_ranges = [unit_values.real_range(enemy, unit) for enemy in enemies]
+            distances = [enemy.distance_to(unit) for enemy in enemies]
+
+            assert engagement.ranges[row].tolist() == ranges
+            assert engagement.enemy_ranges[row].tolist() == enemy_ranges
+            assert engagement.can_engage[row] == any(d < r for d, r in zip(distances, ranges))
+            assert engagement.engaged[row] == any(d < r for d, r in zip(distances, enemy_ranges))
+            closest = engagement.closest_enemies()[unit.tag]
+            assert closest.distance_to(unit) == min(distances)
+
+        assert engagement.can_engage.any() and not engagement.can_engage.all()
+        assert engagement.engaged.any()
+
+    def test_without_enemies(self):
+        game = SyntheticGame(seed=8)
+        bot = game.start_bot(BotAI(), game.observation(10, 0, own_mix={UnitTypeId.STALKER: 1}))
+        unit_values = create_unit_values(bot)
+        engagement = Engagement(bot.units, bot.enemy_units, unit_values)
+        assert not engagement.can_engage.any() and not engagement.engaged.any()
+        assert engagement.closest_enemies() == {}
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Any, Callable, Union, TYPE_CHECKING
 
+import numpy as np
+
 import sc2
 from sharpy.general.extended_power import ExtendedPower
 from sharpy.managers.combat2.move_type import MoveType
 from sc2.ids.buff_id import BuffId
 from .action import Action
 from .combat_units import CombatUnits
+from .engagement import Engagement
 
 from sc2 import AbilityId, UnitTypeId, Race
 from sc2.position import Point2
@@ -52,7 +55,22 @@ class MicroStep(ABC):
 
         self.focus_fired: Dict[int, float] = dict()
 
-    def init_group(self, group: CombatUnits, units: Units, enemy_groups: List[CombatUnits], move_type: MoveType):
+    def init_group(
+        self,
+        group: CombatUnits,
+        units: Units,
+        enemy_groups: List[CombatUnits],
+        move_type: MoveType,
+        enemies_near_by: Optional[Units] = None,
+    ):
+        """
+        :param group:
+        :param units:
+        :param enemy_groups:
+        :param move_type:
+        :param enemies_near_by: enemies within enemies_near_by_range of the center of units,
+        queried from the unit cache when None
+        """
         self.focus_fired.clear()
         self.group = group
         self.move_type = move_type
@@ -69,54 +87,32 @@ class MicroStep(ABC):
             self.closest_group_distance = 100000
         self.enemy_groups = enemy_groups
         self.center = units.center
-        self.enemies_near_by: Units = self.knowledge.unit_cache.enemy_in_range(self.center, 15 + len(group.units) * 0.1)
+        if enemies_near_by is None:
+            enemies_near_by = self.knowledge.unit_cache.enemy_in_range(self.center, self.enemies_near_by_range(group))
+        self.enemies_near_by: Units = enemies_near_by
 
         self.engaged_power.add_units(self.enemies_near_by)
 
-        engage_count = 0
-        can_engage_count = 0
-        self.attack_range = 0
-        self.enemy_attack_range = 0
-        attack_range_count = 0
-        enemy_attack_range_count = 0
-
         for unit in units:
-            closest_distance = 1000
             if self.ready_to_shoot(unit):
                 ready_to_attack += 1
 
-            engage_added = False
-            can_engage_added = False
-            for enemy_near in self.enemies_near_by:  # type: Unit
-                d = enemy_near.distance_to(unit)
-                if d < closest_distance:
-                    self.closest_units[unit.tag] = enemy_near
-                    closest_distance = d
-
-                att_range = self.unit_values.real_range(enemy_near, unit)
-                self.enemy_attack_range += att_range
-                enemy_attack_range_count += 1
-                if not engage_added and d < att_range:
-                    engage_count += 1
-                    engage_added = True
-
-                att_range = self.unit_values.real_range(unit, enemy_near)
-                self.attack_range += att_range
-                attack_range_count += 1
-
-                if not can_engage_added and d < att_range:
-                    can_engage_count += 1
-                    can_engage_added = True
-
-        if attack_range_count > 0:
-            self.attack_range = self.attack_range / attack_range_count
-
-        if enemy_attack_range_count > 0:
-            self.enemy_attack_range = self.enemy_attack_range / enemy_attack_range_count
+        engagement = Engagement(units, self.enemies_near_by, self.unit_values)
+        self.closest_units.update(engagement.closest_enemies())
+        if self.enemies_near_by:
+            self.attack_range = engagement.ranges.mean()
+            self.enemy_attack_range = engagement.enemy_ranges.mean()
+        else:
+            self.attack_range = 0
+            self.enemy_attack_range = 0
 
         self.ready_to_attack_ratio = ready_to_attack / len(units)
-        self.engage_ratio = engage_count / len(units)
-        self.can_engage_ratio = can_engage_count / len(units)
+        self.engage_ratio = np.count_nonzero(engagement.engaged) / len(units)
+        self.can_engage_ratio = np.count_nonzero(engagement.can_engage) / len(units)
+
+    @staticmethod
+    def enemies_near_by_range(group: CombatUnits) -> float:
+        return 15 + len(group.units) * 0.1
 
     def ready_to_shoot(self, unit: Unit) -> bool:
         if unit.type_id == UnitTypeId.CYCLONE:
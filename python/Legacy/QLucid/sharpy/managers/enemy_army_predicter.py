@@ -1,5 +1,7 @@
 from typing import Dict, Optional, List
 
+import numpy as np
+
 from sharpy.managers.manager_base import ManagerBase
 from sharpy.managers.enemy_units_manager import EnemyUnitsManager
 from sharpy.general.extended_power import ExtendedPower
@@ -18,6 +20,10 @@ MINERAL_MINING_SPEED = 1800.0 / 15 / 60 / 2
 
 
 class EnemyArmyPredicter(ManagerBase):
+    # The prediction itself is updated every INTERVAL seconds
+    max_update_interval = 1
+    dependencies = (EnemyUnitsManager,)
+
     def __init__(self):
         super().__init__()
 
@@ -188,8 +194,12 @@ class EnemyArmyPredicter(ManagerBase):
 
         await self.predict_enemy_composition()
 
+        self.predicted_enemy_power.add_type_values(
+            np.array([unit_count.enemy_type.value for unit_count in self.predicted_enemy_composition], dtype=np.intp),
+            counts=np.array([unit_count.count for unit_count in self.predicted_enemy_composition], dtype=float),
+        )
+
         for unit_count in self.predicted_enemy_composition:
-            self.predicted_enemy_power.add_unit(unit_count.enemy_type, unit_count.count)
             mineral_value = self.unit_values.minerals(unit_count.enemy_type) * unit_count.count
             gas_value = self.unit_values.minerals(unit_count.enemy_type) * unit_count.count
             self.predicted_enemy_army_minerals += mineral_value
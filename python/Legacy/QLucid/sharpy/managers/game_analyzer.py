@@ -8,13 +8,14 @@ from sharpy.managers.game_states.advantage import (
     at_least_small_disadvantage,
     at_least_small_advantage,
 )
-from sharpy.managers.income_calculator import GAS_MINE_RATE
+from sharpy.managers.enemy_units_manager import EnemyUnitsManager
+from sharpy.managers.income_calculator import GAS_MINE_RATE, IncomeCalculator
 from sharpy.general.extended_power import ExtendedPower
 from sharpy.tools import IntervalFunc
 from sharpy.unit_count import UnitCount
 from sc2 import UnitTypeId, Result, List, Dict
 
-from sharpy.managers.manager_base import ManagerBase
+from sharpy.managers.manager_base import ManagerBase, ManagerPriority
 from sharpy.managers.game_states import *
 from sc2.position import Point2
 from sc2.unit import Unit
@@ -22,6 +23,10 @@ from sc2.units import Units
 
 
 class GameAnalyzer(ManagerBase):
+    max_update_interval = 1
+    priority = ManagerPriority.Low
+    dependencies = (IncomeCalculator, EnemyUnitsManager, EnemyArmyPredicter)
+
     def __init__(self):
         super().__init__()
         self._enemy_air_percentage = 0
@@ -1,7 +1,10 @@
 from typing import List, Dict, Optional, Union
 
+import numpy as np
 from sharpy.managers.combat2 import *
 from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.group_centers import GroupCenters, GroupCenterMode
+from sharpy.general.unit_clusters import UnitClusters
 from sharpy.managers import UnitCacheManager, PathingManager, ManagerBase
 from sharpy.managers.combat2 import Action
 from sharpy.managers.combat2.protoss import *
@@ -20,6 +23,13 @@ class GroupCombatManager(ManagerBase):
     def __init__(self):
         # How much distance must be between units to consider them to be in different groups
         self.own_group_threshold = 7
+        self.enemy_group_threshold = 7
+        # Set to True to cluster enemies within enemy_group_threshold of each other, by default every enemy is a group
+        self.cluster_enemy_groups = False
+        # Set above zero to reuse the close unit pairs of previous frames when grouping units, see UnitClusters
+        self.group_reuse_distance = 0
+        # Set to TrimmedMean for cheaper group centers, see GroupCenters
+        self.group_center_mode = GroupCenterMode.Median
         super().__init__()
 
     async def start(self, knowledge: "Knowledge"):
@@ -27,6 +37,10 @@ class GroupCombatManager(ManagerBase):
         self.cache: UnitCacheManager = self.knowledge.unit_cache
         self.pather: PathingManager = self.knowledge.pathing_manager
         self.tags: List[int] = []
+        self.own_clusters = UnitClusters(self.own_group_threshold, self.group_reuse_distance)
+        self.enemy_clusters = UnitClusters(self.enemy_group_threshold, self.group_reuse_distance)
+        self.own_centers = GroupCenters(self.group_center_mode)
+        self.enemy_centers = GroupCenters(self.group_center_mode)
 
         self.unit_micros: Dict[UnitTypeId, MicroStep] = dict()
         self.all_enemy_power = ExtendedPower(self.unit_values)
@@ -85,8 +99,8 @@ class GroupCombatManager(ManagerBase):
         self.enemy_groups: List[CombatUnits] = self.group_enemy_units()
         self.all_enemy_power.clear()
 
-        for group in self.enemy_groups:  # type: CombatUnits
-            self.all_enemy_power.add_units(group.units)
+        # One batch over all enemies instead of summing the group powers, siege_power is set by the last siege unit
+        self.all_enemy_power.add_units([unit for group in self.enemy_groups for unit in group.units])
 
     async def post_update(self):
         pass
@@ -107,7 +121,8 @@ class GroupCombatManager(ManagerBase):
 
     def get_all_units(self) -> Units:
         units = Units([], self.ai)
-        for tag in self.tags:
+        # Units can be added more than once
+        for tag in dict.fromkeys(self.tags):
             unit = self.cache.by_tag(tag)
             if unit:
                 units.append(unit)
@@ -131,12 +146,21 @@ class GroupCombatManager(ManagerBase):
             for i in range(0, len(sorted_list)):
                 sorted_list[i].debug_index = i
 
+        # Groups that are not in combat keep their previous orders on degraded steps
+        skip_non_engaged = (
+            move_type != MoveType.DefensiveRetreat
+            and move_type != MoveType.PanicRetreat
+            and self.ai.should_skip("non_engaged_groups")
+        )
+
         for group in self.own_groups:
             center = group.center
             closest_enemies = group.closest_target_group(self.enemy_groups)
             own_closest_group = self.closest_group(center, self.own_groups)
 
             if closest_enemies is None:
+                if skip_non_engaged:
+                    continue
                 if move_type == MoveType.PanicRetreat:
                     self.move_to(group, target, move_type)
                 else:
@@ -151,6 +175,9 @@ class GroupCombatManager(ManagerBase):
                     self.move_to(group, target, move_type)
                     break
 
+                if skip_non_engaged and not is_in_combat:
+                    continue
+
                 if power.power > self.regroup_threshold * total_power.power:
                     # Most of the army is here
                     if group.is_too_spread_out() and not is_in_combat:
@@ -231,9 +258,13 @@ class GroupCombatManager(ManagerBase):
 
             units.append(unit)
 
-        for type_id, type_units in own_unit_cache.items():
+        # Enemies near each of the unit types with a single query
+        centers = [type_units.center for type_units in own_unit_cache.values()]
+        enemies_near_by = self.cache.enemy_indices_in_range(centers, MicroStep.enemies_near_by_range(group))
+
+        for (type_id, type_units), enemy_indices in zip(own_unit_cache.items(), enemies_near_by):
             micro: MicroStep = self.unit_micros.get(type_id, self.generic_micro)
-            micro.init_group(group, type_units, self.enemy_groups, move_type)
+            micro.init_group(group, type_units, self.enemy_groups, move_type, self.cache.enemy_units_at(enemy_indices))
             group_action = micro.group_solve_combat(type_units, Action(target, is_attack))
 
             for unit in type_units:
@@ -282,63 +313,29 @@ class GroupCombatManager(ManagerBase):
         return group
 
     def group_own_units(self, our_units: Units) -> List[CombatUnits]:
-        lookup_distance = self.own_group_threshold
-        groups: List[Units] = []
-        assigned: Dict[int, int] = dict()
-
-        for unit in our_units:
-            if unit.tag in assigned:
-                continue
-
-            units = Units([unit], self.ai)
-            index = len(groups)
-
-            assigned[unit.tag] = index
-
-            groups.append(units)
-            self.include_own_units(unit, units, lookup_distance, index, assigned)
-
-        return [CombatUnits(u, self.knowledge) for u in groups]
-
-    def include_own_units(self, unit: Unit, units: Units, lookup_distance: float, index: int, assigned: Dict[int, int]):
-        units_close_by = self.cache.own_in_range(unit.position, lookup_distance)
-
-        for unit_close in units_close_by:
-            if unit_close.tag in assigned or unit_close.tag not in self.tags:
-                continue
-
-            assigned[unit_close.tag] = index
-            units.append(unit_close)
-            self.include_own_units(unit_close, units, lookup_distance, index, assigned)
+        return self.create_groups(our_units, self.own_clusters, self.own_centers)
 
     def group_enemy_units(self) -> List[CombatUnits]:
-        groups: List[Units] = []
-        assigned: Dict[int, int] = dict()
-        lookup_distance = 7
-
-        for unit in self.knowledge.known_enemy_units_mobile:
-            if unit.tag in assigned or unit.type_id in self.unit_values.combat_ignore or not unit.can_be_attacked:
-                continue
-
-            units = Units([unit], self.ai)
-            index = len(groups)
-
-            assigned[unit.tag] = index
-
-            groups.append(units)
-            self.include_enemy_units(unit, units, lookup_distance, index, assigned)
-
-        return [CombatUnits(u, self.knowledge) for u in groups]
-
-    def include_enemy_units(
-        self, unit: Unit, units: Units, lookup_distance: float, index: int, assigned: Dict[int, int]
-    ):
-        units_close_by = self.cache.enemy_in_range(unit.position, lookup_distance)
-
-        for unit_close in units_close_by:
-            if unit_close.tag in assigned or unit_close.tag not in self.tags or not unit.can_be_attacked:
-                continue
-
-            assigned[unit_close.tag] = index
-            units.append(unit_close)
-            self.include_enemy_units(unit_close, units, lookup_distance, index, assigned)
+        enemies = self.knowledge.known_enemy_units_mobile.filter(
+            lambda unit: unit.type_id not in self.unit_values.combat_ignore and unit.can_be_attacked
+        )
+        clusters = self.enemy_clusters if self.cluster_enemy_groups else None
+        return self.create_groups(enemies, clusters, self.enemy_centers)
+
+    def create_groups(self, units: Units, clusters: Optional[UnitClusters], centers: GroupCenters) -> List[CombatUnits]:
+        """ Groups units that are within the threshold distance of each other, directly or through other units.
+        Without clusters every unit is a group of its own. """
+        if not units:
+            return []
+
+        tags = [unit.tag for unit in units]
+        positions = units._positions_array()
+        labels = clusters.labels(tags, positions) if clusters is not None else np.arange(len(units))
+        group_centers = centers.centers(tags, positions, labels)
+        groups: List[Units] = [Units([], self.ai) for _ in range(labels.max() + 1)]
+        for unit, label in zip(units, labels.tolist()):
+            groups[label].append(unit)
+
+        return [
+            CombatUnits(u, self.knowledge, Point2(center)) for u, center in zip(groups, group_centers.tolist())
+        ]
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sc2 import UnitTypeId
+
+from sc2.bot_ai import BotAI
+from sc2.synthetic_game import SyntheticGame
+
+from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.group_centers import GroupCenters
+from sharpy.general.unit_clusters import UnitClusters
+from sharpy.managers.combat2.engagement_test import create_unit_values
+from .group_combat_manager import GroupCombatManager
+
+
+def create_manager(cluster_enemy_groups: bool, enemy_mix=None) -> GroupCombatManager:
+    game = SyntheticGame(seed=13)
+    bot = game.start_bot(BotAI(), game.observation(20, 40, enemy_mix=enemy_mix, clusters=2))
+    manager = GroupCombatManager()
+    manager.cluster_enemy_groups = cluster_enemy_groups
+    manager.ai = bot
+    manager.unit_values = create_unit_values(bot)
+    manager.knowledge = SimpleNamespace(known_enemy_units_mobile=bot.enemy_units, unit_values=manager.unit_values)
+    manager.enemy_clusters = UnitClusters(manager.enemy_group_threshold)
+    manager.enemy_centers = GroupCenters(manager.group_center_mode)
+    manager.all_enemy_power = ExtendedPower(manager.unit_values)
+    return manager
+
+
+class TestGroupCombatManager:
+    def test_every_enemy_is_a_group_by_default(self):
+        manager = create_manager(cluster_enemy_groups=False)
+        enemies = manager.knowledge.known_enemy_units_mobile.filter(
+            lambda unit: unit.type_id not in manager.unit_values.combat_ignore and unit.can_be_attacked
+        )
+
+        groups = manager.group_enemy_units()
+
+        assert [group.units.tags for group in groups] == [{unit.tag} for unit in enemies]
+        assert all(group.center == group.units[0].position for group in groups)
+
+    def test_enemies_are_clustered_when_enabled(self):
+        manager = create_manager(cluster_enemy_groups=True)
+
+        groups = manager.group_enemy_units()
+
+        assert len(groups) < len(manager.knowledge.known_enemy_units_mobile)
+        for group in groups:
+            for unit in group.units:
+                others = group.units.tags_not_in({unit.tag})
+                assert not others or others.closest_distance_to(unit) <= manager.enemy_group_threshold
+
+    @pytest.mark.parametrize("cluster_enemy_groups", [False, True])
+    def test_all_enemy_power_keeps_the_last_siege_power(self, cluster_enemy_groups):
+        enemy_mix = {UnitTypeId.MARINE: 0.5, UnitTypeId.COLOSSUS: 0.25, UnitTypeId.VIKINGFIGHTER: 0.25}
+        manager = create_manager(cluster_enemy_groups, enemy_mix)
+
+        asyncio.run(manager.update())
+
+        enemies = [unit for group in manager.enemy_groups for unit in group.units]
+        expected = ExtendedPower(manager.unit_values)
+        for unit in enemies:
+            expected.add_unit(unit)
+        sieges = [unit for unit in enemies if unit.type_id in {UnitTypeId.COLOSSUS, UnitTypeId.VIKINGFIGHTER}]
+        assert len(sieges) > 1
+        assert manager.all_enemy_power.siege_power == pytest.approx(manager.unit_values.power(sieges[-1]))
+        assert manager.all_enemy_power.vector == pytest.approx(expected.vector)
@@ -8,6 +8,8 @@ GAS_MINE_RATE = 0.9433962264
 
 
 class IncomeCalculator(ManagerBase):
+    max_update_interval = 1
+
     def __init__(self):
         super().__init__()
         self._mineral_income = 0
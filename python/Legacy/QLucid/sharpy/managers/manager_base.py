@@ -1,3 +1,4 @@
+import enum
 import logging
 import string
 from abc import ABC, abstractmethod
@@ -6,13 +7,19 @@ from sc2 import Result, UnitTypeId
 
 import sc2
 from sc2.client import Client
-from typing import TYPE_CHECKING
+from typing import Optional, Tuple, Type, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from sharpy.knowledges import Knowledge, KnowledgeBot
     from sharpy.managers import UnitCacheManager, UnitValue
 
 
+class ManagerPriority(enum.IntEnum):
+    Low = 0
+    Normal = 1
+    High = 2
+
+
 class ManagerBase(ABC):
     ai: "KnowledgeBot"
     knowledge: "Knowledge"
@@ -20,6 +27,14 @@ class ManagerBase(ABC):
     cache: "UnitCacheManager"
     client: Client
 
+    # Scheduling of the update when the step is short on time, see manager_scheduler.py.
+    # Longest time in game seconds between two updates, None updates the manager on every step.
+    max_update_interval: Optional[float] = None
+    # Managers with a higher priority are updated first when there is time left in the step.
+    priority: ManagerPriority = ManagerPriority.Normal
+    # Managers that are also updated, before this one, whenever this manager is updated.
+    dependencies: Tuple[Type["ManagerBase"], ...] = ()
+
     def __init__(self):
         self._debug: bool = False
 
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+from sharpy.managers.manager_base import ManagerBase
+
+if TYPE_CHECKING:
+    from sharpy.knowledges import KnowledgeBot
+
+# Share of the time left under the step time limit of run_game that the manager updates may use
+TIME_LIMIT_SHARE = 0.5
+# Weight of the latest update time in the average update time of a manager
+COST_SMOOTHING = 0.2
+
+
+class ManagerScheduler:
+    """ Decides which managers are updated on each step so that the updates fit in the time budget of the step.
+
+    The budget is 'manager_time_budget' of the bot in seconds, limited by the time left under the step time
+    limit of run_game ('ai.time_budget_available'). Without either, every manager is updated on every step.
+
+    Managers without 'max_update_interval' are updated on every step, as are managers whose interval has passed.
+    The rest are updated, highest priority and longest waiting first, while their average update time fits in
+    what is left of the budget, so that their updates are staggered over the following steps.
+    A manager is always updated together with its dependencies, in the order of Knowledge.managers.
+    """
+
+    def __init__(self):
+        self.ai: "KnowledgeBot" = None
+        self.managers: List[ManagerBase] = []
+        self.time_budget: Optional[float] = None
+        # Average update time in seconds
+        self.costs: Dict[ManagerBase, float] = {}
+        # Game time of the last update
+        self.last_update: Dict[ManagerBase, float] = {}
+        self.skip_counts: Dict[ManagerBase, int] = {}
+        self._dependencies: Dict[ManagerBase, List[ManagerBase]] = {}
+
+    def start(self, ai: "KnowledgeBot", managers: List[ManagerBase], time_budget: Optional[float]):
+        """
+        :param ai:
+        :param managers: in the order of their updates
+        :param time_budget: seconds per step for the manager updates, None for no budget of its own """
+        self.ai = ai
+        self.managers = managers
+        self.time_budget = time_budget
+        for manager in managers:
+            # Dependencies that are not in use are ignored
+            self._dependencies[manager] = [
+                next(other for other in managers if isinstance(other, dependency))
+                for dependency in manager.dependencies
+                if any(isinstance(other, dependency) for other in managers)
+            ]
+
+    def step_budget(self) -> Optional[float]:
+        """ Seconds for the manager updates on this step, None when every manager is updated. """
+        budget = self.time_budget
+        # Set by main.py when the game is played with a step time limit
+        available = getattr(self.ai, "time_budget_available", None)
+        if available is not None:
+            share = max(0.0, available) * TIME_LIMIT_SHARE
+            budget = share if budget is None else min(budget, share)
+        return budget
+
+    def select(self) -> List[ManagerBase]:
+        """ Returns the managers to update on this step in the order of their updates. """
+        budget = self.step_budget()
+        if budget is None:
+            return self.managers
+
+        now = self.ai.time
+        selected: Set[ManagerBase] = set()
+        optional: List[ManagerBase] = []
+        for manager in self.managers:
+            last_update = self.last_update.get(manager)
+            interval = manager.max_update_interval
+            if interval is None or last_update is None or now - last_update >= interval:
+                selected.update(self._with_dependencies(manager, selected))
+            else:
+                optional.append(manager)
+
+        remaining = budget - sum(self.costs.get(manager, 0.0) for manager in selected)
+        optional.sort(
+            key=lambda m: (m.priority, (now - self.last_update[m]) / m.max_update_interval), reverse=True
+        )
+        for manager in optional:
+            if manager in selected:
+                continue
+            required = self._with_dependencies(manager, selected)
+            cost = sum(self.costs.get(other, 0.0) for other in required)
+            if cost <= remaining:
+                selected.update(required)
+                remaining -= cost
+
+        result = []
+        for manager in self.managers:
+            if manager in selected:
+                result.append(manager)
+            else:
+                self.skip_counts[manager] = self.skip_counts.get(manager, 0) + 1
+        return result
+
+    def record(self, manager: ManagerBase, seconds: float):
+        """ Records an update of the manager that took 'seconds'. """
+        cost = self.costs.get(manager)
+        self.costs[manager] = seconds if cost is None else cost + (seconds - cost) * COST_SMOOTHING
+        self.last_update[manager] = self.ai.time
+
+    def _with_dependencies(self, manager: ManagerBase, selected: Set[ManagerBase]) -> List[ManagerBase]:
+        """ The manager and its dependencies, recursively, that are not selected yet. """
+        required = []
+        stack = [manager]
+        while stack:
+            current = stack.pop()
+            if current in selected or current in required:
+                continue
+            required.append(current)
+            stack.extend(self._dependencies.get(current, ()))
+        return required
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from .manager_base import ManagerBase, ManagerPriority
+from .manager_scheduler import ManagerScheduler
+
+
+class Combat(ManagerBase):
+    async def update(self):
+        pass
+
+    async def post_update(self):
+        pass
+
+
+class Income(Combat):
+    max_update_interval = 1
+
+
+class Scouting(Combat):
+    max_update_interval = 2
+    priority = ManagerPriority.High
+
+
+class Analyzer(Combat):
+    max_update_interval = 4
+    priority = ManagerPriority.Low
+    dependencies = (Income,)
+
+
+def start_scheduler(time_budget=None, **ai):
+    managers = [Combat(), Income(), Scouting(), Analyzer()]
+    scheduler = ManagerScheduler()
+    scheduler.start(SimpleNamespace(time=0.0, **ai), managers, time_budget)
+    return scheduler, managers
+
+
+def run_step(scheduler: ManagerScheduler, costs: dict):
+    selected = scheduler.select()
+    for manager in selected:
+        scheduler.record(manager, costs[type(manager)])
+    return [type(manager) for manager in selected]
+
+
+class TestManagerScheduler:
+    def test_updates_all_managers_without_budget(self):
+        scheduler, managers = start_scheduler()
+        assert scheduler.select() == managers
+        assert not scheduler.skip_counts
+
+    def test_staggers_managers_that_do_not_fit(self):
+        scheduler, _ = start_scheduler(time_budget=0.010)
+        costs = {Combat: 0.006, Income: 0.003, Scouting: 0.003, Analyzer: 0.003}
+
+        assert run_step(scheduler, costs) == [Combat, Income, Scouting, Analyzer]
+        scheduler.ai.time = 0.2
+        # The highest priority first, the analyzer would need the income update too
+        assert run_step(scheduler, costs) == [Combat, Scouting]
+        scheduler.ai.time = 1.0
+        # Overdue managers are updated first
+        assert run_step(scheduler, costs) == [Combat, Income]
+        scheduler.ai.time = 1.2
+        assert run_step(scheduler, costs) == [Combat, Scouting]
+        scheduler.ai.time = 3.5
+        # Also when they do not fit
+        assert run_step(scheduler, costs) == [Combat, Income, Scouting]
+        scheduler.ai.time = 4.0
+        # The overdue analyzer brings the income update with it
+        assert run_step(scheduler, costs) == [Combat, Income, Analyzer]
+        assert scheduler.skip_counts[scheduler.managers[3]] == 4
+
+    def test_budget_is_limited_by_step_time_limit(self):
+        scheduler, _ = start_scheduler(time_budget=1.0, time_budget_available=0.004)
+        assert scheduler.step_budget() == 0.002
+
+        scheduler.ai.time_budget_available = -0.1
+        assert scheduler.step_budget() == 0.0
@@ -1,8 +1,11 @@
 import logging
 from math import floor
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Set, Tuple
+
+import numpy as np
 
 from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.path_query_cache import PathQueryCache
 from sharpy.managers.unit_value import buildings_2x2, buildings_3x3, buildings_5x5
 from sharpy.sc2math import point_normalize
 from sc2.ids.effect_id import EffectId
@@ -17,6 +20,11 @@ import sc2pathlibp
 from sc2.position import Point2
 from sc2.unit import Unit
 
+# Center and size of a block in the path finders
+Block = Tuple[Point2, Tuple[int, int]]
+# Whether the influence is added with walking distance, cells, value and distance of an influence in the path finders
+Stamp = Tuple[bool, Tuple[Tuple[int, int], ...], float, float]
+
 
 class PathingManager(ManagerBase):
     def __init__(self):
@@ -26,6 +34,18 @@ class PathingManager(ManagerBase):
         self.path_finder_air: sc2pathlibp.PathFinder = None
         self.found_points = []
         self.found_points_air = []
+        # Blocks and influences that are in the path finders, see update_influence
+        self._terrain_blocks: Optional[Set[Block]] = None
+        self._rock_blocks: Optional[Set[Block]] = None
+        self._ground_blocks: Optional[Set[Block]] = None
+        self._ground_stamps: Optional[List[Stamp]] = None
+        self._air_stamps: Optional[List[Stamp]] = None
+        # Changes whenever the blocks of path_finder_terrain change, for example when a rock is destroyed
+        self.terrain_version: int = 0
+        # Changes only when the blocks of destructible rocks change, mined out mineral fields do not change it
+        self.rock_version: int = 0
+        # Results of the path_finder_ground queries of micro, forgotten whenever path_finder_ground changes
+        self.ground_queries = PathQueryCache()
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
@@ -34,30 +54,27 @@ class PathingManager(ManagerBase):
         path_grid = game_info.pathing_grid
         placement_grid = game_info.placement_grid
 
-        _data = [[0 for y in range(path_grid.height)] for x in range(path_grid.width)]
+        pathable = (path_grid.data_numpy != 0) | (placement_grid.data_numpy != 0)
+        # The path finders take the grids as [x][y]
+        _data = pathable.T.astype(int).tolist()
 
-        for x in range(0, path_grid.width):
-            for y in range(0, path_grid.height):
-                pathable = path_grid.is_set((x, y)) or placement_grid.is_set((x, y))
-                if pathable:
-                    _data[x][y] = 1
+        # native uses the prebuilt sc2pathlib binaries, numpy uses NumPy and SciPy
+        if self.knowledge.config["general"].get("pathing_backend", "native") == "numpy":
+            path_finder_type = sc2pathlibp.NumpyPathFinder
+        else:
+            path_finder_type = sc2pathlibp.PathFinder
 
-        self.path_finder_terrain = sc2pathlibp.PathFinder(_data)
-        self.path_finder_ground = sc2pathlibp.PathFinder(_data)
+        self.path_finder_terrain = path_finder_type(_data)
+        self.path_finder_ground = path_finder_type(_data)
 
         self.path_finder_terrain.normalize_influence(20)
 
-        air_data = [[1 for y in range(path_grid.height)] for x in range(path_grid.width)]
-        for x in range(0, path_grid.width):
-            for y in range(0, path_grid.height):
-                if (
-                    x < game_info.playable_area.x
-                    or x > game_info.playable_area.x + game_info.playable_area.width
-                    or y < game_info.playable_area.y
-                    or y > game_info.playable_area.y + game_info.playable_area.height
-                ):
-                    air_data[x][y] = 0
-        self.path_finder_air = sc2pathlibp.PathFinder(air_data)
+        area = game_info.playable_area
+        xs = np.arange(path_grid.width)[:, np.newaxis]
+        ys = np.arange(path_grid.height)[np.newaxis, :]
+        in_area = (xs >= area.x) & (xs <= area.x + area.width) & (ys >= area.y) & (ys <= area.y + area.height)
+        air_data = in_area.astype(int).tolist()
+        self.path_finder_air = path_finder_type(air_data)
 
     async def update(self):
         await self.update_influence()
@@ -66,118 +83,162 @@ class PathingManager(ManagerBase):
 
     def set_rocks(self, grid: sc2pathlibp.PathFinder):
         for rock in self.ai.destructables:  # type: Unit
-            rock_type = rock.type_id
-            if rock.name == "MineralField450":
-                # Attempts to solve the issue with sc2 linux 4.10 vs Windows 4.11
-                grid.create_block(rock.position, (2, 1))
-            elif rock_type in breakable_rocks_2x2:
-                grid.create_block(rock.position, (2, 2))
-            elif rock_type in breakable_rocks_4x4:
-                grid.create_block(rock.position, (4, 3))
-                grid.create_block(rock.position, (3, 4))
-            elif rock_type in breakable_rocks_6x6:
-                grid.create_block(rock.position, (6, 4))
-                grid.create_block(rock.position, (5, 5))
-                grid.create_block(rock.position, (4, 6))
-            elif rock_type in breakable_rocks_4x2:
-                grid.create_block(rock.position, (4, 2))
-            elif rock_type in breakable_rocks_2x4:
-                grid.create_block(rock.position, (2, 4))
-            elif rock_type in breakable_rocks_6x2:
-                grid.create_block(rock.position, (6, 2))
-            elif rock_type in breakable_rocks_2x6:
-                grid.create_block(rock.position, (2, 6))
-            elif rock_type in breakable_rocks_diag_BLUR:
-                for y in range(-4, 6):
-                    if y == -4:
-                        grid.create_block(rock.position + Point2((y + 2, y)), (1, 1))
-                    elif y == 5:
-                        grid.create_block(rock.position + Point2((y - 2, y)), (1, 1))
-                    elif y == -3:
-                        grid.create_block(rock.position + Point2((y - 1, y)), (3, 1))
-                    elif y == 4:
-                        grid.create_block(rock.position + Point2((y + 1, y)), (3, 1))
-                    else:
-                        grid.create_block(rock.position + Point2((y, y)), (5, 1))
-
-            elif rock_type in breakable_rocks_diag_ULBR:
-                for y in range(-4, 6):
-                    if y == -4:
-                        grid.create_block(rock.position + Point2((-y - 2, y)), (1, 1))
-                    elif y == 5:
-                        grid.create_block(rock.position + Point2((-y + 2, y)), (1, 1))
-                    elif y == -3:
-                        grid.create_block(rock.position + Point2((-y + 1, y)), (3, 1))
-                    elif y == 4:
-                        grid.create_block(rock.position + Point2((-y - 1, y)), (3, 1))
-                    else:
-                        grid.create_block(rock.position + Point2((-y, y)), (5, 1))
+            for center, size in self.rock_blocks(rock):
+                grid.create_block(center, size)
+
+    @staticmethod
+    def rock_blocks(rock: Unit) -> List[Block]:
+        """ Returns the blocks of the rock in the path finders. """
+        blocks: List[Block] = []
+        rock_type = rock.type_id
+        if rock.name == "MineralField450":
+            # Attempts to solve the issue with sc2 linux 4.10 vs Windows 4.11
+            blocks.append((rock.position, (2, 1)))
+        elif rock_type in breakable_rocks_2x2:
+            blocks.append((rock.position, (2, 2)))
+        elif rock_type in breakable_rocks_4x4:
+            blocks.append((rock.position, (4, 3)))
+            blocks.append((rock.position, (3, 4)))
+        elif rock_type in breakable_rocks_6x6:
+            blocks.append((rock.position, (6, 4)))
+            blocks.append((rock.position, (5, 5)))
+            blocks.append((rock.position, (4, 6)))
+        elif rock_type in breakable_rocks_4x2:
+            blocks.append((rock.position, (4, 2)))
+        elif rock_type in breakable_rocks_2x4:
+            blocks.append((rock.position, (2, 4)))
+        elif rock_type in breakable_rocks_6x2:
+            blocks.append((rock.position, (6, 2)))
+        elif rock_type in breakable_rocks_2x6:
+            blocks.append((rock.position, (2, 6)))
+        elif rock_type in breakable_rocks_diag_BLUR:
+            for y in range(-4, 6):
+                if y == -4:
+                    blocks.append((rock.position + Point2((y + 2, y)), (1, 1)))
+                elif y == 5:
+                    blocks.append((rock.position + Point2((y - 2, y)), (1, 1)))
+                elif y == -3:
+                    blocks.append((rock.position + Point2((y - 1, y)), (3, 1)))
+                elif y == 4:
+                    blocks.append((rock.position + Point2((y + 1, y)), (3, 1)))
+                else:
+                    blocks.append((rock.position + Point2((y, y)), (5, 1)))
+
+        elif rock_type in breakable_rocks_diag_ULBR:
+            for y in range(-4, 6):
+                if y == -4:
+                    blocks.append((rock.position + Point2((-y - 2, y)), (1, 1)))
+                elif y == 5:
+                    blocks.append((rock.position + Point2((-y + 2, y)), (1, 1)))
+                elif y == -3:
+                    blocks.append((rock.position + Point2((-y + 1, y)), (3, 1)))
+                elif y == 4:
+                    blocks.append((rock.position + Point2((-y - 1, y)), (3, 1)))
+                else:
+                    blocks.append((rock.position + Point2((-y, y)), (5, 1)))
+        return blocks
 
     async def update_influence(self):
-        power = ExtendedPower(self.unit_values)
-        self.path_finder_terrain.reset()  # Reset
-        self.path_finder_ground.reset()  # Reset
-
-        positions = []
-
-        for mf in self.ai.mineral_field:  # type: Unit
-            # In 4.8.5+ minerals are no linger visible in pathing grid
-            positions.append(mf.position)
-
-        # for mf in self.ai.mineral_walls:  # type: Unit
-        #     # In 4.8.5+ minerals are no linger visible in pathing grid
-        #     positions.append(mf.position)
-
-        self.path_finder_terrain.create_block(positions, (2, 1))
-        self.path_finder_ground.create_block(positions, (2, 1))
-
-        self.set_rocks(self.path_finder_terrain)
-        self.set_rocks(self.path_finder_ground)
+        """
+        Updates the blocks and influence of the path finders.
+
+        The path finders are only reset when a block has disappeared, new blocks are added to the current ones.
+        Influence is only added again when it is different from the influence that is already in the path finder,
+        or when it walks around blocks and the blocks have changed.
+        """
+        # In 4.8.5+ minerals are no linger visible in pathing grid
+        rock_blocks: Set[Block] = set()
+        for rock in self.ai.destructables:  # type: Unit
+            rock_blocks.update(self.rock_blocks(rock))
+        terrain_blocks: Set[Block] = {(mf.position, (2, 1)) for mf in self.ai.mineral_field} | rock_blocks
 
+        ground_blocks = set(terrain_blocks)
         for building in self.ai.structures + self.knowledge.known_enemy_structures:  # type: Unit
             if building.type_id in buildings_2x2:
-                self.path_finder_ground.create_block(building.position, (2, 2))
+                ground_blocks.add((building.position, (2, 2)))
             elif building.type_id in buildings_3x3:
-                self.path_finder_ground.create_block(building.position, (3, 3))
+                ground_blocks.add((building.position, (3, 3)))
             elif building.type_id in buildings_5x5:
-                self.path_finder_ground.create_block(building.position, (5, 3))
-                self.path_finder_ground.create_block(building.position, (3, 5))
-
-        self.set_rocks(self.path_finder_ground)
-
-        self.path_finder_ground.normalize_influence(20)
-        self.path_finder_air.normalize_influence(20)
+                ground_blocks.add((building.position, (5, 3)))
+                ground_blocks.add((building.position, (3, 5)))
+
+        if terrain_blocks != self._terrain_blocks:
+            self.terrain_version += 1
+        if rock_blocks != self._rock_blocks:
+            self.rock_version += 1
+            self._rock_blocks = rock_blocks
+        self.update_blocks(self.path_finder_terrain, self._terrain_blocks, terrain_blocks)
+        ground_changed = ground_blocks != self._ground_blocks
+        ground_reset = self.update_blocks(self.path_finder_ground, self._ground_blocks, ground_blocks)
+        self._terrain_blocks = terrain_blocks
+        self._ground_blocks = ground_blocks
+
+        ground_stamps, air_stamps = self.influence_stamps()
+        # Walk influence spreads around blocks, new blocks change where it reaches
+        walk_changed = ground_changed and any(walk for walk, _, _, _ in ground_stamps)
+        if ground_reset or walk_changed or ground_stamps != self._ground_stamps:
+            self.path_finder_ground.normalize_influence(20)
+            self.add_stamps(self.path_finder_ground, ground_stamps)
+            self._ground_stamps = ground_stamps
+            ground_changed = True
+        if ground_changed:
+            self.ground_queries.new_cycle()
+        if air_stamps != self._air_stamps:
+            self.path_finder_air.normalize_influence(20)
+            self.add_stamps(self.path_finder_air, air_stamps)
+            self._air_stamps = air_stamps
+
+    @staticmethod
+    def update_blocks(grid: sc2pathlibp.PathFinder, current: Optional[Set[Block]], blocks: Set[Block]) -> bool:
+        """
+        Changes the blocks of the path finder from current to blocks.
+        :return: True if the path finder was reset and its influence needs to be added again
+        """
+        if current is not None and current <= blocks:
+            added = blocks - current
+        else:
+            grid.reset()
+            added = blocks
+
+        blocks_by_size: Dict[Tuple[int, int], List[Point2]] = {}
+        for center, size in added:
+            blocks_by_size.setdefault(size, []).append(center)
+        for size, centers in blocks_by_size.items():
+            grid.create_block(centers, size)
+        return added is blocks
+
+    def influence_stamps(self) -> Tuple[List[Stamp], List[Stamp]]:
+        """ Returns the influences of enemy units and effects for the ground and the air path finder. """
+        power = ExtendedPower(self.unit_values)
+        ground_stamps: List[Stamp] = []
+        air_stamps: List[Stamp] = []
 
-        for enemy_type in self.cache.enemy_unit_cache:  # type: UnitTypeId
-            enemies: Units = self.cache.enemy_unit_cache.get(enemy_type, Units([], self.ai))
+        for enemy_type, enemies in self.cache.enemy_unit_cache.items():  # type: UnitTypeId, Units
             if len(enemies) == 0:
                 continue
 
             example_enemy: Unit = enemies[0]
             power.clear()
             power.add_unit(enemy_type, 100)
+            cells = self.influence_cells(enemy.position_tuple for enemy in enemies)
 
             if self.unit_values.can_shoot_air(example_enemy):
-                positions: List[Point2] = map(lambda u: u.position, enemies)  # need to be specified in both places
                 s_range = self.unit_values.air_range(example_enemy)
 
                 if example_enemy.type_id == UnitTypeId.CYCLONE:
                     s_range = 7
 
-                self.path_finder_air.add_influence(positions, power.air_power, s_range + 3)
+                air_stamps.append((False, cells, float(power.air_power), s_range + 3))
 
             if self.unit_values.can_shoot_ground(example_enemy):
-                positions = map(lambda u: u.position, enemies)  # need to be specified in both places
                 s_range = self.unit_values.ground_range(example_enemy)
                 if example_enemy.type_id == UnitTypeId.CYCLONE:
                     s_range = 7
 
-                if s_range < 2:
-                    self.path_finder_ground.add_influence_walk(positions, power.ground_power, 7)
-                elif s_range < 5:
-                    self.path_finder_ground.add_influence_walk(positions, power.ground_power, 7)
+                if s_range < 5:
+                    ground_stamps.append((True, cells, float(power.ground_power), 7))
                 else:
-                    self.path_finder_ground.add_influence(positions, power.ground_power, s_range + 3)
+                    ground_stamps.append((False, cells, float(power.ground_power), s_range + 3))
 
         # influence, radius, points, can it hit air?
         effect_dict: Dict[EffectId, Tuple[float, float, List[Point2], bool]] = dict()
@@ -211,23 +272,44 @@ class PathingManager(ManagerBase):
                 effect_dict[effect.id] = values
 
         for effects in effect_dict.values():
+            cells = self.influence_cells(effects[2])
             if effects[3]:
-                self.path_finder_air.add_influence(effects[2], effects[0], effects[1])
-            self.path_finder_ground.add_influence(effects[2], effects[0], effects[1])
+                air_stamps.append((False, cells, effects[0], effects[1]))
+            ground_stamps.append((False, cells, effects[0], effects[1]))
 
         # batteries: Units = self.cache.own(UnitTypeId.SHIELDBATTERY).filter(lambda u: u.energy > 5)
         # if batteries:
         #     positions = map(lambda u: u.position, batteries)
         #     self.path_finder_air.add_influence(positions, -5, 6)
         #     self.path_finder_ground.add_influence(positions, -5, 6)
+        return ground_stamps, air_stamps
+
+    @staticmethod
+    def influence_cells(positions) -> Tuple[Tuple[int, int], ...]:
+        """ Grid cells of the positions in a fixed order, the path finders add influence to cells. """
+        return tuple(sorted((floor(position[0]), floor(position[1])) for position in positions))
+
+    @staticmethod
+    def add_stamps(grid: sc2pathlibp.PathFinder, stamps: List[Stamp]):
+        for walk, cells, value, distance in stamps:
+            if walk:
+                grid.add_influence_walk(list(cells), value, distance)
+            else:
+                grid.add_influence(list(cells), value, distance)
 
     async def post_update(self):
         if self.debug:
             self.path_finder_ground.plot(self.found_points)
             self.path_finder_air.plot(self.found_points_air, "air_map")
 
+    def terrain_grid(self) -> np.ndarray:
+        """ Cells [x][y] of path_finder_terrain that can be walked through. """
+        return np.array(self.path_finder_terrain.map) > 0
+
     def walk_distance(self, start: Point2, target: Point2) -> float:
-        result = self.path_finder_ground.find_path(start, target)
+        result = self.ground_queries.get(
+            "find_path", start, target, 0, lambda: self.path_finder_ground.find_path(start, target)
+        )
         path = result[0]
 
         if len(path) < 1:
@@ -256,7 +338,9 @@ class PathingManager(ManagerBase):
         return Point2((pos[0] + 0.5, pos[1] + 0.5))
 
     def find_weak_influence_ground(self, target: Point2, radius: float) -> Point2:
-        pathing_result = self.path_finder_ground.safest_spot(target, radius)
+        pathing_result = self.ground_queries.get(
+            "safest_spot", None, target, radius, lambda: self.path_finder_ground.safest_spot(target, radius)
+        )
         pos = pathing_result[0]
         return Point2((pos[0] + 0.5, pos[1] + 0.5))
 
@@ -283,7 +367,9 @@ class PathingManager(ManagerBase):
         return Point2((target[0] + 0.5, target[1] + 0.5))
 
     def find_influence_ground_path(self, start: Point2, target: Point2, target_index: int = 5) -> Point2:
-        result = self.path_finder_ground.find_path_influence(start, target)
+        result = self.ground_queries.get(
+            "find_path_influence", start, target, 0, lambda: self.path_finder_ground.find_path_influence(start, target)
+        )
         path = result[0]
 
         if len(path) < 1:
@@ -299,7 +385,13 @@ class PathingManager(ManagerBase):
         return Point2((target[0] + 0.5, target[1] + 0.5))
 
     def find_low_inside_ground(self, start: Point2, target: Point2, distance: float) -> Point2:
-        result = self.path_finder_ground.find_low_inside_walk(start, target, distance)
+        result = self.ground_queries.get(
+            "find_low_inside_walk",
+            start,
+            target,
+            distance,
+            lambda: self.path_finder_ground.find_low_inside_walk(start, target, distance),
+        )
         result = result[0]  # strip distance
         end_point = Point2((result[0], result[1]))
         result_distance = target.distance_to_point2(end_point)
@@ -0,0 +1,192 @@
+import asyncio
+from configparser import ConfigParser
+from types import SimpleNamespace
+
+import sc2pathlibp
+from sc2 import Race, UnitTypeId
+from sc2.bot_ai import BotAI
+from sc2.position import Point2
+from sc2.synthetic_game import SyntheticGame
+
+from sharpy.managers.combat2.engagement_test import create_unit_values
+from .pathing_manager import PathingManager
+
+
+class RecordingPathFinder:
+    """ Records the calls that change the path finder instead of finding paths. """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.calls = []
+
+    def reset(self):
+        self.calls.append(("reset",))
+
+    def create_block(self, center, size):
+        centers = center if isinstance(center, list) else [center]
+        self.calls.append(("create_block", size, sorted(centers)))
+
+    def normalize_influence(self, value):
+        self.calls.append(("normalize_influence", value))
+
+    def add_influence(self, points, value, distance):
+        self.calls.append(("add_influence", list(points), value, distance))
+
+    def add_influence_walk(self, points, value, distance):
+        self.calls.append(("add_influence_walk", list(points), value, distance))
+
+    def take_calls(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+
+def start_manager(monkeypatch, bot: BotAI, backend: str = "native") -> PathingManager:
+    monkeypatch.setattr(sc2pathlibp, "PathFinder", RecordingPathFinder)
+    config = ConfigParser()
+    config.read_dict({"general": {"pathing_backend": backend}, "debug": {}})
+    enemy_unit_cache = {}
+    for unit in bot.enemy_units:
+        enemy_unit_cache.setdefault(unit.type_id, []).append(unit)
+    knowledge = SimpleNamespace(
+        ai=bot,
+        config=config,
+        unit_cache=SimpleNamespace(enemy_unit_cache=enemy_unit_cache),
+        unit_values=create_unit_values(bot),
+        known_enemy_structures=bot.enemy_structures,
+        enemy_race=Race.Zerg,
+        print=lambda *args, **kwargs: None,
+    )
+    bot._client = None
+    manager = PathingManager()
+    asyncio.run(manager.start(knowledge))
+    return manager
+
+
+def update(manager: PathingManager):
+    asyncio.run(manager.update_influence())
+    return (
+        manager.path_finder_terrain.take_calls(),
+        manager.path_finder_ground.take_calls(),
+        manager.path_finder_air.take_calls(),
+    )
+
+
+class TestPathingManager:
+    def test_grids(self, monkeypatch):
+        game = SyntheticGame(seed=9)
+        bot = game.start_bot(BotAI(), game.observation(10, 10))
+        manager = start_manager(monkeypatch, bot)
+        path_grid = bot.game_info.pathing_grid
+        placement_grid = bot.game_info.placement_grid
+        area = bot.game_info.playable_area
+
+        for x in range(0, path_grid.width):
+            for y in range(0, path_grid.height):
+                pathable = path_grid.is_set((x, y)) or placement_grid.is_set((x, y))
+                assert manager.path_finder_ground.grid[x][y] == int(pathable)
+                in_area = area.x <= x <= area.x + area.width and area.y <= y <= area.y + area.height
+                assert manager.path_finder_air.grid[x][y] == int(in_area)
+
+    def test_changes_only_are_applied(self, monkeypatch):
+        game = SyntheticGame(seed=10)
+        bot = game.start_bot(BotAI(), game.observation(20, 40, clusters=2))
+        manager = start_manager(monkeypatch, bot)
+        manager.path_finder_terrain.take_calls()
+        new_structure = bot.enemy_structures.pop()
+
+        terrain, ground, air = update(manager)
+        assert terrain[0] == ("reset",) and ground[0] == ("reset",)
+        assert ("normalize_influence", 20) in ground and ("normalize_influence", 20) in air
+        assert any(call[0] == "add_influence_walk" for call in ground)
+        assert any(call[0] == "add_influence" for call in air)
+
+        # Nothing has changed
+        assert update(manager) == ([], [], [])
+
+        # A new structure is blocked without resetting the path finder, the walk influence around it is added again
+        bot.enemy_structures.append(new_structure)
+        terrain, ground, air = update(manager)
+        assert terrain == [] and air == []
+        blocks = [call for call in ground if call[0] == "create_block"]
+        assert blocks and all(call[2] == [new_structure.position] for call in blocks)
+        assert ("reset",) not in ground
+        assert ground[len(blocks)] == ("normalize_influence", 20)
+        assert any(call[0] == "add_influence_walk" for call in ground)
+
+        # Without walk influence the new blocks are all that changes
+        manager._ground_stamps = [stamp for stamp in manager._ground_stamps if not stamp[0]]
+        manager.influence_stamps = lambda: (manager._ground_stamps, manager._air_stamps)
+        bot.enemy_structures.remove(new_structure)
+        update(manager)
+        bot.enemy_structures.append(new_structure)
+        terrain, ground, air = update(manager)
+        assert ground and all(call[0] == "create_block" for call in ground)
+        del manager.influence_stamps
+
+        # A destroyed mineral field resets the blocks and the influence has to be added again
+        mineral_field = bot.mineral_field[0]
+        bot.mineral_field.remove(mineral_field)
+        terrain, ground, air = update(manager)
+        assert terrain[0] == ("reset",) and ground[0] == ("reset",)
+        assert ("normalize_influence", 20) in ground and air == []
+        assert manager.terrain_version == 2
+        # Mined out mineral fields do not change the rocks
+        assert manager.rock_version == 1
+        blocked = [center for call in ground if call[0] == "create_block" and call[1] == (2, 1) for center in call[2]]
+        assert mineral_field.position not in blocked and len(blocked) == len(bot.mineral_field)
+
+        # A rock changes the terrain and the rocks
+        rock = SimpleNamespace(type_id=UnitTypeId.ROCKS2X2NONCONJOINED, name="Rock", position=Point2((20, 20)))
+        bot.destructables.append(rock)
+        update(manager)
+        assert manager.terrain_version == 3 and manager.rock_version == 2
+        bot.destructables.remove(rock)
+        update(manager)
+        assert manager.terrain_version == 4 and manager.rock_version == 3
+
+        # Moved enemies change the influence
+        for enemies in manager.cache.enemy_unit_cache.values():
+            enemies.pop()
+        terrain, ground, air = update(manager)
+        assert terrain == [] and ("normalize_influence", 20) in ground and ("normalize_influence", 20) in air
+
+    def test_numpy_backend(self, monkeypatch):
+        game = SyntheticGame(seed=11)
+        bot = game.start_bot(BotAI(), game.observation(20, 40, clusters=2))
+        manager = start_manager(monkeypatch, bot, "numpy")
+        asyncio.run(manager.update_influence())
+        start = bot.units[0].position
+        target = bot.enemy_units[-1].position
+
+        assert isinstance(manager.path_finder_ground, sc2pathlibp.NumpyPathFinder)
+        assert manager.walk_distance(start, target) >= start.distance_to(target)
+        assert manager.find_path(start, target).distance_to(start) < start.distance_to(target)
+        assert manager.find_influence_ground_path(start, target).distance_to(start) < 10
+        enemy = bot.enemy_units[0].position
+        weak = manager.find_weak_influence_ground(enemy, 10)
+        assert manager.path_finder_ground.map[int(weak.x)][int(weak.y)] == 20
+        assert manager.find_low_inside_ground(start, enemy, 6).distance_to(enemy) <= 6 + 1e-6
+
+    def test_ground_queries_are_memoized(self, monkeypatch):
+        game = SyntheticGame(seed=12)
+        bot = game.start_bot(BotAI(), game.observation(20, 40, clusters=2))
+        manager = start_manager(monkeypatch, bot, "numpy")
+        asyncio.run(manager.update_influence())
+        target = bot.enemy_units[0].position
+        starts = [unit.position for unit in bot.units[:10]]
+
+        results = [manager.find_influence_ground_path(start, target) for start in starts]
+        assert results == [manager.find_influence_ground_path(start, target) for start in starts]
+        assert manager.ground_queries.hits >= len(starts)
+        misses = manager.ground_queries.misses
+
+        # Nothing changes on the ground, the results are kept
+        asyncio.run(manager.update_influence())
+        manager.find_influence_ground_path(starts[0], target)
+        assert manager.ground_queries.misses == misses
+
+        for enemies in manager.cache.enemy_unit_cache.values():
+            enemies.pop()
+        asyncio.run(manager.update_influence())
+        manager.find_influence_ground_path(starts[0], target)
+        assert manager.ground_queries.misses == misses + 1
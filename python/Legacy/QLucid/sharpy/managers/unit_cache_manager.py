@@ -1,9 +1,11 @@
+import enum
+
 import numpy as np
-from typing import Dict, Union, Optional, List, Iterable
+from typing import Dict, Union, Optional, List, Iterable, Tuple
 
 from scipy.spatial.ckdtree import cKDTree
 
-from sharpy.managers.unit_value import race_townhalls
+from sharpy.managers.unit_value import race_townhalls, UnitValue
 from sc2.constants import FakeEffectID
 from sc2.game_state import EffectData
 from sc2.position import Point2
@@ -17,6 +19,91 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from sharpy.knowledges import Knowledge
 
+EMPTY_INDICES = np.empty(0, dtype=np.intp)
+
+
+class UnitCategory(enum.Enum):
+    """ Subsets of units that have their own KD-tree in UnitCacheManager. """
+
+    Ground = 0  # Includes structures
+    Air = 1
+    Structure = 2
+    Worker = 3
+
+
+class UnitSpatialIndex:
+    """KD-trees of unit positions, one for all units and one for each type and category that is queried.
+
+    Query results are indices into 'units'. The trees of types and categories are built on their first query."""
+
+    def __init__(self, units: Units, type_indices: Dict[UnitTypeId, List[int]]):
+        """
+        :param units:
+        :param type_indices: indices of the units of each type in 'units'
+        """
+        self.units = units
+        self.positions: np.ndarray = units._positions_array()
+        self.tree: Optional[cKDTree] = cKDTree(self.positions) if len(units) > 0 else None
+        self._type_indices = type_indices
+        self._subsets: Dict[Union[UnitTypeId, UnitCategory], Tuple[Optional[cKDTree], np.ndarray]] = {}
+        self._targetable: Optional[np.ndarray] = None
+
+    def subset(self, key: Union[UnitTypeId, UnitCategory]) -> Tuple[Optional[cKDTree], np.ndarray]:
+        """ Returns the tree of the units of a type or category and their indices in 'units'. """
+        subset = self._subsets.get(key)
+        if subset is None:
+            if isinstance(key, UnitTypeId):
+                indices = np.array(self._type_indices.get(key, ()), dtype=np.intp)
+            else:
+                indices = np.flatnonzero(self._category_mask(key))
+            tree = cKDTree(self.positions[indices]) if len(indices) > 0 else None
+            subset = self._subsets[key] = (tree, indices)
+        return subset
+
+    def _category_mask(self, category: UnitCategory) -> np.ndarray:
+        if category == UnitCategory.Ground:
+            values = (not unit.is_flying for unit in self.units)
+        elif category == UnitCategory.Air:
+            values = (unit.is_flying for unit in self.units)
+        elif category == UnitCategory.Structure:
+            values = (unit.is_structure for unit in self.units)
+        else:
+            values = (unit.type_id in UnitValue.worker_types for unit in self.units)
+        return np.fromiter(values, dtype=bool, count=len(self.units))
+
+    @property
+    def targetable(self) -> np.ndarray:
+        """ Mask of the units that can be attacked, snapshots included. """
+        if self._targetable is None:
+            self._targetable = np.fromiter(
+                (unit.can_be_attacked or unit.is_snapshot for unit in self.units), dtype=bool, count=len(self.units)
+            )
+        return self._targetable
+
+    def query(
+        self,
+        centers: Union[np.ndarray, List[Point2]],
+        ranges: Union[float, np.ndarray, List[float]],
+        subset: Optional[Union[UnitTypeId, UnitCategory]] = None,
+    ) -> List[np.ndarray]:
+        """ Returns the indices of the units within range of each center, sorted. """
+        centers = np.asarray(centers, dtype=float).reshape((-1, 2))
+        if subset is None:
+            tree, indices = self.tree, None
+        else:
+            tree, indices = self.subset(subset)
+        if tree is None:
+            return [EMPTY_INDICES] * len(centers)
+
+        results = tree.query_ball_point(centers, ranges, return_sorted=True)
+        if indices is None:
+            return [np.array(result, dtype=np.intp) for result in results]
+        return [indices[result] for result in results]
+
+    def units_at(self, indices: np.ndarray) -> Units:
+        units = self.units
+        return Units([units[index] for index in indices.tolist()], units._bot_object)
+
 
 class UnitCacheManager(ManagerBase):
     """Provides performance optimized methods for filtering both own and enemy units based on unit type and position."""
@@ -31,6 +118,8 @@ class UnitCacheManager(ManagerBase):
         self.enemy_unit_cache: Dict[UnitTypeId, Units] = {}
         self.own_tree: Optional[cKDTree] = None
         self.enemy_tree: Optional[cKDTree] = None
+        self.own_index: Optional[UnitSpatialIndex] = None
+        self.enemy_index: Optional[UnitSpatialIndex] = None
         self.force_fields: List[EffectData] = []
 
         self.mineral_fields: Dict[Point2, Unit] = {}
@@ -39,6 +128,8 @@ class UnitCacheManager(ManagerBase):
         await super().start(knowledge)
         self.all_own: Units = Units([], self.ai)
         self.empty_units: Units = Units([], self.ai)
+        self.own_index = UnitSpatialIndex(self.empty_units, {})
+        self.enemy_index = UnitSpatialIndex(self.empty_units, {})
 
     def by_tag(self, tag: int) -> Optional[Unit]:
         return self.tag_cache.get(tag, None)
@@ -97,6 +188,49 @@ class UnitCacheManager(ManagerBase):
             return units.filter(lambda x: x.can_be_attacked or x.is_snapshot)
         return units
 
+    def own_indices_in_range(
+        self,
+        centers: Union[np.ndarray, List[Point2]],
+        ranges: Union[float, np.ndarray, List[float]],
+        subset: Optional[Union[UnitTypeId, UnitCategory]] = None,
+    ) -> List[np.ndarray]:
+        """
+        Returns the indices of own units in range of each of the centers with a single query, see own_units_at.
+
+        :param centers: array of shape (n, 2) or list of positions
+        :param ranges: one range for all centers or one for each
+        :param subset: only units of this type or category
+        """
+        return self.own_index.query(centers, ranges, subset)
+
+    def enemy_indices_in_range(
+        self,
+        centers: Union[np.ndarray, List[Point2]],
+        ranges: Union[float, np.ndarray, List[float]],
+        subset: Optional[Union[UnitTypeId, UnitCategory]] = None,
+        only_targetable=True,
+    ) -> List[np.ndarray]:
+        """
+        Returns the indices of known enemy units in range of each of the centers with a single query,
+        see enemy_units_at.
+
+        :param centers: array of shape (n, 2) or list of positions
+        :param ranges: one range for all centers or one for each
+        :param subset: only units of this type or category
+        :param only_targetable: same as in enemy_in_range
+        """
+        results = self.enemy_index.query(centers, ranges, subset)
+        if only_targetable:
+            targetable = self.enemy_index.targetable
+            return [indices[targetable[indices]] for indices in results]
+        return results
+
+    def own_units_at(self, indices: np.ndarray) -> Units:
+        return self.own_index.units_at(indices)
+
+    def enemy_units_at(self, indices: np.ndarray) -> Units:
+        return self.enemy_index.units_at(indices)
+
     async def update(self):
         self.update_minerals()
 
@@ -105,37 +239,33 @@ class UnitCacheManager(ManagerBase):
         self.enemy_unit_cache.clear()
         self.force_fields.clear()
 
-        own_numpy_vectors = []
-        enemy_numpy_vectors = []
+        own_type_indices: Dict[UnitTypeId, List[int]] = {}
+        enemy_type_indices: Dict[UnitTypeId, List[int]] = {}
         self.all_own = self.knowledge.all_own
 
-        for unit in self.all_own:
+        for index, unit in enumerate(self.all_own):
             self.tag_cache[unit.tag] = unit
 
             units = self.own_unit_cache.get(unit.type_id, Units([], self.ai))
             if units.amount == 0:
                 self.own_unit_cache[unit.type_id] = units
             units.append(unit)
-            own_numpy_vectors.append(np.array([unit.position.x, unit.position.y]))
+            own_type_indices.setdefault(unit.type_id, []).append(index)
 
-        for unit in self.knowledge.known_enemy_units:
+        for index, unit in enumerate(self.knowledge.known_enemy_units):
             self.tag_cache[unit.tag] = unit
 
             units = self.enemy_unit_cache.get(unit.type_id, Units([], self.ai))
             if units.amount == 0:
                 self.enemy_unit_cache[unit.type_id] = units
             units.append(unit)
-            enemy_numpy_vectors.append(np.array([unit.position.x, unit.position.y]))
+            enemy_type_indices.setdefault(unit.type_id, []).append(index)
 
-        if len(own_numpy_vectors) > 0:
-            self.own_tree = cKDTree(own_numpy_vectors)
-        else:
-            self.own_tree = None
-
-        if len(enemy_numpy_vectors) > 0:
-            self.enemy_tree = cKDTree(enemy_numpy_vectors)
-        else:
-            self.enemy_tree = None
+        # Both trees are built from a single array of the positions
+        self.own_index = UnitSpatialIndex(self.all_own, own_type_indices)
+        self.enemy_index = UnitSpatialIndex(self.knowledge.known_enemy_units, enemy_type_indices)
+        self.own_tree = self.own_index.tree
+        self.enemy_tree = self.enemy_index.tree
 
         for effect in self.ai.state.effects:
             if effect.id == FakeEffectID.get(UnitTypeId.FORCEFIELD.value):
@@ -0,0 +1,62 @@
+import numpy as np
+
+from sc2 import UnitTypeId
+from sc2.bot_ai import BotAI
+from sc2.synthetic_game import SyntheticGame
+from sc2.units import Units
+
+from .unit_cache_manager import UnitCategory, UnitSpatialIndex
+
+
+def create_index(units: Units) -> UnitSpatialIndex:
+    type_indices = {}
+    for index, unit in enumerate(units):
+        type_indices.setdefault(unit.type_id, []).append(index)
+    return UnitSpatialIndex(units, type_indices)
+
+
+def in_range(units: Units, center, distance: float):
+    return [index for index, unit in enumerate(units) if unit.distance_to(center) <= distance]
+
+
+class TestUnitSpatialIndex:
+    def test_batched_query_matches_single_queries(self):
+        game = SyntheticGame(seed=5)
+        bot = game.start_bot(BotAI(), game.observation(300, 300, clusters=3))
+        units = bot.units + bot.structures
+        index = create_index(units)
+
+        centers = [unit.position for unit in bot.enemy_units[:20]] + [bot.start_location]
+        ranges = np.linspace(2, 20, len(centers))
+        results = index.query(centers, ranges)
+
+        assert len(results) == len(centers)
+        for center, distance, indices in zip(centers, ranges, results):
+            assert indices.tolist() == in_range(units, center, distance)
+        assert index.units_at(results[-1]) == Units([units[i] for i in results[-1]], bot)
+
+    def test_subsets(self):
+        game = SyntheticGame(seed=6)
+        bot = game.start_bot(BotAI(), game.observation(200, 200, cloaked_fraction=0.3))
+        units = bot.enemy_units + bot.enemy_structures
+        index = create_index(units)
+        center = units.center
+
+        def subset_query(subset):
+            return [units[i] for i in index.query([center], 30, subset)[0]]
+
+        assert subset_query(UnitTypeId.ZERGLING) == [
+            units[i] for i in in_range(units, center, 30) if units[i].type_id == UnitTypeId.ZERGLING
+        ]
+        assert subset_query(UnitCategory.Air) == [units[i] for i in in_range(units, center, 30) if units[i].is_flying]
+        assert subset_query(UnitCategory.Worker) == [
+            units[i] for i in in_range(units, center, 30) if units[i].type_id == UnitTypeId.DRONE
+        ]
+        assert not index.query([center], 30, UnitTypeId.MARINE)[0].size
+        assert index.targetable.tolist() == [unit.can_be_attacked or unit.is_snapshot for unit in units]
+
+    def test_empty_units(self):
+        index = create_index(Units([], BotAI()))
+        assert index.tree is None
+        assert [indices.size for indices in index.query([(1, 1), (2, 2)], 5)] == [0, 0]
+        assert [indices.size for indices in index.query([(1, 1)], 5, UnitCategory.Ground)] == [0]
@@ -1,5 +1,7 @@
 import logging
-from typing import Union, Optional, List, Dict
+from typing import Callable, Union, Optional, List, Dict, Tuple, TYPE_CHECKING
+
+import numpy as np
 
 from sharpy.general.unit_feature import UnitFeature
 from sc2 import Race, race_gas, race_townhalls
@@ -7,9 +9,17 @@ from sc2.constants import *
 from sc2.unit import Unit
 from sc2.units import Units
 from . import ManagerBase
-from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.extended_power import ExtendedPower, PowerTables
 from .version_manager import GameVersion
 
+if TYPE_CHECKING:
+    from sharpy.knowledges import Knowledge
+
+# Size of the tables of UnitValue that are indexed by UnitTypeId.value
+TYPE_TABLE_SIZE = max(type_id.value for type_id in UnitTypeId) + 1
+# Types whose range depends on the state of the unit, see ground_range and air_range
+STATE_RANGE_TYPES = np.array([UnitTypeId.RAVEN.value, UnitTypeId.CYCLONE.value])
+
 buildings_2x2 = {
     UnitTypeId.SUPPLYDEPOT,
     UnitTypeId.PYLON,
@@ -398,8 +408,83 @@ class UnitValue(ManagerBase):
             if UnitFeature.Detector in unit_data.features:
                 self.detectors.append(unit_data_key)
 
+        # Dense tables indexed by UnitTypeId.value, index them with an array of type ids for many units at once
+        self.minerals_table: np.ndarray = self._data_table(lambda data: data.minerals, 0)
+        self.gas_table: np.ndarray = self._data_table(lambda data: data.gas, 0)
+        self.supply_table: np.ndarray = self._data_table(lambda data: data.supply, 0)
+        self.combat_value_table: np.ndarray = self._data_table(lambda data: data.combat_value, 1.0)
+        self.build_time_table: np.ndarray = self._data_table(lambda data: data.build_time or 0, 0)
+        self.build_time_table[UnitTypeId.WARPGATE.value] = self.build_time_table[UnitTypeId.GATEWAY.value]
+        self.power_tables = PowerTables(self.unit_data, TYPE_TABLE_SIZE)
+
+        # Tables from the game data and own upgrades, rows are [enemy, own], see update_type_tables
+        self.ground_range_table: Optional[np.ndarray] = None
+        self.air_range_table: Optional[np.ndarray] = None
+        self.speed_table: Optional[np.ndarray] = None
+        self._ground_ranges: List[List[float]] = []
+        self._air_ranges: List[List[float]] = []
+        self._table_upgrade_count = -1
+
+    def _data_table(self, value: Callable[[UnitData], float], default: float) -> np.ndarray:
+        table = np.full(TYPE_TABLE_SIZE, default, dtype=float)
+        for type_id, unit_data in self.unit_data.items():
+            table[type_id.value] = value(unit_data)
+        return table
+
+    async def start(self, knowledge: "Knowledge"):
+        await super().start(knowledge)
+        self.update_type_tables()
+
     async def update(self):
-        pass
+        self.update_type_tables()
+
+    def update_type_tables(self):
+        """ Builds the tables of ranges and speeds, again only when upgrades have completed. """
+        upgrades = self.ai.state.upgrades
+        if len(upgrades) == self._table_upgrade_count:
+            return
+        self._table_upgrade_count = len(upgrades)
+
+        ground = np.zeros(TYPE_TABLE_SIZE)
+        air = np.zeros(TYPE_TABLE_SIZE)
+        speeds = np.zeros(TYPE_TABLE_SIZE)
+        for value, type_data in self.ai._game_data.units.items():
+            if value >= TYPE_TABLE_SIZE:
+                continue
+            weapons = type_data._proto.weapons
+            ground[value] = next((weapon.range for weapon in weapons if weapon.type in TARGET_GROUND), 0)
+            air[value] = next((weapon.range for weapon in weapons if weapon.type in TARGET_AIR), 0)
+            speeds[value] = type_data._proto.movement_speed
+
+        ground[UnitTypeId.ORACLE.value] = 4
+        ground[UnitTypeId.CARRIER.value] = 8
+        ground[UnitTypeId.BATTLECRUISER.value] = 6
+        ground[UnitTypeId.DISRUPTOR.value] = 10
+        ground[UnitTypeId.BANELING.value] = 0.1
+        if (
+            self.knowledge.version_manager.base_version >= GameVersion.V_4_11_0
+            and UpgradeId.LURKERRANGE in upgrades
+        ):
+            ground[[UnitTypeId.LURKERMP.value, UnitTypeId.LURKERMPBURROWED.value]] = 10
+        else:
+            ground[[UnitTypeId.LURKERMP.value, UnitTypeId.LURKERMPBURROWED.value]] = 8
+        air[UnitTypeId.CARRIER.value] = 8
+        air[UnitTypeId.BATTLECRUISER.value] = 6
+
+        self.ground_range_table = np.stack([ground, ground])
+        # Let's assume the worst, enemy has the upgrade!
+        self.ground_range_table[0, UnitTypeId.COLOSSUS.value] = 9
+        self.ground_range_table[1, UnitTypeId.COLOSSUS.value] = 9 if UpgradeId.EXTENDEDTHERMALLANCE in upgrades else 7
+        self.air_range_table = np.stack([air, air])
+        # Lists are faster than arrays for looking up single units
+        self._ground_ranges = self.ground_range_table.tolist()
+        self._air_ranges = self.air_range_table.tolist()
+        self.speed_table = speeds
+
+    @staticmethod
+    def type_values(units: Units) -> np.ndarray:
+        """ Returns UnitTypeId.value of the units as an array for indexing the tables. """
+        return np.fromiter((unit.type_id.value for unit in units), dtype=np.intp, count=len(units))
 
     async def post_update(self):
         pass
@@ -476,50 +561,63 @@ class UnitValue(ManagerBase):
             return unit_value.combat_value * health_percentage
         return 1.0 * health_percentage
 
+    def powers(self, units: Units) -> np.ndarray:
+        """Returns power of each unit as an array, see power."""
+        return self.power_rows(units)[1]
+
+    def power_rows(self, units: Units) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns UnitTypeId.value and power of each unit as arrays, see power."""
+        rows = [(unit.health + unit.shield, unit.health_max + unit.shield_max, unit.type_id.value) for unit in units]
+        table = np.array(rows, dtype=float).reshape((len(units), 3))
+        current_health, maximum_health = table[:, 0], table[:, 1]
+        health_percentage = 0.5 + 0.5 * np.divide(
+            current_health, maximum_health, out=np.ones(len(units)), where=maximum_health > 0
+        )
+        type_values = table[:, 2].astype(np.intp)
+        return type_values, self.combat_value_table[type_values] * health_percentage
+
     def ground_range(self, unit: Unit) -> float:
-        if unit.type_id == UnitTypeId.RAVEN and unit.energy >= 50:
+        type_id = unit.type_id
+        if type_id == UnitTypeId.RAVEN and unit.energy >= 50:
             return 9
-        if unit.type_id == UnitTypeId.ORACLE:
-            return 4
-        if unit.type_id == UnitTypeId.CARRIER:
-            return 8
-        if unit.type_id == UnitTypeId.BATTLECRUISER:
-            return 6
-        if unit.type_id == UnitTypeId.DISRUPTOR:
-            return 10
-        if unit.type_id == UnitTypeId.BANELING:
-            return 0.1
-        if unit.type_id == UnitTypeId.LURKERMP or unit.type_id == UnitTypeId.LURKERMPBURROWED:
-            if self.knowledge.version_manager.base_version < GameVersion.V_4_11_0:
-                return 8
-            else:
-                if self.ai.already_pending_upgrade(UpgradeId.LURKERRANGE) >= 1:
-                    return 10
-                return 8
-        if unit.type_id == UnitTypeId.COLOSSUS:
-            if not unit.is_mine:
-                return 9  # Let's assume the worst, enemy has the upgrade!
-
-            if self.ai.already_pending_upgrade(UpgradeId.EXTENDEDTHERMALLANCE) >= 1:
-                return 9
-            else:
-                return 7
-        if unit.type_id == UnitTypeId.CYCLONE:
+        if type_id == UnitTypeId.CYCLONE:
             if not unit.is_mine or self.knowledge.cooldown_manager.is_ready(unit.tag, AbilityId.LOCKON_LOCKON):
                 return 7
             if self.knowledge.cooldown_manager.is_ready(unit.tag, AbilityId.CANCEL_LOCKON):
                 return 13
 
-        return unit.ground_range
+        if self.speed_table is None:
+            self.update_type_tables()
+        return self._ground_ranges[unit.is_mine][type_id.value]
 
     def air_range(self, unit: Unit) -> float:
-        if unit.type_id == UnitTypeId.RAVEN and unit.energy >= 50:
+        type_id = unit.type_id
+        if type_id == UnitTypeId.RAVEN and unit.energy >= 50:
             return 9
-        if unit.type_id == UnitTypeId.CARRIER:
-            return 8
-        if unit.type_id == UnitTypeId.BATTLECRUISER:
-            return 6
-        return unit.air_range
+
+        if self.speed_table is None:
+            self.update_type_tables()
+        return self._air_ranges[unit.is_mine][type_id.value]
+
+    def ground_ranges(self, units: Units) -> np.ndarray:
+        """Returns ground_range of each unit as an array."""
+        if self.speed_table is None:
+            self.update_type_tables()
+        return self._ranges(units, self.ground_range_table, self.ground_range)
+
+    def air_ranges(self, units: Units) -> np.ndarray:
+        """Returns air_range of each unit as an array."""
+        if self.speed_table is None:
+            self.update_type_tables()
+        return self._ranges(units, self.air_range_table, self.air_range)
+
+    def _ranges(self, units: Units, table: np.ndarray, unit_range: Callable[[Unit], float]) -> np.ndarray:
+        type_values = self.type_values(units)
+        mine = np.fromiter((unit.is_mine for unit in units), dtype=np.intp, count=len(units))
+        ranges = table[mine, type_values]
+        for index in np.flatnonzero(np.isin(type_values, STATE_RANGE_TYPES)).tolist():
+            ranges[index] = unit_range(units[index])
+        return ranges
 
     def can_shoot_air(self, unit: Unit) -> bool:
         return self.air_range(unit) > 0
@@ -540,6 +638,18 @@ class UnitValue(ManagerBase):
         # eg. stalker.radius + stalker.range + marine.radius
         return unit.radius + corrected_range + other.radius
 
+    def real_ranges(self, units: Units, others: Units) -> np.ndarray:
+        """Returns real_range of each unit against each other unit as array of shape (len(units), len(others))."""
+        ground_ranges = self.ground_ranges(units)
+        air_ranges = self.air_ranges(units)
+        radii = np.fromiter((unit.radius for unit in units), dtype=float, count=len(units))
+        # is_flying includes units lifted by graviton beam
+        others_flying = np.fromiter((other.is_flying for other in others), dtype=bool, count=len(others))
+        others_radii = np.fromiter((other.radius for other in others), dtype=float, count=len(others))
+
+        ranges = np.where(others_flying, air_ranges[:, np.newaxis], ground_ranges[:, np.newaxis])
+        return np.where(ranges > 0, radii[:, np.newaxis] + ranges + others_radii, ranges)
+
     def real_speed(self, unit: Unit) -> float:
         type_id = unit.type_id
         # TODO: OWn speed adjustments from upgrades
@@ -563,6 +673,27 @@ class UnitValue(ManagerBase):
 
         return speed
 
+    def real_speeds(self, units: Units) -> np.ndarray:
+        """Returns real_speed of each unit as an array."""
+        if self.speed_table is None:
+            self.update_type_tables()
+        type_values = self.type_values(units)
+        speeds = self.speed_table[type_values]
+
+        if self.knowledge.enemy_race == Race.Zerg:
+            enemies = np.fromiter((unit.is_enemy for unit in units), dtype=bool, count=len(units))
+            if self.ai.time > 200:
+                speeds[enemies & (type_values == UnitTypeId.ZERGLING.value)] = 6.58
+
+            cells = np.floor(units._positions_array()).astype(np.intp)
+            on_creep = enemies & (self.ai.state.creep.data_numpy[cells[:, 1], cells[:, 0]] == 1)
+            multipliers = np.full(len(units), 1.3)
+            multipliers[type_values == UnitTypeId.QUEEN.value] = 2.6667
+            multipliers[type_values == UnitTypeId.HYDRALISK.value] = 1.5
+            speeds[on_creep] *= multipliers[on_creep]
+
+        return speeds
+
     def should_kite(self, unit_type: UnitTypeId) -> bool:
         if unit_type == UnitTypeId.VOIDRAY or unit_type == UnitTypeId.ARCHON:
             return False
@@ -1,6 +1,12 @@
-from sc2 import UnitTypeId
+from types import SimpleNamespace
+
+from sc2 import Race, UnitTypeId
+from sc2.bot_ai import BotAI
+from sc2.ids.upgrade_id import UpgradeId
+from sc2.synthetic_game import SyntheticGame
 
 from .unit_value import UnitValue
+from .version_manager import VersionManager
 
 
 class TestUnitValue:
@@ -27,3 +33,24 @@ class TestUnitValue:
         assert not unit_value.is_townhall(UnitTypeId.BARRACKS)
         assert not unit_value.is_townhall(UnitTypeId.GATEWAY)
         assert not unit_value.is_townhall(UnitTypeId.SPAWNINGPOOL)
+
+    def test_tables_match_single_units(self):
+        game = SyntheticGame(seed=9)
+        own_mix = {UnitTypeId.STALKER: 0.4, UnitTypeId.COLOSSUS: 0.2, UnitTypeId.OBSERVER: 0.1, UnitTypeId.ZEALOT: 0.3}
+        observation = game.observation(60, 60, own_mix=own_mix, game_loop=5000)
+        bot = game.start_bot(BotAI(), observation)
+        bot.state.upgrades.add(UpgradeId.EXTENDEDTHERMALLANCE)
+        unit_value = UnitValue()
+        unit_value.ai = bot
+        unit_value.knowledge = SimpleNamespace(version_manager=VersionManager(), enemy_race=Race.Zerg)
+        units = bot.units + bot.enemy_units + bot.structures
+
+        assert unit_value.powers(units).tolist() == [unit_value.power(unit) for unit in units]
+        assert unit_value.ground_ranges(units).tolist() == [unit_value.ground_range(unit) for unit in units]
+        assert unit_value.air_ranges(units).tolist() == [unit_value.air_range(unit) for unit in units]
+        assert unit_value.real_speeds(units).tolist() == [unit_value.real_speed(unit) for unit in units]
+        assert unit_value.ground_range(bot.units(UnitTypeId.COLOSSUS).first) == 9
+
+        type_values = unit_value.type_values(units)
+        assert unit_value.minerals_table[type_values].tolist() == [unit_value.minerals(unit.type_id) for unit in units]
+        assert unit_value.build_time_table[UnitTypeId.WARPGATE.value] == unit_value.build_time(UnitTypeId.WARPGATE)
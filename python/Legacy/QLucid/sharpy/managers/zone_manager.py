@@ -2,9 +2,8 @@ import logging
 import sys
 from typing import Dict, List, Optional
 
-import sc2pathlibp
 from sharpy import sc2math
-from sharpy.general.path import Path
+from sharpy.general.zone_distance_fields import ZoneDistanceFields, ZonePaths
 from sharpy.managers.grids import BuildGrid, GridArea, ZoneArea
 from sharpy.mapping import MapInfo
 from sc2.game_info import Ramp
@@ -34,6 +33,8 @@ class ZoneManager(ManagerBase):
         self.zone_sorted_by = None
         self.found_enemy_start: Optional[Point2] = None
         self.map: MapInfo = None
+        # Walking distances to the zones, created in init_zones
+        self.distance_fields: Optional[ZoneDistanceFields] = None
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
@@ -50,17 +51,27 @@ class ZoneManager(ManagerBase):
             self.zones[exp_loc] = Zone(exp_loc, is_start_location, self.knowledge)
 
         self.expansion_zones = list(self.zones.values())
+        pathing_manager = self.knowledge.pathing_manager
+        # Created again only when rocks are destroyed, mined out mineral fields are not worth the rebuild
+        self.distance_fields = ZoneDistanceFields(
+            list(self.zones.keys()), pathing_manager.terrain_grid, lambda: pathing_manager.rock_version
+        )
 
         self._sort_expansion_zones()
         self._zones_truly_sorted = self.enemy_start_location_found
         self.zone_sorted_by = self.enemy_start_location
 
     def _path_distance(self, start: Point2, end: Point2):
-        path = Path(self.knowledge.pathing_manager.path_finder_terrain.find_path(start, end))
-        if path.distance > 0:
-            return path.distance
+        """ Walking distance from the zone at start to end. """
+        distance = self.distance_fields.distance(start, end)
+        if distance:
+            return distance
         return start.distance_to(end)  # Failsafe
 
+    def zone_walk_distance(self, zone: Zone, position: Point2) -> Optional[float]:
+        """ Walking distance from position to the zone when structures are ignored, None when there is no path. """
+        return self.distance_fields.distance(zone.center_location, position)
+
     def _sort_expansion_zones(self):
         self.expansion_zones.sort(key=self._zone_distance_to_start)
         own_main = self.expansion_zones[0]
@@ -156,15 +167,9 @@ class ZoneManager(ManagerBase):
 
     def init_zone_pathing(self):
         """ Init zone pathing. This needs to be run after all managers have properly started. """
-        pf: sc2pathlibp.PathFinder = self.knowledge.pathing_manager.path_finder_terrain
         zone_count = len(self.expansion_zones)
-        for i in range(0, zone_count):
-            for j in range(i + 1, zone_count):
-                path_data = pf.find_path(
-                    self.expansion_zones[i].center_location, self.expansion_zones[j].center_location
-                )
-                self.expansion_zones[i].paths[j] = Path(path_data)
-                self.expansion_zones[j].paths[i] = Path(path_data, True)
+        for zone in self.expansion_zones:
+            zone.paths = ZonePaths(self.distance_fields, zone, self.expansion_zones)
 
         for i in range(1, zone_count - 1):
             # Recalculate improved gather points based on pathing
@@ -261,8 +266,7 @@ class ZoneManager(ManagerBase):
         if self.knowledge.iteration == 0:
             self.init_zone_pathing()
 
-        for zone in self.zones.values():  # type: Zone
-            zone.update()
+        self.update_zones()
 
         if not self._zones_truly_sorted and self.knowledge.enemy_start_location_found:
             self._zones_truly_sorted = True
@@ -271,6 +275,26 @@ class ZoneManager(ManagerBase):
             self.zone_sorted_by = self.enemy_start_location
             self._sort_expansion_zones()
 
+    def update_zones(self):
+        zones: List[Zone] = list(self.zones.values())
+        if not zones:
+            return
+
+        # A single query for all zones, the danger radius is only needed for our zones
+        centers = [zone.center_location for zone in zones]
+        radii = [zone.radius for zone in zones]
+        danger_radii = [zone.danger_radius for zone in zones]
+        own_indices = self.cache.own_indices_in_range(centers, radii)
+        enemy_indices = self.cache.enemy_indices_in_range(centers + centers, radii + danger_radii)
+
+        for i, zone in enumerate(zones):
+            assaulting_enemies = None
+            if zone.is_ours:
+                assaulting_enemies = self.cache.enemy_units_at(enemy_indices[len(zones) + i])
+            zone.update(
+                self.cache.own_units_at(own_indices[i]), self.cache.enemy_units_at(enemy_indices[i]), assaulting_enemies
+            )
+
     # endregion
 
     # region Properties
@@ -1,9 +1,11 @@
 import math
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 import sc2
 from sharpy.general.extended_power import ExtendedPower
-from sharpy.managers import UnitCacheManager
+from sharpy.managers import UnitCacheManager, UnitCategory
 from sharpy.tools import IntervalFunc
 from sc2.pixel_map import PixelMap
 from sc2.position import Point2
@@ -83,14 +85,17 @@ class HeatMap:
     def __stealth_update(self):
         time_change = self.ai.time - self.last_quick_update
 
-        for unit in self.knowledge.known_enemy_units:  # type: Unit
-            if unit.is_cloaked:
-                own_close = self.cache.own_in_range(unit.position, 12).not_flying
+        cloaked_units = [unit for unit in self.knowledge.known_enemy_units if unit.is_cloaked]
+        if not cloaked_units:
+            return
+
+        # Only add to stealth heat if we have a ground unit or building nearby
+        # Stealthed units cannot attack air
+        own_close = self.cache.own_indices_in_range([unit.position for unit in cloaked_units], 12, UnitCategory.Ground)
+        for unit, indices in zip(cloaked_units, own_close):
+            if len(indices) > 0:
                 area = self.get_zone(unit.position)
-                if own_close:
-                    # Only add to stealth heat if we have a ground unit or building nearby
-                    # Stealthed units cannot attack air
-                    area.stealth_heat += 1 * time_change
+                area.stealth_heat += 1 * time_change
 
     def get_zone(self, position: Point2) -> HeatArea:
         x_int = min(self.slots_w, max(0, math.floor(position.x / SLOT_SIZE)))
@@ -101,9 +106,17 @@ class HeatMap:
         time_change = self.ai.time - self.last_update
         self.last_update = self.ai.time
 
-        for unit in self.knowledge.known_enemy_units_mobile:
-            area = self.get_zone(unit.position)
-            area.last_enemy_power.add_unit(unit)
+        enemies = self.knowledge.known_enemy_units_mobile
+        if enemies:
+            # The areas of get_zone for all enemies at once
+            slots = np.floor(enemies._positions_array() / SLOT_SIZE).astype(np.intp)
+            x_int = np.clip(slots[:, 0], 0, self.slots_w)
+            y_int = np.clip(slots[:, 1], 0, self.slots_h)
+            area_indices = x_int + y_int * self.slots_w
+            type_values, powers = self.unit_values.power_rows(enemies)
+            for area_index in np.unique(area_indices).tolist():
+                in_area = area_indices == area_index
+                self.heat_areas[area_index].last_enemy_power.add_type_values(type_values[in_area], powers[in_area])
 
         for zone in self.heat_areas:
             zone.update(time_change)
@@ -0,0 +1,42 @@
+import time
+from typing import Optional, Set
+
+from sc2.step_profiler import StepProfiler
+from sharpy.plans.acts import ActBase
+
+
+def profile_acts(profiler: StepProfiler, act: ActBase, name: Optional[str] = None):
+    """
+    Times execute of the act and of all acts below it in the report of the profiler.
+    Acts are found from the attributes of each act, so this needs to be called after the build order is created.
+    The time of an act includes the time of its child acts.
+
+    @param profiler: StepProfiler of the bot
+    @param act: usually the build order of the bot
+    @param name: label of the act in the report
+    """
+    _profile_act(profiler, act, name or f"act.{type(act).__name__}", set())
+
+
+def _profile_act(profiler: StepProfiler, act: ActBase, name: str, profiled: Set[int]):
+    if id(act) in profiled:
+        return
+    profiled.add(id(act))
+    execute = act.execute
+
+    async def profiled_execute() -> bool:
+        start = time.perf_counter()
+        try:
+            return await execute()
+        finally:
+            profiler.record(name, time.perf_counter() - start)
+
+    act.execute = profiled_execute
+
+    for value in vars(act).values():
+        if isinstance(value, ActBase):
+            _profile_act(profiler, value, f"{name}/{type(value).__name__}", profiled)
+        elif isinstance(value, (list, tuple)):
+            for index, child in enumerate(value):
+                if isinstance(child, ActBase):
+                    _profile_act(profiler, child, f"{name}/{index}:{type(child).__name__}", profiled)
@@ -0,0 +1,37 @@
+import pytest
+
+from sc2.step_profiler import StepProfiler
+from sharpy.plans import BuildOrder, SequentialList
+from sharpy.plans.acts import ActBase
+
+from .act_profiler import profile_acts
+
+
+class Done(ActBase):
+    async def execute(self) -> bool:
+        return True
+
+
+class Blocked(ActBase):
+    async def execute(self) -> bool:
+        return False
+
+
+class TestActProfiler:
+    @pytest.mark.asyncio
+    async def test_every_executed_act_is_timed(self):
+        done = Done()
+        plan = BuildOrder(SequentialList(done, Blocked(), Done()), done)
+        profiler = StepProfiler()
+        profile_acts(profiler, plan)
+
+        assert not await plan.execute()
+
+        assert set(profiler.samples) == {
+            "act.BuildOrder",
+            "act.BuildOrder/0:SequentialList",
+            "act.BuildOrder/0:SequentialList/0:Done",
+            "act.BuildOrder/0:SequentialList/1:Blocked",
+        }
+        # The same act is only timed once, by its first parent
+        assert len(profiler.samples["act.BuildOrder/0:SequentialList/0:Done"]) == 2
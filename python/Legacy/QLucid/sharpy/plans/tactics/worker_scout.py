@@ -166,7 +166,7 @@ class WorkerScout(ActBase):
 
         end = target
 
-        result = await self.ai._client.query_pathing(start, end)
+        result = await self.ai.pathing_queries.distance(start, end)
         return result is None
 
     def target_location_reached(self):
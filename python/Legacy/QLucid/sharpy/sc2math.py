@@ -189,6 +189,77 @@ def geometric_median(X, eps=1e-5):
     return y
 
 
+def geometric_medians(X: np.ndarray, labels: np.ndarray, starts: np.ndarray, eps=1e-5) -> np.ndarray:
+    """
+    Calculates the geometric medians of several groups of points at once, see geometric_median
+    :param X: 2D numpy array of the points of all groups
+    :param labels: group of each point, 0 to len(starts) - 1
+    :param starts: initial estimate for each group, for example the mean or the median of the previous frame
+    :param eps: epsilon for accuracy
+    :return: 2D numpy array with the median of each group
+    """
+    count = len(starts)
+    y = np.array(starts, dtype=float)
+    active = np.ones(count, dtype=bool)
+
+    for i in range(30):  # Just to make sure that no endless loops happen
+        rows = active[labels]
+        points = X[rows]
+        point_labels = labels[rows]
+        D = np.linalg.norm(points - y[point_labels], axis=1)
+        zeros = D == 0
+
+        Dinv = 1 / np.where(zeros, 1, D)
+        Dinv[zeros] = 0
+        Dinvs = np.bincount(point_labels, Dinv, count)
+        num_zeros = np.bincount(point_labels, zeros, count)
+        # Groups whose points are all at the estimate keep it
+        has_weight = Dinvs > 0
+        T = y.copy()
+        T[has_weight, 0] = np.bincount(point_labels, Dinv * points[:, 0], count)[has_weight] / Dinvs[has_weight]
+        T[has_weight, 1] = np.bincount(point_labels, Dinv * points[:, 1], count)[has_weight] / Dinvs[has_weight]
+
+        r = np.linalg.norm((T - y) * Dinvs[:, np.newaxis], axis=1)
+        rinv = np.divide(num_zeros, r, out=np.zeros(count), where=r != 0)
+        y1 = np.maximum(0, 1 - rinv)[:, np.newaxis] * T + np.minimum(1, rinv)[:, np.newaxis] * y
+
+        moved = np.linalg.norm(y1 - y, axis=1)
+        y[active] = y1[active]
+        active &= moved >= eps
+        if not active.any():
+            break
+    return y
+
+
+def trimmed_means(X: np.ndarray, labels: np.ndarray, count: int, share=0.75) -> np.ndarray:
+    """
+    Calculates a cheap approximation of the geometric medians of several groups of points at once:
+    the mean of the 'share' of the points of each group that are closest to the mean of the group.
+    :param X: 2D numpy array of the points of all groups
+    :param labels: group of each point, 0 to count - 1
+    :param count: number of groups
+    :param share: share of the points to keep in each group
+    :return: 2D numpy array with the trimmed mean of each group
+    """
+    sizes = np.bincount(labels, minlength=count)
+    means = np.stack([np.bincount(labels, X[:, 0], count), np.bincount(labels, X[:, 1], count)], axis=1)
+    means /= np.maximum(sizes, 1)[:, np.newaxis]
+
+    D = np.linalg.norm(X - means[labels], axis=1)
+    # Rank of each point within its group by distance to the mean of the group
+    order = np.lexsort((D, labels))
+    first_rows = np.cumsum(sizes) - sizes
+    ranks = np.empty(len(X), dtype=np.intp)
+    ranks[order] = np.arange(len(X)) - first_rows[labels[order]]
+
+    kept = ranks < np.ceil(sizes * share)[labels]
+    kept_sizes = np.bincount(labels[kept], minlength=count)
+    result = np.stack(
+        [np.bincount(labels[kept], X[kept, 0], count), np.bincount(labels[kept], X[kept, 1], count)], axis=1
+    )
+    return result / np.maximum(kept_sizes, 1)[:, np.newaxis]
+
+
 def two_opt(cities, improvement_threshold):
     """2-opt Algorithm adapted from https://en.wikipedia.org/wiki/2-opt"""
 
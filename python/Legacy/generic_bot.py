@@ -7,6 +7,13 @@ from helper import iteration_adjuster, set_total_strength_values
 from track_enemy_units import check_and_remove, scan_vision
 
 class GenericBot(sc2.BotAI):
+  # Check find_placement candidates locally and confirm them with a single placement query
+  local_placement = True
+  # Only query the abilities of units that changed since the last step
+  cached_abilities = True
+  # Skipped on degraded steps, when the step time limit is about to run out, see BotAI.should_skip
+  optional_work = frozenset({'debug', 'idle_units', 'strength_values', 'ability_discovery'})
+
   async def on_step(self, iteration):
     t0 = time.process_time()
     self.iteration = iteration
@@ -14,14 +21,14 @@ class GenericBot(sc2.BotAI):
     self.units_that_can_attack = self.units_and_structures.filter(lambda unit: unit.can_attack)
     self.enemy_units_and_structures = self.enemy_units + self.enemy_structures
     self.enemy_units_that_can_attack = self.enemy_units_and_structures.filter(lambda unit: unit.can_attack)
-    if iteration % 32 == 0:
+    if iteration % 32 == 0 and not self.should_skip('debug'):
       print('self.enemy_units_that_can_attack', time.process_time() - t0)    
     self.under_construction = self.structures.filter(lambda structure: not structure.is_ready)
     self.reserved_for_task = []
     all_available_abilities = await self.get_available_abilities(self.units_and_structures)
     for unit, abilities in zip(self.units_and_structures, all_available_abilities):
       unit.abilities = abilities
-    if iteration % 32 == 0:
+    if iteration % 32 == 0 and not self.should_skip('debug'):
       print('unit.abilities', time.process_time() - t0)
     for townhall in self.townhalls:
       townhall.harvester_shortage = townhall.ideal_harvesters - townhall.assigned_harvesters
@@ -31,9 +38,10 @@ class GenericBot(sc2.BotAI):
     self.all_enemy_units_and_structures = self.enemy_units_and_structures + self.out_of_vision_units
     self.actions.extend(await boost_production(self))
     self.actions.extend(update_attack_and_retreat(self))
-    self.actions.extend(await assign_actions_to_idle(self))
+    if not self.should_skip('idle_units'):
+      self.actions.extend(await assign_actions_to_idle(self))
 
-    if iteration % self.decide_action_iteration == 0:
+    if iteration % self.decide_action_iteration == 0 and not self.should_skip('strength_values'):
       set_total_strength_values(self)
     actions = await decide_action(self)
     self.actions.extend(actions)
@@ -41,7 +49,7 @@ class GenericBot(sc2.BotAI):
       await self.on_eight_steps()
     scan_vision(self)
     self.time_elapse += time.process_time() - t0
-    if iteration % 32 == 0:
+    if iteration % 32 == 0 and not self.should_skip('debug'):
       print('on_step time', time.process_time() - t0)
       print('average frame time', self.time_elapse / (self.iteration + 1) / 8)
 
@@ -89,11 +97,13 @@ class GenericBot(sc2.BotAI):
       self.actions += (await build_defensive_structure(self, worker_abilities))
       self.actions += (await research_upgrade(self))
     self.actions += (await train_army_units(self))
-    if self.iteration % 32 == 0:
+    if self.iteration % 32 == 0 and not self.should_skip('debug'):
       print('on_eight_steps time', time.process_time() - t0)   
     time_elapse = time.process_time() - t0
     self.on_eight_steps_iteration = iteration_adjuster(time_elapse)
 
+    if self.should_skip('ability_discovery'):
+      return
     random_unit = random.choice(self.units_and_structures)
     if random_unit:
       unit_abilities = await self.get_available_abilities(random_unit)
@@ -88,8 +88,8 @@ def reachable_target(self, unit, enemy_unit):
 
 def set_total_strength_values(self):
   t0 = time.process_time()
+  all_known_units = self.all_enemy_units_and_structures + self.units_and_structures
   for unit in self.total_strength_values:
-    all_known_units = self.all_enemy_units_and_structures + self.units_and_structures
     found_unit = all_known_units.find_by_tag(unit.tag)
     if found_unit:
       found_unit.total_strength = unit.total_strength
@@ -6,6 +6,10 @@ import time
 from sc2.constants import *
 
 class LucidBot(sc2.BotAI):
+  # Check find_placement candidates locally and confirm them with a single placement query
+  local_placement = True
+  # Only query the abilities of units that changed since the last step
+  cached_abilities = True
   
   async def on_step(self, iteration):
     self.iteration = iteration
@@ -103,7 +107,9 @@ class LucidBot(sc2.BotAI):
       ideal_harvesters = ideal_harvesters + nexus.ideal_harvesters
       assigned_harvesters = assigned_harvesters + nexus.assigned_harvesters
 
-    for nexus in self.ready_nexuses:
+    # one query for the abilities of all nexuses
+    all_nexus_abilities = await self.get_available_abilities(self.ready_nexuses) if self.ready_nexuses else []
+    for nexus, abilities in zip(self.ready_nexuses, all_nexus_abilities):
       # build workers when there is a shortage at the nexus.    
       probes = self.units(PROBE)
       if len(probes) <= self.worker_cap:
@@ -113,7 +119,6 @@ class LucidBot(sc2.BotAI):
               if self.can_afford(PROBE):
                 await self.do(nexus.train(PROBE))
       # use chronoboost
-      abilities = await self.get_available_abilities(nexus)
       if AbilityId.EFFECT_CHRONOBOOSTENERGYCOST in abilities:
         # collect nexuses and gateways
         nexuses = self.units(NEXUS).ready